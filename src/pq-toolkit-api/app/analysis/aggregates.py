@@ -0,0 +1,92 @@
+from collections.abc import Iterator
+
+from app.analysis.mushra import DISTRIBUTION_BINS
+from app.schemas import (
+    PqTestABResult,
+    PqTestABXResult,
+    PqTestAPEResult,
+    PqTestMUSHRAResult,
+    PqTestTypes,
+)
+
+# Identifies a running total: test ID, kind of value, question (or APE axis) and sample
+AggregateKey = tuple[int, str, str, str]
+
+# Kinds whose values are scores, with a histogram of 10 point ranges
+SCORE_KINDS = ("reference", "anchor", "sample", "rating")
+
+
+def result_values(
+    test_type: PqTestTypes, test_setup: dict, result: dict
+) -> Iterator[tuple[str, str, str, float]]:
+    """Yields (kind, question ID, sample ID, value) of every value in a stored result.
+
+    - MUSHRA: a `reference`, `anchor` or `sample` score per rated sample
+    - APE: a `rating` per axis and sample
+    - AB, ABX: a `selection` of 1 per question, and for ABX an
+      `identification` of 1 when the X sample was identified, 0 otherwise
+    """
+    match PqTestTypes(test_type):
+        case PqTestTypes.MUSHRA:
+            parsed = PqTestMUSHRAResult.model_validate(result)
+            reference = test_setup.get("reference") or {}
+            yield (
+                "reference",
+                "",
+                reference.get("sample_id", ""),
+                parsed.reference_score,
+            )
+            for score in parsed.anchors_scores:
+                yield "anchor", "", score.sample_id, score.score
+            for score in parsed.samples_scores:
+                yield "sample", "", score.sample_id, score.score
+        case PqTestTypes.APE:
+            parsed = PqTestAPEResult.model_validate(result)
+            for axis in parsed.axis_results:
+                for rating in axis.sample_ratings:
+                    yield "rating", axis.axis_id, rating.sample_id, rating.rating
+        case PqTestTypes.AB | PqTestTypes.ABX:
+            schema = PqTestABXResult if test_type == PqTestTypes.ABX else PqTestABResult
+            parsed = schema.model_validate(result)
+            for selection in parsed.selections:
+                yield "selection", selection.question_id, selection.sample_id, 1
+            if test_type == PqTestTypes.ABX:
+                yield (
+                    "identification",
+                    "",
+                    "",
+                    float(parsed.x_selected == parsed.x_sample_id),
+                )
+
+
+class RunningTotal:
+    def __init__(self, kind: str) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.squares = 0.0
+        self.histogram = [0] * DISTRIBUTION_BINS if kind in SCORE_KINDS else []
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.squares += value * value
+        if self.histogram:
+            # Binned like the MUSHRA statistics, 100 falls into the last range
+            bucket = int(value // (100 / DISTRIBUTION_BINS))
+            self.histogram[min(max(bucket, 0), DISTRIBUTION_BINS - 1)] += 1
+
+
+class ResultTotals(dict[AggregateKey, RunningTotal]):
+    """Running totals of a batch of results, to be added to the stored aggregates."""
+
+    def add(
+        self, test_id: int, test_type: PqTestTypes, test_setup: dict, result: dict
+    ) -> None:
+        for kind, question_id, sample_id, value in result_values(
+            test_type, test_setup, result
+        ):
+            key = (test_id, kind, question_id, sample_id)
+            total = self.get(key)
+            if total is None:
+                total = self[key] = RunningTotal(kind)
+            total.add(value)
@@ -0,0 +1,131 @@
+from collections.abc import Iterable
+
+import numpy as np
+
+from app.analysis.bootstrap import ConfidenceIntervals, bootstrap_intervals
+from app.analysis.stats import mean_statistics
+from app.schemas import (
+    PqApeAxis,
+    PqApeSample,
+    PqApeTestAnalysis,
+    PqTestAPE,
+    PqTestAPEResult,
+)
+
+
+def rating_array(test: PqTestAPE, results: Iterable[PqTestAPEResult]) -> np.ndarray:
+    """Builds a submissions x axes x samples array of ratings, NaN where a rating is missing.
+
+    Axes and samples follow the test config, ratings of axes or samples not
+    in it are left out.
+    """
+    axes = {axis.question_id: n for n, axis in enumerate(test.axis)}
+    samples = {sample.sample_id: n for n, sample in enumerate(test.samples)}
+    rows, cells, ratings = [], [], []
+    count = 0
+    for row, result in enumerate(results):
+        count += 1
+        for axis_result in result.axis_results:
+            axis = axes.get(axis_result.axis_id)
+            if axis is None:
+                continue
+            for rating in axis_result.sample_ratings:
+                sample = samples.get(rating.sample_id)
+                if sample is not None:
+                    rows.append(row)
+                    cells.append(axis * len(samples) + sample)
+                    ratings.append(rating.rating)
+    array = np.full((count, len(axes) * len(samples)), np.nan)
+    array[rows, cells] = ratings
+    return array.reshape(count, len(axes), len(samples))
+
+
+def average_ranks(ratings: np.ndarray) -> np.ndarray:
+    """Ranks ratings along the last axis, 1 for the lowest, ties get their average rank.
+
+    Missing (NaN) ratings are not ranked and stay NaN.
+    """
+    lower = (ratings[..., None, :] < ratings[..., :, None]).sum(axis=-1)
+    # Includes the rating itself
+    equal = (ratings[..., None, :] == ratings[..., :, None]).sum(axis=-1)
+    return np.where(np.isnan(ratings), np.nan, lower + (equal + 1) / 2)
+
+
+def rank_scores(ranks: np.ndarray) -> np.ndarray:
+    """Scales ranks along the last axis to 0 for the lowest and 1 for the highest rated sample.
+
+    NaN where less than two samples are ranked.
+    """
+    ranked = (~np.isnan(ranks)).sum(axis=-1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(ranked > 1, (ranks - 1) / (ranked - 1), np.nan)
+
+
+def kendall_w(ranks: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Kendall's coefficient of concordance of every axis, corrected for ties.
+
+    Only submissions ranking all samples of an axis take part. Returns the
+    coefficients and the numbers of submissions per axis, the coefficient is
+    NaN with less than two such submissions or samples.
+    """
+    complete = ~np.isnan(ranks).any(axis=-1)
+    raters = complete.sum(axis=0)
+    samples = ranks.shape[-1]
+    rank_sums = np.where(complete[..., None], ranks, 0).sum(axis=0)
+    deviations = ((rank_sums - raters[:, None] * (samples + 1) / 2) ** 2).sum(axis=-1)
+    # Sum of t^3 - t over groups of t tied ranks, as the sum of t^2 - 1 over ranks
+    tied = (ranks[..., None, :] == ranks[..., :, None]).sum(axis=-1)
+    ties = np.where(complete, (tied**2 - 1).sum(axis=-1), 0).sum(axis=0)
+    denominator = raters**2 * (samples**3 - samples) - raters * ties
+    with np.errstate(invalid="ignore", divide="ignore"):
+        w = 12 * deviations / denominator
+    return np.where((raters > 1) & (denominator > 0), w, np.nan), raters
+
+
+def _optional(value: float) -> float | None:
+    return None if np.isnan(value) else float(value)
+
+
+def analyze_ape_test(
+    test: PqTestAPE,
+    results: Iterable[PqTestAPEResult],
+    bootstrap: ConfidenceIntervals | None = None,
+) -> PqApeTestAnalysis:
+    """Computes statistics of every axis of a test.
+
+    Bootstrap intervals of the mean ratings are added when `bootstrap` is given.
+    """
+    ratings = rating_array(test, results)
+    ranks = average_ranks(ratings)
+    rating_stats = mean_statistics(ratings)
+    rank_stats = mean_statistics(rank_scores(ranks))
+    agreement, raters = kendall_w(ranks)
+    boot_low, boot_high = bootstrap_intervals(ratings, bootstrap)
+    return PqApeTestAnalysis(
+        test_number=test.test_number,
+        submissions=ratings.shape[0],
+        axes=[
+            PqApeAxis(
+                axis_id=axis.question_id,
+                raters=int(raters[a]),
+                kendall_w=_optional(agreement[a]),
+                samples=[
+                    PqApeSample(
+                        sample_id=sample.sample_id,
+                        count=int(rating_stats["count"][a, s]),
+                        mean=_optional(rating_stats["mean"][a, s]),
+                        std=_optional(rating_stats["std"][a, s]),
+                        ci_low=_optional(rating_stats["ci_low"][a, s]),
+                        ci_high=_optional(rating_stats["ci_high"][a, s]),
+                        boot_ci_low=_optional(boot_low[a, s]),
+                        boot_ci_high=_optional(boot_high[a, s]),
+                        rank_score=_optional(rank_stats["mean"][a, s]),
+                        rank_ci_low=_optional(rank_stats["ci_low"][a, s]),
+                        rank_ci_high=_optional(rank_stats["ci_high"][a, s]),
+                    )
+                    for s, sample in enumerate(test.samples)
+                ],
+            )
+            for a, axis in enumerate(test.axis)
+        ],
+    )
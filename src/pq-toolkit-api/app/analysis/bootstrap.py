@@ -0,0 +1,93 @@
+import multiprocessing
+import warnings
+from collections.abc import Callable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Resamples drawn by one job, fixed so results don't depend on the number of workers
+RESAMPLES_PER_JOB = 250
+# Resampled values held in memory at once by a job
+_MAX_CELLS = 1 << 24
+
+# Returns lower and upper interval bounds of the means along the first axis of the values
+ConfidenceIntervals = Callable[[np.ndarray], tuple[np.ndarray, np.ndarray]]
+
+
+def resampled_means(
+    values: np.ndarray, seed: np.random.SeedSequence, resamples: int
+) -> np.ndarray:
+    """Means along the first axis of `resamples` resamples of its rows, NaN values ignored.
+
+    Rows are drawn as a resamples x rows index matrix, in as many blocks as
+    needed to keep memory use bounded.
+    """
+    rng = np.random.default_rng(seed)
+    rows = values.shape[0]
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0.0)
+    step = max(1, _MAX_CELLS // max(values.size, 1))
+    means = []
+    for start in range(0, resamples, step):
+        index = rng.integers(0, rows, size=(min(step, resamples - start), rows))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            # Resamples without values of a column give NaN, which is expected
+            means.append(filled[index].sum(axis=1) / valid[index].sum(axis=1))
+    return np.concatenate(means)
+
+
+def bootstrap_intervals(
+    values: np.ndarray, bootstrap: ConfidenceIntervals | None
+) -> tuple[np.ndarray, np.ndarray]:
+    """Intervals of the means along the first axis of `values`, NaN without `bootstrap`."""
+    if bootstrap is None:
+        missing = np.full(values.shape[1:], np.nan)
+        return missing, missing
+    return bootstrap(values)
+
+
+class BootstrapPool:
+    """Computes percentile bootstrap confidence intervals of means in a process pool.
+
+    Resamples are split into jobs of `RESAMPLES_PER_JOB`, each seeded by a
+    child of the requested seed, so intervals only depend on the seed and
+    the number of resamples. Without workers jobs run in the calling thread.
+    """
+
+    def __init__(self, workers: int = 0) -> None:
+        self._executor = (
+            ProcessPoolExecutor(
+                max_workers=workers,
+                # Forking a process running threads could copy held locks
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            if workers > 0
+            else None
+        )
+
+    def confidence_intervals(
+        self, values: np.ndarray, resamples: int, seed: int | Sequence[int]
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Returns 95% interval bounds of the means along the first axis of `values`."""
+        if values.shape[0] == 0:
+            empty = np.full(values.shape[1:], np.nan)
+            return empty, empty
+        jobs = -(-resamples // RESAMPLES_PER_JOB)
+        seeds = np.random.SeedSequence(seed).spawn(jobs)
+        sizes = [
+            min(RESAMPLES_PER_JOB, resamples - job * RESAMPLES_PER_JOB)
+            for job in range(jobs)
+        ]
+        if self._executor is None:
+            parts = map(resampled_means, [values] * jobs, seeds, sizes)
+        else:
+            parts = self._executor.map(resampled_means, [values] * jobs, seeds, sizes)
+        means = np.concatenate(list(parts))
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            low, high = np.nanpercentile(means, [2.5, 97.5], axis=0)
+        return low, high
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,135 @@
+import warnings
+from collections.abc import Collection, Iterable
+from typing import NamedTuple
+
+import numpy as np
+
+from app.analysis.bootstrap import ConfidenceIntervals, bootstrap_intervals
+from app.analysis.stats import mean_statistics
+from app.schemas import (
+    PqMushraCondition,
+    PqMushraTestAnalysis,
+    PqTestMUSHRA,
+    PqTestMUSHRAResult,
+)
+
+# Scores are binned by 10 points, 100 falls into the last bin
+DISTRIBUTION_BINS = 10
+
+
+class MushraScores(NamedTuple):
+    test: PqTestMUSHRA
+    # Submission (experiment use) of every matrix row
+    submissions: np.ndarray
+    matrix: np.ndarray
+
+
+def mushra_conditions(test: PqTestMUSHRA) -> list[tuple[str, str]]:
+    """Lists (sample id, kind) of every condition, the reference first, then anchors and samples."""
+    return (
+        [(test.reference.sample_id, "reference")]
+        + [(anchor.sample_id, "anchor") for anchor in test.anchors]
+        + [(sample.sample_id, "sample") for sample in test.samples]
+    )
+
+
+def score_matrix(
+    test: PqTestMUSHRA, results: Iterable[PqTestMUSHRAResult]
+) -> np.ndarray:
+    """Builds a submissions x conditions matrix of scores, NaN where a score is missing.
+
+    Columns follow `mushra_conditions`, scores of samples not in the test
+    config are left out.
+    """
+    columns = {
+        sample_id: column
+        for column, (sample_id, _) in enumerate(mushra_conditions(test))
+    }
+    rows = []
+    for result in results:
+        row = [np.nan] * len(columns)
+        row[0] = result.reference_score
+        for score in result.anchors_scores + result.samples_scores:
+            column = columns.get(score.sample_id)
+            if column is not None:
+                row[column] = score.score
+        rows.append(row)
+    return np.array(rows, dtype=float).reshape(len(rows), len(columns))
+
+
+def condition_statistics(matrix: np.ndarray) -> dict[str, np.ndarray]:
+    """Computes statistics of every column of a score matrix, ignoring NaN scores.
+
+    Returns arrays with a value per column, NaN where it is undefined, and
+    `distribution`, a columns x `DISTRIBUTION_BINS` array of counts.
+    """
+    stats = mean_statistics(matrix)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        median = np.nanmedian(matrix, axis=0)
+
+    rows, columns = np.nonzero(~np.isnan(matrix))
+    bins = np.clip(
+        matrix[rows, columns] // (100 / DISTRIBUTION_BINS), 0, DISTRIBUTION_BINS - 1
+    )
+    distribution = np.bincount(
+        columns * DISTRIBUTION_BINS + bins.astype(int),
+        minlength=matrix.shape[1] * DISTRIBUTION_BINS,
+    ).reshape(matrix.shape[1], DISTRIBUTION_BINS)
+    return {
+        **stats,
+        "median": median,
+        "distribution": distribution,
+    }
+
+
+def mushra_scores(
+    test: PqTestMUSHRA, rows: Iterable[tuple[str, PqTestMUSHRAResult]]
+) -> MushraScores:
+    """Builds the score matrix of a test from (submission, result) pairs."""
+    rows = list(rows)
+    return MushraScores(
+        test,
+        np.array([submission for submission, _ in rows], dtype=str),
+        score_matrix(test, (result for _, result in rows)),
+    )
+
+
+def _optional(value: float) -> float | None:
+    return None if np.isnan(value) else float(value)
+
+
+def analyze_mushra_test(
+    scores: MushraScores,
+    excluded: Collection[str] = (),
+    bootstrap: ConfidenceIntervals | None = None,
+) -> PqMushraTestAnalysis:
+    """Computes statistics of a test, leaving out rows of the `excluded` submissions.
+
+    Bootstrap intervals of the means are added when `bootstrap` is given.
+    """
+    matrix = scores.matrix
+    if excluded:
+        matrix = matrix[~np.isin(scores.submissions, list(excluded))]
+    stats = condition_statistics(matrix)
+    boot_low, boot_high = bootstrap_intervals(matrix, bootstrap)
+    return PqMushraTestAnalysis(
+        test_number=scores.test.test_number,
+        submissions=matrix.shape[0],
+        conditions=[
+            PqMushraCondition(
+                sample_id=sample_id,
+                kind=kind,
+                count=int(stats["count"][column]),
+                mean=_optional(stats["mean"][column]),
+                median=_optional(stats["median"][column]),
+                std=_optional(stats["std"][column]),
+                ci_low=_optional(stats["ci_low"][column]),
+                ci_high=_optional(stats["ci_high"][column]),
+                boot_ci_low=_optional(boot_low[column]),
+                boot_ci_high=_optional(boot_high[column]),
+                distribution=stats["distribution"][column].tolist(),
+            )
+            for column, (sample_id, kind) in enumerate(mushra_conditions(scores.test))
+        ],
+    )
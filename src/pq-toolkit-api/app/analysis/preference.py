@@ -0,0 +1,192 @@
+from collections.abc import Iterable
+from datetime import datetime
+from typing import NamedTuple
+
+import numpy as np
+
+from app.analysis.stats import binomial_test
+from app.schemas import (
+    PqIdentification,
+    PqPreferenceTestAnalysis,
+    PqQuestionPreference,
+    PqSelectionShare,
+    PqTestAB,
+    PqTestABResult,
+    PqTestABX,
+    PqTestABXResult,
+    PqTestTypes,
+)
+
+
+def _questions(test: PqTestAB | PqTestABX) -> list:
+    # ABX tests may have no questions, only the X sample is identified
+    return test.questions or []
+
+
+class SelectionCounts(NamedTuple):
+    """Selection counts of the AB and ABX tests of an experiment.
+
+    Counts are never modified, `count_selections` returns an updated copy,
+    so they can be shared between threads and extended as results arrive.
+    """
+
+    tests: list[PqTestAB | PqTestABX]
+    # Questions x samples selection counts of every test
+    selections: list[np.ndarray]
+    submissions: np.ndarray
+    # Results identifying the X sample, per ABX test
+    identified: np.ndarray
+    # Position (created_at, id) of the last counted result
+    cursor: tuple[datetime, int] | None = None
+    results: int = 0
+
+
+def empty_selection_counts(tests: Iterable[PqTestAB | PqTestABX]) -> SelectionCounts:
+    tests = sorted(tests, key=lambda t: t.test_number)
+    return SelectionCounts(
+        tests=tests,
+        selections=[
+            np.zeros((len(_questions(test)), len(test.samples)), dtype=np.int64)
+            for test in tests
+        ],
+        submissions=np.zeros(len(tests), dtype=np.int64),
+        identified=np.zeros(len(tests), dtype=np.int64),
+    )
+
+
+def count_selections(
+    counts: SelectionCounts,
+    results: Iterable[PqTestABResult | PqTestABXResult],
+    cursor: tuple[datetime, int] | None,
+) -> SelectionCounts:
+    """Returns the counts with the results added, counted up to `cursor`.
+
+    Selections of questions or samples not in the test are ignored.
+    """
+    sizes = [selections.size for selections in counts.selections]
+    offsets = np.concatenate(([0], np.cumsum(sizes)))
+    positions = {test.test_number: i for i, test in enumerate(counts.tests)}
+    questions = [
+        {question.question_id: n for n, question in enumerate(_questions(test))}
+        for test in counts.tests
+    ]
+    samples = [
+        {sample.sample_id: n for n, sample in enumerate(test.samples)}
+        for test in counts.tests
+    ]
+
+    cells, tests, identified = [], [], []
+    added = 0
+    for result in results:
+        added += 1
+        position = positions.get(result.test_number)
+        if position is None:
+            continue
+        tests.append(position)
+        if isinstance(result, PqTestABXResult):
+            identified.append(result.x_selected == result.x_sample_id)
+        else:
+            identified.append(False)
+        width = counts.selections[position].shape[1]
+        for selection in result.selections:
+            question = questions[position].get(selection.question_id)
+            sample = samples[position].get(selection.sample_id)
+            if question is not None and sample is not None:
+                cells.append(offsets[position] + question * width + sample)
+
+    flat = np.bincount(np.array(cells, dtype=np.int64), minlength=offsets[-1])
+    return SelectionCounts(
+        tests=counts.tests,
+        selections=[
+            old + new.reshape(old.shape)
+            for old, new in zip(counts.selections, np.split(flat, offsets[1:-1]))
+        ],
+        submissions=counts.submissions
+        + np.bincount(np.array(tests, dtype=np.int64), minlength=len(counts.tests)),
+        identified=counts.identified
+        + np.bincount(
+            np.array(tests, dtype=np.int64),
+            weights=np.array(identified, dtype=float),
+            minlength=len(counts.tests),
+        ).astype(np.int64),
+        cursor=cursor,
+        results=counts.results + added,
+    )
+
+
+def _optional(value: float) -> float | None:
+    return None if np.isnan(value) else float(value)
+
+
+def analyze_selections(counts: SelectionCounts) -> list[PqPreferenceTestAnalysis]:
+    """Computes selection shares and exact binomial tests of every test.
+
+    Each sample of a question is tested against the samples being selected
+    equally often, the X sample identification of ABX tests against
+    guessing. p-values of all tests are computed in a single call.
+    """
+    if not counts.tests:
+        return []
+    flat = np.concatenate([selections.ravel() for selections in counts.selections])
+    totals = np.concatenate(
+        [
+            np.repeat(selections.sum(axis=1), selections.shape[1])
+            for selections in counts.selections
+        ]
+    )
+    chance = np.concatenate(
+        [
+            np.full(selections.size, 1 / max(selections.shape[1], 1))
+            for selections in counts.selections
+        ]
+    )
+    offsets = np.cumsum([selections.size for selections in counts.selections])[:-1]
+    p_values = np.split(binomial_test(flat, totals, chance), offsets)
+    identification_p_values = binomial_test(
+        counts.identified, counts.submissions, 0.5, alternative="greater"
+    )
+
+    analysis = []
+    for position, test in enumerate(counts.tests):
+        selections = counts.selections[position]
+        test_p_values = p_values[position].reshape(selections.shape)
+        question_totals = selections.sum(axis=1)
+        identification = None
+        if PqTestTypes(test.type) == PqTestTypes.ABX:
+            trials = int(counts.submissions[position])
+            correct = int(counts.identified[position])
+            identification = PqIdentification(
+                trials=trials,
+                correct=correct,
+                rate=correct / trials if trials else None,
+                p_value=_optional(identification_p_values[position]),
+            )
+        analysis.append(
+            PqPreferenceTestAnalysis(
+                test_number=test.test_number,
+                type=test.type,
+                submissions=int(counts.submissions[position]),
+                questions=[
+                    PqQuestionPreference(
+                        question_id=question.question_id,
+                        selections=int(question_totals[row]),
+                        samples=[
+                            PqSelectionShare(
+                                sample_id=sample.sample_id,
+                                count=int(selections[row, column]),
+                                share=(
+                                    selections[row, column] / question_totals[row]
+                                    if question_totals[row]
+                                    else None
+                                ),
+                                p_value=_optional(test_p_values[row, column]),
+                            )
+                            for column, sample in enumerate(test.samples)
+                        ],
+                    )
+                    for row, question in enumerate(_questions(test))
+                ],
+                identification=identification,
+            )
+        )
+    return analysis
@@ -0,0 +1,55 @@
+from collections.abc import Iterable
+
+import numpy as np
+
+from app.analysis.mushra import MushraScores, mushra_conditions
+from app.schemas import PqScreenedSubmission, PqScreeningRules
+
+
+def screen_submissions(
+    scores: Iterable[MushraScores], rules: PqScreeningRules
+) -> list[PqScreenedSubmission]:
+    """Applies the ITU-R BS.1534 post-screening rules to every submission.
+
+    Each MUSHRA result is a trial. A trial fails the reference rule when the
+    hidden reference is scored below `reference_threshold` and the anchor
+    rule when any anchor is scored above `anchor_threshold`. A submission is
+    excluded when either rule fails in more than `max_failed_share` of its
+    trials.
+    """
+    submissions, reference_failed, anchor_failed = [], [], []
+    for test_scores in scores:
+        matrix = test_scores.matrix
+        kinds = np.array([kind for _, kind in mushra_conditions(test_scores.test)])
+        submissions.append(test_scores.submissions)
+        reference_failed.append(matrix[:, 0] < rules.reference_threshold)
+        anchors = matrix[:, kinds == "anchor"]
+        if rules.anchor_threshold is None or anchors.shape[1] == 0:
+            anchor_failed.append(np.zeros(len(matrix), dtype=bool))
+        else:
+            # Missing anchor scores (NaN) never fail
+            anchor_failed.append((anchors > rules.anchor_threshold).any(axis=1))
+    if not submissions:
+        return []
+
+    names, index = np.unique(np.concatenate(submissions), return_inverse=True)
+    trials = np.bincount(index, minlength=len(names))
+    reference_failures = np.bincount(
+        index, weights=np.concatenate(reference_failed), minlength=len(names)
+    ).astype(int)
+    anchor_failures = np.bincount(
+        index, weights=np.concatenate(anchor_failed), minlength=len(names)
+    ).astype(int)
+    excluded = (reference_failures > rules.max_failed_share * trials) | (
+        anchor_failures > rules.max_failed_share * trials
+    )
+    return [
+        PqScreenedSubmission(
+            experiment_use=str(name),
+            trials=int(trials[i]),
+            reference_failures=int(reference_failures[i]),
+            anchor_failures=int(anchor_failures[i]),
+            excluded=bool(excluded[i]),
+        )
+        for i, name in enumerate(names)
+    ]
@@ -1,21 +1,29 @@
-from typing import Generator, Annotated
+from typing import AsyncGenerator, Generator, Annotated
 
 import jwt
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Query, Request
 from fastapi.security import OAuth2PasswordBearer
 from jwt import InvalidTokenError
 from pydantic import ValidationError
 from sqlalchemy.exc import NoResultFound
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.db import engine
+from app.analysis.bootstrap import BootstrapPool
+from app.core.db import engine, async_engine
+from app.core.exports import ExportJobs
 from app.core.sample_manager import SampleManager
+from app.core.static_publisher import StaticPublisher
 from app.core.config import settings
 from app.core.security import ALGORITHM
 from app.models import Admin
-from app.schemas import TokenPayload
+from app.schemas import PqBootstrapOptions, PqScreeningRules, TokenPayload
 
 reusable_oauth2 = OAuth2PasswordBearer(tokenUrl=f"/api{settings.API_V1_STR}/auth/login")
+# For routes open to anyone, with options reserved to admins
+optional_oauth2 = OAuth2PasswordBearer(
+    tokenUrl=f"/api{settings.API_V1_STR}/auth/login", auto_error=False
+)
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -23,12 +31,52 @@ def get_db() -> Generator[Session, None, None]:
         yield session
 
 
-def get_sample_manager() -> Generator[SampleManager, None, None]:
-    session = SampleManager.from_settings(settings)
-    yield session
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    # Objects are not expired on commit, lazy refreshes are not possible in async code
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+
+def get_sample_manager(request: Request) -> SampleManager:
+    # Created once per worker on startup, the MinIO client is thread safe
+    return request.app.state.sample_manager
+
+
+def get_static_publisher(request: Request) -> StaticPublisher | None:
+    # None when static publishing is disabled
+    return request.app.state.static_publisher
+
+
+def get_export_jobs(request: Request) -> ExportJobs:
+    return request.app.state.export_jobs
+
+
+def get_bootstrap_pool(request: Request) -> BootstrapPool:
+    return request.app.state.bootstrap_pool
+
+
+def get_screening_thresholds(
+    reference_threshold: int = 90,
+    anchor_threshold: int | None = 90,
+    max_failed_share: float = Query(default=0.15, ge=0, le=1),
+) -> PqScreeningRules:
+    return PqScreeningRules(
+        reference_threshold=reference_threshold,
+        anchor_threshold=anchor_threshold,
+        max_failed_share=max_failed_share,
+    )
+
+
+def get_screening_rules(
+    rules: Annotated[PqScreeningRules, Depends(get_screening_thresholds)],
+    apply_screening: bool = False,
+) -> PqScreeningRules | None:
+    # Post-screening of MUSHRA listeners, only applied when requested
+    return rules if apply_screening else None
 
 
 SessionDep = Annotated[Session, Depends(get_db)]
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_db)]
 TokenDep = Annotated[str, Depends(reusable_oauth2)]
 
 
@@ -47,5 +95,32 @@ def get_current_admin(session: SessionDep, token: TokenDep) -> Admin:
     return admin
 
 
+def get_bootstrap_options(
+    session: SessionDep,
+    token: Annotated[str | None, Depends(optional_oauth2)],
+    bootstrap: int | None = Query(default=None, ge=100, le=10000),
+    seed: int = Query(default=0, ge=0),
+) -> PqBootstrapOptions | None:
+    # Number of resamples, bootstrap intervals are only computed when requested
+    if bootstrap is None:
+        return None
+    options = PqBootstrapOptions(resamples=bootstrap, seed=seed)
+    # Every other seed and number of resamples is computed and cached anew
+    if options != PqBootstrapOptions():
+        if token is None:
+            raise HTTPException(
+                status_code=401,
+                detail="Bootstrap options other than the defaults require an admin",
+            )
+        get_current_admin(session, token)
+    return options
+
+
 SampleManagerDep = Annotated[SampleManager, Depends(get_sample_manager)]
+StaticPublisherDep = Annotated[StaticPublisher | None, Depends(get_static_publisher)]
+ScreeningRulesDep = Annotated[PqScreeningRules, Depends(get_screening_thresholds)]
+ScreeningDep = Annotated[PqScreeningRules | None, Depends(get_screening_rules)]
+ExportJobsDep = Annotated[ExportJobs, Depends(get_export_jobs)]
+BootstrapPoolDep = Annotated[BootstrapPool, Depends(get_bootstrap_pool)]
+BootstrapDep = Annotated[PqBootstrapOptions | None, Depends(get_bootstrap_options)]
 CurrentAdmin = Annotated[Admin, Depends(get_current_admin)]
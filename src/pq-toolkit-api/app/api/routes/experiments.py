@@ -1,22 +1,84 @@
-from fastapi import APIRouter, UploadFile, Request, Response, Form
+from anyio.to_thread import run_sync
+from fastapi import APIRouter, BackgroundTasks, UploadFile, Request, Response, Form, Query
 from fastapi.responses import StreamingResponse
-import zipfile
-import os
-from app.api.deps import SessionDep, SampleManagerDep, CurrentAdmin
+from sqlmodel import Session
+from app.api.deps import (
+    SessionDep,
+    AsyncSessionDep,
+    SampleManagerDep,
+    StaticPublisherDep,
+    ExportJobsDep,
+    ScreeningDep,
+    ScreeningRulesDep,
+    BootstrapDep,
+    BootstrapPoolDep,
+    CurrentAdmin,
+)
 from app.schemas import (
     PqExperimentsList,
     PqExperimentName,
     PqSuccessResponse,
     PqExperiment,
     PqTestResultsList,
-PqSamplePaths,
+    PqSamplePaths,
+    PqExperimentVersion,
+    PqExperimentVersionsList,
+    PqSampleObject,
+    PqConfigDiff,
+    PqSampleManifest,
+    PqImportSummary,
+    PqExportRequest,
+    PqExportJob,
+    PqMushraAnalysis,
+    PqResultAggregates,
+    PqApeAnalysis,
+    PqPreferenceAnalysis,
+    PqScreeningReport,
 )
+from app.core.cache import CachedResponse
+from app.core.columnar import COLUMNAR_FORMATS
+from app.core.db import engine
+from app.core.exports import ExportJobs
+from app.core.sample_manager import SampleManager
+from app.core.static_publisher import StaticPublisher
 import app.crud as crud
-from typing import List
-from io import StringIO, BytesIO
+from typing import List, Literal
 
 router = APIRouter()
 
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def cached_json_response(
+    request: Request, cached: CachedResponse, cache_control: str | None = None
+) -> Response:
+    headers = {"ETag": f'"{cached.version}"'}
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    return Response(
+        content=cached.content, media_type="application/json", headers=headers
+    )
+
+
+def republish_static_files(
+    sample_manager: SampleManager,
+    static_publisher: StaticPublisher | None,
+    experiment_name: str,
+) -> None:
+    # Runs after the response is sent, with its own session
+    if static_publisher is None:
+        return
+    with Session(engine) as session:
+        try:
+            crud.publish_static_experiment(
+                session, sample_manager, static_publisher, experiment_name
+            )
+        except (crud.ExperimentNotFound, crud.ExperimentNotConfigured):
+            # Published once the config is uploaded
+            pass
+
 
 @router.get("/", response_model=PqExperimentsList)
 def get_experiments(session: SessionDep):
@@ -32,40 +94,200 @@ def add_experiment(
     return crud.get_experiments(session)
 
 
-@router.post("/{experiment_name}", response_model=PqSuccessResponse)
+@router.post("/{experiment_name}/clone", response_model=PqExperimentsList)
+def clone_experiment(
+    session: SessionDep,
+    sample_manager: SampleManagerDep,
+    static_publisher: StaticPublisherDep,
+    background_tasks: BackgroundTasks,
+    admin: CurrentAdmin,
+    experiment_name: str,
+    clone_name: PqExperimentName,
+):
+    crud.clone_experiment(session, sample_manager, experiment_name, clone_name.name)
+    background_tasks.add_task(
+        republish_static_files, sample_manager, static_publisher, clone_name.name
+    )
+    return crud.get_experiments(session)
+
+
+@router.post("/{experiment_name}", response_model=PqConfigDiff)
 def set_up_experiment(
-    session: SessionDep, admin: CurrentAdmin, experiment_name: str, file: UploadFile
+    session: SessionDep,
+    sample_manager: SampleManagerDep,
+    static_publisher: StaticPublisherDep,
+    background_tasks: BackgroundTasks,
+    admin: CurrentAdmin,
+    experiment_name: str,
+    file: UploadFile,
 ):
-    crud.upload_experiment_config(session, experiment_name, file)
-    return PqSuccessResponse(success=True)
+    diff = crud.upload_experiment_config(session, experiment_name, file)
+    background_tasks.add_task(
+        republish_static_files, sample_manager, static_publisher, experiment_name
+    )
+    return diff
 
 
 @router.get("/{experiment_name}", response_model=PqExperiment)
-def get_experiment(session: SessionDep, experiment_name: str):
-    return crud.get_experiment_by_name(session, experiment_name)
+async def get_experiment(
+    session: AsyncSessionDep, experiment_name: str, request: Request
+):
+    config = await crud.get_experiment_config_json_async(session, experiment_name)
+    return cached_json_response(request, config)
+
+
+@router.get("/{experiment_name}/manifest", response_model=PqSampleManifest)
+def get_sample_manifest(
+    session: SessionDep,
+    sample_manager: SampleManagerDep,
+    experiment_name: str,
+    request: Request,
+):
+    manifest = crud.get_sample_manifest_json(session, sample_manager, experiment_name)
+    return cached_json_response(request, manifest)
+
+
+@router.get("/{experiment_name}/archive", response_class=StreamingResponse)
+def download_samples_archive(
+    session: SessionDep,
+    sample_manager: SampleManagerDep,
+    experiment_name: str,
+    archive_format: str = "zip",
+    test_number: int | None = None,
+):
+    chunks, media_type = crud.archive_experiment_samples(
+        session, sample_manager, experiment_name, archive_format, test_number
+    )
+    file_name = experiment_name if test_number is None else f"{experiment_name}_test_{test_number}"
+    headers = {
+        "Content-Disposition": f"attachment; filename={file_name}.{archive_format}"
+    }
+    return StreamingResponse(chunks, media_type=media_type, headers=headers)
+
+
+@router.get("/{experiment_name}/export", response_class=StreamingResponse)
+def export_experiment(
+    session: SessionDep,
+    sample_manager: SampleManagerDep,
+    admin: CurrentAdmin,
+    experiment_name: str,
+):
+    crud.get_db_experiment_by_name(session, experiment_name)
+    chunks = stream_with_session(
+        crud.export_experiment_bundle, sample_manager, experiment_name
+    )
+    headers = {
+        "Content-Disposition": f"attachment; filename={experiment_name}_bundle.zip"
+    }
+    return StreamingResponse(chunks, media_type="application/zip", headers=headers)
+
+
+@router.post("/{experiment_name}/import", response_model=PqImportSummary)
+def import_experiment(
+    session: SessionDep,
+    sample_manager: SampleManagerDep,
+    static_publisher: StaticPublisherDep,
+    background_tasks: BackgroundTasks,
+    admin: CurrentAdmin,
+    experiment_name: str,
+    file: UploadFile,
+):
+    summary = crud.import_experiment_bundle(
+        session, sample_manager, experiment_name, file
+    )
+    background_tasks.add_task(
+        republish_static_files, sample_manager, static_publisher, experiment_name
+    )
+    return summary
+
+
+@router.post("/{experiment_name}/static", response_model=list[str])
+def publish_static_files(
+    session: SessionDep,
+    sample_manager: SampleManagerDep,
+    static_publisher: StaticPublisherDep,
+    admin: CurrentAdmin,
+    experiment_name: str,
+):
+    return crud.publish_static_experiment(
+        session, sample_manager, static_publisher, experiment_name
+    )
+
+
+@router.post("/{experiment_name}/versions", response_model=PqExperimentVersion)
+def publish_experiment_version(
+    session: SessionDep,
+    sample_manager: SampleManagerDep,
+    admin: CurrentAdmin,
+    experiment_name: str,
+):
+    return crud.publish_experiment_version(session, sample_manager, experiment_name)
+
+
+@router.get("/{experiment_name}/versions", response_model=PqExperimentVersionsList)
+def get_experiment_versions(session: SessionDep, experiment_name: str):
+    return crud.get_experiment_versions(session, experiment_name)
+
+
+@router.get("/{experiment_name}/versions/{version}", response_model=PqExperiment)
+async def get_experiment_version(
+    session: AsyncSessionDep, experiment_name: str, version: int, request: Request
+):
+    config = await crud.get_experiment_version_json_async(
+        session, experiment_name, version
+    )
+    return cached_json_response(request, config, IMMUTABLE_CACHE_CONTROL)
+
+
+@router.get(
+    "/{experiment_name}/versions/{version}/manifest",
+    response_model=list[PqSampleObject],
+)
+async def get_experiment_version_manifest(
+    session: AsyncSessionDep, experiment_name: str, version: int, request: Request
+):
+    manifest = await crud.get_experiment_version_json_async(
+        session, experiment_name, version, manifest=True
+    )
+    return cached_json_response(request, manifest, IMMUTABLE_CACHE_CONTROL)
 
 
 @router.delete("/", response_model=PqExperimentsList)
 def delete_experiment(
-    session: SessionDep, admin: CurrentAdmin, experiment_name: PqExperimentName
+    session: SessionDep,
+    static_publisher: StaticPublisherDep,
+    export_jobs: ExportJobsDep,
+    admin: CurrentAdmin,
+    experiment_name: PqExperimentName,
 ):
     crud.remove_experiment_by_name(session, experiment_name.name)
+    if static_publisher is not None:
+        static_publisher.remove(experiment_name.name)
+    export_jobs.remove(f"{experiment_name.name}/")
     return crud.get_experiments(session)
 
 
 @router.get("/{experiment_name}/samples", response_model=list[str])
-def get_samples(sample_manager: SampleManagerDep, experiment_name: str):
-    return crud.get_experiment_samples(sample_manager, experiment_name)
+def get_samples(
+    sample_manager: SampleManagerDep, experiment_name: str, request: Request
+):
+    samples = crud.get_experiment_samples_json(sample_manager, experiment_name)
+    return cached_json_response(request, samples)
 
 
 @router.post("/{experiment_name}/samples", response_model=PqSuccessResponse)
 def upload_sample(
     sample_manager: SampleManagerDep,
+    static_publisher: StaticPublisherDep,
+    background_tasks: BackgroundTasks,
     admin: CurrentAdmin,
     experiment_name: str,
     file: UploadFile,
 ):
     crud.upload_experiment_sample(sample_manager, experiment_name, file)
+    background_tasks.add_task(
+        republish_static_files, sample_manager, static_publisher, experiment_name
+    )
     return PqSuccessResponse(success=True)
 
 
@@ -73,6 +295,8 @@ def upload_sample(
 def upload_sample_v2(
     session: SessionDep,
     sample_manager: SampleManagerDep,
+    static_publisher: StaticPublisherDep,
+    background_tasks: BackgroundTasks,
     experiment_name: str,
     files: List[UploadFile] = Form(default_factory=list),
     titles: List[str] = Form(default_factory=list),
@@ -90,6 +314,9 @@ def upload_sample_v2(
         for sample_id in sample_ids:
             samples_paths.append(crud.assign_sample_to_experiment(session, sample_manager, experiment_name, sample_id))
 
+    background_tasks.add_task(
+        republish_static_files, sample_manager, static_publisher, experiment_name
+    )
     return PqSamplePaths(asset_path=samples_paths)
 
 @router.get("/{experiment_name}/samples/{filename}", response_model=UploadFile)
@@ -99,58 +326,105 @@ async def get_sample(
     return crud.get_experiment_sample(sample_manager, experiment_name, filename)
 
 @router.get("/{experiment_name}/{test_number}/download_csv", response_class=Response)
-def download_results_csv(session: SessionDep, experiment_name: str, test_number: int, test_type: str):
-    experiment = crud.get_experiment_by_name(session, experiment_name)
-    results = crud.get_experiment_tests_results(session, experiment_name)
-
-    csv_data = crud.generate_csv_for_test(session, experiment, results, test_number)
-
-    output = StringIO()
-    output.write(csv_data)
-    output.seek(0)
+def download_results_csv(
+    session: SessionDep,
+    screening: ScreeningDep,
+    experiment_name: str,
+    test_number: int,
+    test_type: str,
+):
+    excluded = crud.get_screening_exclusions(session, experiment_name, screening)
+    experiment, table = crud.results_csv_table(
+        session, experiment_name, test_number, excluded
+    )
     response = StreamingResponse(
-        iter([output.getvalue()]),
+        stream_with_session(crud.stream_results_csv, experiment, table, excluded),
         media_type="text/csv",
     )
-    response.headers["Content-Disposition"] = f"attachment; filename={experiment.name}_test_{test_number}_{test_type}.csv"
+    response.headers["Content-Disposition"] = f"attachment; filename={experiment.full_name}_test_{test_number}_{test_type}.csv"
     return response
 
+async def download_export(
+    session: Session,
+    export_jobs: ExportJobs,
+    experiment_name: str,
+    export: PqExportRequest,
+) -> Response:
+    # Rendered in the export pool, possibly of another API worker, a stored
+    # export is sent right away. An export still rendering after a short wait
+    # is answered with 202 and its job, to be polled under /exports/<jobId>
+    job = await run_sync(
+        crud.submit_export_job, session, export_jobs, engine, experiment_name, export
+    )
+    if job.status != "done":
+        job = await crud.wait_for_export_job(export_jobs, experiment_name, job.job_id)
+    if job.status == "pending":
+        return Response(
+            content=job.model_dump_json(by_alias=True),
+            status_code=202,
+            media_type="application/json",
+        )
+    job, content = await run_sync(
+        crud.get_export_artifact, export_jobs, experiment_name, job.job_id
+    )
+    headers = {"Content-Disposition": f"attachment; filename={job.file_name}"}
+    return StreamingResponse(content, media_type=job.media_type, headers=headers)
+
 @router.get("/{experiment_name}/download_csv", response_class=Response)
-def download_results_csv_all(session: SessionDep, experiment_name: str):
-
-    experiment = crud.get_experiment_by_name(session, experiment_name)
-    results = crud.get_experiment_tests_results(session, experiment_name)
-
-    temp_dir = "temp_files"
-    os.makedirs(temp_dir, exist_ok=True)
-    csv_files = []
-    for test_it in range(len(experiment.tests)):
-        csv_file = os.path.join(temp_dir, f"{experiment.name}_test_{test_it+1}_{experiment.tests[test_it].type}.csv")
-        csv_files.append(csv_file)
-        csv_data = crud.generate_csv_for_test(session, experiment, results, test_it+1)
-        with open(csv_file, "w", newline="") as f:
-            f.write(csv_data)
-
-    zip_buffer = BytesIO()
-    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
-        for csv_file in csv_files:
-            zip_file.write(csv_file, arcname=os.path.basename(csv_file))
-
-    zip_buffer.seek(0)
-    for csv_file in csv_files:
-        os.remove(csv_file)
-    os.rmdir(temp_dir)
-
-    headers = {"Content-Disposition": f"attachment; filename={experiment.name}.zip"}
-    return StreamingResponse(zip_buffer, media_type="application/zip", headers=headers)
+async def download_results_csv_all(
+    session: SessionDep,
+    export_jobs: ExportJobsDep,
+    screening: ScreeningDep,
+    experiment_name: str,
+):
+    return await download_export(
+        session,
+        export_jobs,
+        experiment_name,
+        PqExportRequest(kind="csv", screening=screening),
+    )
 
 @router.get("/{experiment_name}/download_pdf", response_class=Response)
-def download_results_pdf_all(session: SessionDep, experiment_name: str):
-    experiment = crud.get_experiment_by_name(session, experiment_name)
-    results = crud.get_experiment_tests_results(session, experiment_name)
-    pdf_data = crud.generate_pdf_for_experiment(session, experiment, experiment_name, results)
-    headers = {"Content-Disposition": f"attachment; filename={experiment_name}_all_tests.pdf"}
-    return StreamingResponse(iter([pdf_data]), media_type="application/pdf", headers=headers)
+async def download_results_pdf_all(
+    session: SessionDep,
+    export_jobs: ExportJobsDep,
+    screening: ScreeningDep,
+    experiment_name: str,
+):
+    return await download_export(
+        session,
+        export_jobs,
+        experiment_name,
+        PqExportRequest(kind="pdf", screening=screening),
+    )
+
+
+@router.post("/{experiment_name}/exports", response_model=PqExportJob)
+def start_export(
+    session: SessionDep,
+    export_jobs: ExportJobsDep,
+    experiment_name: str,
+    export: PqExportRequest,
+):
+    return crud.submit_export_job(
+        session, export_jobs, engine, experiment_name, export
+    )
+
+
+@router.get("/{experiment_name}/exports/{job_id}", response_model=PqExportJob)
+def get_export_job(export_jobs: ExportJobsDep, experiment_name: str, job_id: str):
+    return crud.get_export_job(export_jobs, experiment_name, job_id)
+
+
+@router.get(
+    "/{experiment_name}/exports/{job_id}/download", response_class=StreamingResponse
+)
+def download_export_artifact(
+    export_jobs: ExportJobsDep, experiment_name: str, job_id: str
+):
+    job, content = crud.get_export_artifact(export_jobs, experiment_name, job_id)
+    headers = {"Content-Disposition": f"attachment; filename={job.file_name}"}
+    return StreamingResponse(content, media_type=job.media_type, headers=headers)
 
 
 @router.delete(
@@ -158,27 +432,167 @@ def download_results_pdf_all(session: SessionDep, experiment_name: str):
 )
 def delete_sample(
     sample_manager: SampleManagerDep,
+    static_publisher: StaticPublisherDep,
+    background_tasks: BackgroundTasks,
     admin: CurrentAdmin,
     experiment_name: str,
     filename: str,
 ):
     crud.delete_experiment_sample(sample_manager, experiment_name, filename)
+    background_tasks.add_task(
+        republish_static_files, sample_manager, static_publisher, experiment_name
+    )
     return PqSuccessResponse(success=True)
 
 
 @router.get("/{experiment_name}/results", response_model=PqTestResultsList)
-def get_results(session: SessionDep, experiment_name: str):
-    return crud.get_experiment_tests_results(session, experiment_name)
+def get_results(
+    session: SessionDep,
+    screening: ScreeningDep,
+    experiment_name: str,
+    since: str | None = None,
+    limit: int | None = Query(default=None, gt=0),
+):
+    excluded = crud.get_screening_exclusions(session, experiment_name, screening)
+    return crud.get_experiment_tests_results(
+        session, experiment_name, since=since, limit=limit, excluded=excluded
+    )
 
 
 @router.post("/{experiment_name}/results", response_model=PqTestResultsList)
-async def upload_results(session: SessionDep, experiment_name: str, result_json: Request):
+async def upload_results(
+    session: AsyncSessionDep, experiment_name: str, result_json: Request
+):
     res = await result_json.json()
-    return crud.add_experiment_result(session, experiment_name, res)
+    return await crud.add_experiment_result_async(session, experiment_name, res)
+
+
+def stream_with_session(stream, *args):
+    # The response is streamed after the request session is closed
+    with Session(engine) as session:
+        yield from stream(session, *args)
+
+
+@router.get("/{experiment_name}/results/stream", response_class=StreamingResponse)
+def stream_results(
+    session: SessionDep,
+    screening: ScreeningDep,
+    experiment_name: str,
+    results_format: Literal["ndjson", "json"] = "ndjson",
+    test_number: int | None = None,
+    submission: str | None = None,
+    since: str | None = None,
+):
+    experiment = crud.get_db_experiment_by_name(session, experiment_name)
+    if since is not None:
+        # Rejected before the response starts
+        crud.decode_results_cursor(since)
+    excluded = crud.get_screening_exclusions(session, experiment_name, screening)
+    media_type = (
+        "application/x-ndjson" if results_format == "ndjson" else "application/json"
+    )
+    return StreamingResponse(
+        stream_with_session(
+            crud.stream_experiment_results,
+            experiment,
+            results_format,
+            test_number,
+            submission,
+            since,
+            excluded,
+        ),
+        media_type=media_type,
+    )
+
+
+@router.get("/{experiment_name}/results/columnar", response_class=StreamingResponse)
+def download_columnar_results(
+    session: SessionDep,
+    screening: ScreeningDep,
+    experiment_name: str,
+    test_number: int,
+    columnar_format: Literal["parquet", "arrow"] = "parquet",
+):
+    experiment, table = crud.columnar_results_table(
+        session, experiment_name, test_number
+    )
+    excluded = crud.get_screening_exclusions(session, experiment_name, screening)
+    extension = "parquet" if columnar_format == "parquet" else "arrows"
+    headers = {
+        "Content-Disposition": f"attachment; filename={experiment_name}_test_{test_number}.{extension}"
+    }
+    return StreamingResponse(
+        stream_with_session(
+            crud.stream_columnar_results, experiment, table, columnar_format, excluded
+        ),
+        media_type=COLUMNAR_FORMATS[columnar_format],
+        headers=headers,
+    )
+
+
+@router.get("/{experiment_name}/analysis/mushra", response_model=PqMushraAnalysis)
+def get_mushra_analysis(
+    request: Request,
+    session: SessionDep,
+    screening: ScreeningDep,
+    bootstrap: BootstrapDep,
+    pool: BootstrapPoolDep,
+    experiment_name: str,
+):
+    return cached_json_response(
+        request,
+        crud.get_mushra_analysis_json(
+            session, experiment_name, screening, bootstrap, pool
+        ),
+    )
+
+
+@router.get("/{experiment_name}/analysis/aggregates", response_model=PqResultAggregates)
+def get_result_aggregates(session: SessionDep, experiment_name: str):
+    return crud.get_result_aggregates(session, experiment_name)
+
+
+@router.get("/{experiment_name}/analysis/ape", response_model=PqApeAnalysis)
+def get_ape_analysis(
+    request: Request,
+    session: SessionDep,
+    bootstrap: BootstrapDep,
+    pool: BootstrapPoolDep,
+    experiment_name: str,
+):
+    return cached_json_response(
+        request, crud.get_ape_analysis_json(session, experiment_name, bootstrap, pool)
+    )
+
+
+@router.get("/{experiment_name}/analysis/preference", response_model=PqPreferenceAnalysis)
+def get_preference_analysis(request: Request, session: SessionDep, experiment_name: str):
+    return cached_json_response(
+        request, crud.get_preference_analysis_json(session, experiment_name)
+    )
+
+
+@router.get("/{experiment_name}/analysis/screening", response_model=PqScreeningReport)
+def get_screening_report(
+    session: SessionDep,
+    screening: ScreeningRulesDep,
+    experiment_name: str,
+):
+    return crud.get_screening_report(session, experiment_name, screening)
 
 
 @router.get(
     "/{experiment_name}/results/{result_name}", response_model=PqTestResultsList
 )
-def get_test_results(session: SessionDep, experiment_name: str, result_name: str):
-    return crud.get_experiment_tests_results(session, experiment_name, result_name)
+def get_test_results(
+    session: SessionDep,
+    screening: ScreeningDep,
+    experiment_name: str,
+    result_name: str,
+    since: str | None = None,
+    limit: int | None = Query(default=None, gt=0),
+):
+    excluded = crud.get_screening_exclusions(session, experiment_name, screening)
+    return crud.get_experiment_tests_results(
+        session, experiment_name, result_name, since=since, limit=limit, excluded=excluded
+    )
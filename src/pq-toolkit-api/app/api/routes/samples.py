@@ -1,7 +1,7 @@
 from fastapi import APIRouter, UploadFile, Form
 from app.schemas import PqSampleRating, PqSuccessResponse, PqSampleRatingList
 import app.crud as crud
-from app.api.deps import SessionDep, SampleManagerDep
+from app.api.deps import SessionDep, AsyncSessionDep, SampleManagerDep
 
 
 router = APIRouter()
@@ -10,9 +10,9 @@ router = APIRouter()
 @router.put("/rate", response_model=PqSampleRating)
 async def rate_sample(
         request: PqSampleRating,
-        session: SessionDep,
+        session: AsyncSessionDep,
 ):
-    updated_sample = crud.add_sample_rating(session, request)
+    updated_sample = await crud.add_sample_rating_async(session, request)
     return updated_sample
 
 
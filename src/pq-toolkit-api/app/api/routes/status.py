@@ -1,9 +1,25 @@
-from fastapi import APIRouter
-from app.schemas import PqApiStatus
+import os
+
+from fastapi import APIRouter, Request
+from app.core.db import engine, async_engine
+from app.core.pool_metrics import get_pool_status, get_threadpool_status
+from app.schemas import PqApiStatus, PqPoolsStatus
 
 router = APIRouter()
 
 
 @router.get("/", response_model=PqApiStatus)
-def get_status():
-    return PqApiStatus()
+def get_status(request: Request):
+    return PqApiStatus(
+        worker_pid=os.getpid(),
+        startup_seconds=getattr(request.app.state, "startup_seconds", None),
+    )
+
+
+@router.get("/pools", response_model=PqPoolsStatus)
+async def get_pools_status():
+    return PqPoolsStatus(
+        database=get_pool_status(engine),
+        async_database=get_pool_status(async_engine.sync_engine),
+        threadpool=get_threadpool_status(),
+    )
@@ -0,0 +1,174 @@
+import queue
+import tarfile
+import threading
+import time
+import zipfile
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple, TypeVar
+
+T = TypeVar("T")
+
+
+class ArchiveEntry(NamedTuple):
+    name: str
+    size: int
+
+
+class ChunkBuffer:
+    """Write-only file object collecting what the archive writers produce."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        # Written chunks can still be drained
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+# Marks the end of a stream produced by `ordered_streams`
+_END = object()
+
+
+def ordered_streams(
+    func: Callable[[T], Iterable[bytes]],
+    items: Iterable[T],
+    workers: int,
+    max_chunks: int = 16,
+) -> Iterator[Iterator[bytes]]:
+    """Runs `func` on up to `workers` items at a time, yields their chunk streams in order.
+
+    Each item is produced by a thread into a queue of at most `max_chunks`
+    chunks, so items running ahead of the consumer wait instead of holding
+    their whole output. A stream must be consumed before the next one is
+    taken, errors of `func` are raised by the stream.
+    """
+    stopped = threading.Event()
+
+    def put(chunks: queue.Queue, value) -> bool:
+        while not stopped.is_set():
+            try:
+                chunks.put(value, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce(item: T, chunks: queue.Queue) -> None:
+        try:
+            for chunk in func(item):
+                if not put(chunks, chunk):
+                    return
+        except Exception as e:
+            put(chunks, e)
+        else:
+            put(chunks, _END)
+
+    def consume(chunks: queue.Queue) -> Iterator[bytes]:
+        while (chunk := chunks.get()) is not _END:
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+
+    pending: deque = deque()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        try:
+            for item in items:
+                if len(pending) >= workers:
+                    yield consume(pending.popleft())
+                chunks = queue.Queue(maxsize=max_chunks)
+                executor.submit(produce, item, chunks)
+                pending.append(chunks)
+            while pending:
+                yield consume(pending.popleft())
+        finally:
+            # Producers of an abandoned archive stop instead of waiting for space
+            stopped.set()
+
+
+def stream_zip(
+    files: Iterable[tuple[ArchiveEntry, bytes | Iterable[bytes]]],
+    compression: int = zipfile.ZIP_STORED,
+) -> Iterator[bytes]:
+    """Writes a ZIP archive chunk by chunk.
+
+    The content of a file is either bytes or an iterable of byte chunks,
+    which is written as it is read, so the file is never held in memory.
+    Files are stored uncompressed by default, audio doesn't compress anyway.
+    """
+    buffer = ChunkBuffer()
+    with zipfile.ZipFile(buffer, "w", compression=compression) as archive:
+        for entry, data in files:
+            info = zipfile.ZipInfo(entry.name, time.localtime()[:6])
+            info.compress_type = compression
+            # A known size lets files over 2 GiB be written with ZIP64 headers
+            info.file_size = entry.size
+            if isinstance(data, bytes):
+                archive.writestr(info, data)
+            else:
+                with archive.open(info, "w") as file:
+                    for chunk in data:
+                        file.write(chunk)
+                        if written := buffer.drain():
+                            yield written
+            yield buffer.drain()
+    yield buffer.drain()
+
+
+def _file_chunks(data: bytes | Iterable[bytes]) -> Iterable[bytes]:
+    return [data] if isinstance(data, bytes) else data
+
+
+def stream_tar(
+    files: Iterable[tuple[ArchiveEntry, bytes | Iterable[bytes]]],
+) -> Iterator[bytes]:
+    """Writes a tar archive chunk by chunk.
+
+    Headers are written with `tarfile`, the content of each file as it is
+    read, so it must match the size of its entry, as listed by the storage.
+    """
+    written = 0
+    for entry, data in files:
+        info = tarfile.TarInfo(entry.name)
+        info.size = len(data) if isinstance(data, bytes) else entry.size
+        info.mtime = int(time.time())
+        header = info.tobuf(tarfile.DEFAULT_FORMAT, tarfile.ENCODING, "surrogateescape")
+        yield header
+        size = 0
+        for chunk in _file_chunks(data):
+            size += len(chunk)
+            yield chunk
+        if size != info.size:
+            raise ValueError(f"{entry.name} has {size} bytes instead of {info.size}")
+        padding = -size % tarfile.BLOCKSIZE
+        yield tarfile.NUL * padding
+        written += len(header) + size + padding
+    # End of archive marker, padded to a full record like `tarfile` does
+    end = 2 * tarfile.BLOCKSIZE
+    end += -(written + end) % tarfile.RECORDSIZE
+    yield tarfile.NUL * end
+
+
+ARCHIVE_FORMATS = {
+    "zip": (stream_zip, "application/zip"),
+    "tar": (stream_tar, "application/x-tar"),
+}
@@ -0,0 +1,112 @@
+import struct
+
+# Enough to reach the data chunk of a WAV file or the first frame of an MP3 file
+HEADER_SIZE = 64 * 1024
+
+_MP3_BITRATES = {
+    # (MPEG version 1, layer) -> kbps by bitrate index
+    (True, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (True, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (True, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (False, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (False, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (False, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+_MP3_SAMPLE_RATES = {
+    3: [44100, 48000, 32000],
+    2: [22050, 24000, 16000],
+    0: [11025, 12000, 8000],
+}
+
+
+def wav_duration(header: bytes, size: int) -> float | None:
+    if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+        return None
+    byte_rate = None
+    offset = 12
+    while offset + 8 <= len(header):
+        chunk_id = header[offset : offset + 4]
+        (chunk_size,) = struct.unpack_from("<I", header, offset + 4)
+        if chunk_id == b"fmt " and offset + 20 <= len(header):
+            (byte_rate,) = struct.unpack_from("<I", header, offset + 16)
+        elif chunk_id == b"data":
+            if not byte_rate:
+                return None
+            # Streamed files may leave the data size unset
+            data_size = min(chunk_size, size - offset - 8)
+            return data_size / byte_rate
+        offset += 8 + chunk_size + chunk_size % 2
+    return None
+
+
+def _id3_size(header: bytes) -> int:
+    if header[:3] != b"ID3" or len(header) < 10:
+        return 0
+    tag_size = 0
+    for byte in header[6:10]:
+        tag_size = (tag_size << 7) | (byte & 0x7F)
+    return 10 + tag_size
+
+
+def mp3_duration(header: bytes, size: int) -> float | None:
+    start = _id3_size(header)
+    offset = start
+    while offset + 4 <= len(header):
+        if header[offset] == 0xFF and header[offset + 1] & 0xE0 == 0xE0:
+            break
+        offset += 1
+    else:
+        return None
+
+    (frame_header,) = struct.unpack_from(">I", header, offset)
+    version_bits = (frame_header >> 19) & 0x3
+    layer = 4 - ((frame_header >> 17) & 0x3)
+    bitrate_index = (frame_header >> 12) & 0xF
+    sample_rate_index = (frame_header >> 10) & 0x3
+    channel_mode = (frame_header >> 6) & 0x3
+    if (
+        version_bits == 1
+        or layer == 4
+        or bitrate_index in (0, 15)
+        or sample_rate_index == 3
+    ):
+        return None
+    mpeg1 = version_bits == 3
+    bitrate = _MP3_BITRATES[(mpeg1, layer)][bitrate_index] * 1000
+    sample_rate = _MP3_SAMPLE_RATES[version_bits][sample_rate_index]
+    samples_per_frame = 384 if layer == 1 else 1152 if mpeg1 or layer == 2 else 576
+
+    # VBR files announce their frame count in a Xing/Info header in the first frame
+    if layer == 3:
+        mono = channel_mode == 3
+        side_info = (17 if mono else 32) if mpeg1 else (9 if mono else 17)
+        xing = offset + 4 + side_info
+        if header[xing : xing + 4] in (b"Xing", b"Info") and len(header) >= xing + 12:
+            (flags,) = struct.unpack_from(">I", header, xing + 4)
+            if flags & 0x1:
+                (frames,) = struct.unpack_from(">I", header, xing + 8)
+                return frames * samples_per_frame / sample_rate
+
+    # Constant bitrate, estimated from the audio data size
+    return (size - offset) * 8 / bitrate
+
+
+def audio_duration(file_name: str, header: bytes, size: int) -> float | None:
+    """Estimates the duration of an audio file in seconds from its first bytes.
+
+    Supports WAV and MP3 files, returns None for other or unrecognized files.
+
+    Args:
+        file_name (str): name of the file, its extension selects the format
+        header (bytes): first bytes of the file, at least `HEADER_SIZE` if available
+        size (int): total size of the file in bytes
+
+    Returns:
+        float | None: duration in seconds
+    """
+    extension = file_name.rsplit(".", 1)[-1].lower()
+    if extension == "wav":
+        return wav_duration(header, size)
+    if extension == "mp3":
+        return mp3_duration(header, size)
+    return None
@@ -0,0 +1,119 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+
+class CachedResponse(NamedTuple):
+    version: str
+    content: bytes
+
+
+class ResponseCache:
+    """In-process cache of serialized responses.
+
+    The generation counter is increased on every eviction. A value is only
+    stored when no eviction happened since it was read from the database, so
+    a response rendered concurrently with a config change is never cached
+    over the invalidation.
+
+    Entries are kept until evicted. When invalidation events may be missed
+    (see `app.core.invalidation`), `max_age` limits how long they are served.
+    With `max_entries` the least recently used entries are dropped beyond it.
+    """
+
+    def __init__(self, max_entries: int | None = None) -> None:
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[CachedResponse, float]] = OrderedDict()
+        self._generation = 0
+        self.max_age: float | None = None
+        self.max_entries = max_entries
+
+    def get(self, key: str) -> CachedResponse | None:
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is None:
+                return None
+            self._entries.move_to_end(key)
+        entry, stored_at = cached
+        if self.max_age is not None and time.monotonic() - stored_at > self.max_age:
+            return None
+        return entry
+
+    def generation(self) -> int:
+        return self._generation
+
+    def set(self, key: str, entry: CachedResponse, generation: int) -> CachedResponse:
+        with self._lock:
+            if self._generation == generation:
+                self._entries[key] = (entry, time.monotonic())
+                self._entries.move_to_end(key)
+                if self.max_entries is not None:
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+        return entry
+
+    def evict(self, key: str) -> None:
+        """Removes the entry and all entries nested under it (`<key>/...`)."""
+        prefix = f"{key}/"
+        with self._lock:
+            self._entries.pop(key, None)
+            for nested_key in [k for k in self._entries if k.startswith(prefix)]:
+                del self._entries[nested_key]
+            self._generation += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+
+class VersionedCache:
+    """In-process cache of computed values, each stored for one version of its inputs.
+
+    Only the latest version of a key is kept, a lookup with another version
+    misses. Values are shared between threads and must not be modified.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: dict[str, tuple[str, object]] = {}
+
+    def get(self, key: str, version: str):
+        cached = self._entries.get(key)
+        if cached is None or cached[0] != version:
+            return None
+        return cached[1]
+
+    def set(self, key: str, version: str, value):
+        with self._lock:
+            self._entries[key] = (version, value)
+        return value
+
+    def evict(self, key: str) -> None:
+        prefix = f"{key}/"
+        with self._lock:
+            self._entries.pop(key, None)
+            for nested_key in [k for k in self._entries if k.startswith(prefix)]:
+                del self._entries[nested_key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# Serialized PqExperiment JSON per experiment name
+experiment_config_cache = ResponseCache()
+# Serialized sample name lists per experiment name
+sample_listing_cache = ResponseCache()
+# Published experiment versions, keyed `<experiment name>/<version>[/manifest]`
+published_version_cache = ResponseCache()
+# Serialized sample manifests per experiment name, depend on the config and samples
+sample_manifest_cache = ResponseCache()
+# Serialized result statistics, keyed `<experiment name>/<analysis>`, versioned by results watermark,
+# bounded as every bootstrap seed and number of resamples is cached separately
+analysis_cache = ResponseCache(max_entries=256)
+# MUSHRA score matrices per experiment name, versioned by results watermark
+score_matrix_cache = VersionedCache()
+# AB and ABX selection counts per experiment name, versioned by experiment id and config hash
+selection_counts_cache = VersionedCache()
@@ -0,0 +1,156 @@
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+
+from app.core.archive import ChunkBuffer
+from app.schemas import (
+    PqTestABResult,
+    PqTestABXResult,
+    PqTestAPEResult,
+    PqTestBase,
+    PqTestMUSHRAResult,
+    PqTestTypes,
+)
+from app.utils import PqException
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Optional, installed with the `columnar` extra
+    pa = None
+    pq = None
+
+COLUMNAR_FORMATS = {
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+# Columns shared by the tables of every test type
+_SUBMISSION_COLUMNS = ("submission", "created_at", "feedback")
+
+
+def _score_column(sample_id: str) -> str:
+    return f"score_{sample_id}"
+
+
+class ColumnarExportUnavailable(PqException):
+    def __init__(self) -> None:
+        super().__init__(
+            "Columnar exports require pyarrow, install the columnar extra!",
+            error_code=501,
+        )
+
+
+class ResultsTable:
+    """Flattens results of one test into rows of a fixed Arrow schema.
+
+    - AB: a row per selection (question, sample)
+    - ABX: a row per selection, with the X sample and the sample chosen as X
+    - MUSHRA: a row per submission with a `score_<sample id>` column per
+      sample, the reference column first, so columns don't depend on the
+      display order. The prefix keeps sample ids apart from the fixed columns
+    - APE: a row per (axis, sample) rating
+    """
+
+    def __init__(self, test: PqTestBase) -> None:
+        if pa is None:
+            raise ColumnarExportUnavailable()
+        self.test = test
+        self.type = PqTestTypes(test.type)
+        columns = [
+            ("submission", pa.string()),
+            ("created_at", pa.timestamp("us")),
+            ("feedback", pa.string()),
+        ]
+        match self.type:
+            case PqTestTypes.AB:
+                columns += [("question_id", pa.string()), ("sample_id", pa.string())]
+            case PqTestTypes.ABX:
+                columns += [
+                    ("x_sample_id", pa.string()),
+                    ("x_selected", pa.string()),
+                    ("question_id", pa.string()),
+                    ("sample_id", pa.string()),
+                ]
+            case PqTestTypes.MUSHRA:
+                self.sample_ids = [test.reference.sample_id] + [
+                    sample.sample_id for sample in test.anchors + test.samples
+                ]
+                columns += [
+                    (_score_column(sample_id), pa.int32())
+                    for sample_id in self.sample_ids
+                ]
+            case PqTestTypes.APE:
+                columns += [
+                    ("axis_id", pa.string()),
+                    ("sample_id", pa.string()),
+                    ("rating", pa.int32()),
+                ]
+        self.schema = pa.schema(columns)
+
+    def rows(
+        self,
+        submission: str,
+        created_at: datetime,
+        result: PqTestABResult | PqTestABXResult | PqTestMUSHRAResult | PqTestAPEResult,
+    ) -> list[dict]:
+        common = dict(
+            zip(_SUBMISSION_COLUMNS, (submission, created_at, result.feedback))
+        )
+        match self.type:
+            case PqTestTypes.AB:
+                return [
+                    {**common, "question_id": s.question_id, "sample_id": s.sample_id}
+                    for s in result.selections
+                ]
+            case PqTestTypes.ABX:
+                common["x_sample_id"] = result.x_sample_id
+                common["x_selected"] = result.x_selected
+                return [
+                    {**common, "question_id": s.question_id, "sample_id": s.sample_id}
+                    for s in result.selections
+                ]
+            case PqTestTypes.MUSHRA:
+                row = {
+                    **common,
+                    _score_column(self.sample_ids[0]): result.reference_score,
+                }
+                for score in result.anchors_scores + result.samples_scores:
+                    row[_score_column(score.sample_id)] = score.score
+                return [row]
+            case PqTestTypes.APE:
+                return [
+                    {
+                        **common,
+                        "axis_id": axis.axis_id,
+                        "sample_id": rating.sample_id,
+                        "rating": rating.rating,
+                    }
+                    for axis in result.axis_results
+                    for rating in axis.sample_ratings
+                ]
+
+    def record_batch(self, rows: list[dict]):
+        return pa.RecordBatch.from_pylist(rows, schema=self.schema)
+
+
+def stream_columnar(
+    table: ResultsTable,
+    row_batches: Iterable[list[dict]],
+    columnar_format: str,
+) -> Iterator[bytes]:
+    """Writes row batches as a Parquet file or an Arrow IPC stream, chunk by chunk.
+
+    Every batch becomes a Parquet row group or an Arrow record batch, so only
+    one batch is held in memory at a time.
+    """
+    buffer = ChunkBuffer()
+    if columnar_format == "parquet":
+        writer = pq.ParquetWriter(buffer, table.schema)
+    else:
+        writer = pa.ipc.new_stream(buffer, table.schema)
+    with writer:
+        for rows in row_batches:
+            if rows:
+                writer.write_batch(table.record_batch(rows))
+                yield buffer.drain()
+    yield buffer.drain()
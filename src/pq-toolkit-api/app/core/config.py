@@ -1,8 +1,9 @@
+import os
 import secrets
 from typing import Annotated, Any, Literal
 import logging
 
-from pydantic import AnyUrl, BeforeValidator, PostgresDsn, computed_field
+from pydantic import AnyUrl, BeforeValidator, Field, PostgresDsn, computed_field
 from pydantic_core import MultiHostUrl
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -24,6 +25,11 @@ class Settings(BaseSettings):
     LOG_LEVEL: int = logging.WARN
     API_V1_STR: str = "/v1"
     PQ_API_PORT: int = 8787
+    # Production server: worker processes and requests served before a worker is replaced
+    WEB_CONCURRENCY: int = Field(default_factory=lambda: os.cpu_count() or 1)
+    MAX_REQUESTS: int = 10000
+    MAX_REQUESTS_JITTER: int = 1000
+    GRACEFUL_TIMEOUT: int = 30
     DOMAIN: str = "localhost"
     ENVIRONMENT: Literal["local", "staging", "production"] = "local"
 
@@ -58,6 +64,17 @@ class Settings(BaseSettings):
             path=self.POSTGRES_DB,
         )
 
+    # Connection pool of each engine, per worker process
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Threads available to sync route handlers, per worker process
+    THREADPOOL_TOKENS: int = 40
+    # Seconds cached responses are served while cache invalidations can't be received
+    CACHE_FALLBACK_TTL: float = 30.0
+
     FIRST_SUPERUSER_NAME: str
     FIRST_SUPERUSER_PASSWORD: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
@@ -68,5 +85,22 @@ class Settings(BaseSettings):
     MINIO_ENDPOINT: str
     MINIO_PORT: int = 9000
 
+    # Static experiment files served by the gateway without the API
+    STATIC_PUBLISH_TARGET: Literal["none", "minio", "directory"] = "none"
+    STATIC_PUBLISH_BUCKET: str = "static"
+    STATIC_PUBLISH_DIRECTORY: str = "static"
+
+    # Exports rendered in the background, per worker process
+    EXPORT_BUCKET: str = "exports"
+    EXPORT_WORKERS: int = 2
+    # Seconds after which a pending export is considered abandoned and restarted
+    EXPORT_JOB_TIMEOUT: float = 600.0
+    # Seconds the download routes wait for an export before answering 202 with its job
+    EXPORT_DOWNLOAD_WAIT: float = 10.0
+
+    # Processes computing bootstrap confidence intervals, per worker process,
+    # 0 computes them in the request thread
+    BOOTSTRAP_WORKERS: int = 2
+
 
 settings = Settings()  # type: ignore
@@ -0,0 +1,112 @@
+import csv
+from collections.abc import Iterable, Iterator
+
+from app.schemas import (
+    PqTestABResult,
+    PqTestABXResult,
+    PqTestAPEResult,
+    PqTestBase,
+    PqTestMUSHRAResult,
+    PqTestTypes,
+)
+
+# Rows written between yields of the CSV stream
+CSV_ROWS_PER_CHUNK = 500
+
+
+class _LineBuffer:
+    def __init__(self) -> None:
+        self._lines: list[str] = []
+
+    def write(self, line: str) -> None:
+        self._lines.append(line)
+
+    def drain(self) -> str:
+        data = "".join(self._lines)
+        self._lines.clear()
+        return data
+
+
+class ResultsCsv:
+    """Lays out results of one test as CSV rows with columns taken from the test config.
+
+    Columns are keyed by question id (AB, ABX) or sample id (MUSHRA, APE),
+    so values stay aligned no matter in which order a client sent them.
+
+    - AB: a row per submission with the sample selected for every question
+    - ABX: as AB, with the X sample and the sample chosen as X
+    - MUSHRA: a row per submission with the score of every sample, the
+      reference first
+    - APE: a row per submission and axis with the rating of every sample
+    """
+
+    def __init__(self, test: PqTestBase, question_ids: list[str] | None = None) -> None:
+        self.test = test
+        self.type = PqTestTypes(test.type)
+        match self.type:
+            case PqTestTypes.AB | PqTestTypes.ABX:
+                self.keys = question_ids or [
+                    question.question_id for question in test.questions or []
+                ]
+            case PqTestTypes.MUSHRA:
+                self.keys = [test.reference.sample_id] + [
+                    sample.sample_id for sample in test.anchors + test.samples
+                ]
+            case PqTestTypes.APE:
+                self.keys = [sample.sample_id for sample in test.samples]
+
+    def header(self) -> list[str]:
+        columns = ["Submission", "Test type"]
+        match self.type:
+            case PqTestTypes.ABX:
+                columns += ["xSample", "xSelected"]
+            case PqTestTypes.APE:
+                columns += ["Axis"]
+        return columns + self.keys + ["Feedback"]
+
+    def rows(
+        self,
+        submission: str,
+        result: PqTestABResult | PqTestABXResult | PqTestMUSHRAResult | PqTestAPEResult,
+    ) -> list[list]:
+        feedback = result.feedback or ""
+        match self.type:
+            case PqTestTypes.AB | PqTestTypes.ABX:
+                values = {sel.question_id: sel.sample_id for sel in result.selections}
+                prefix = [submission, self.type.value]
+                if self.type == PqTestTypes.ABX:
+                    prefix += [result.x_sample_id, result.x_selected]
+                return [
+                    prefix + [values.get(key, "") for key in self.keys] + [feedback]
+                ]
+            case PqTestTypes.MUSHRA:
+                values = {self.keys[0]: result.reference_score}
+                for score in result.anchors_scores + result.samples_scores:
+                    values[score.sample_id] = score.score
+                return [
+                    [submission, self.type.value]
+                    + [values.get(key, "") for key in self.keys]
+                    + [feedback]
+                ]
+            case PqTestTypes.APE:
+                rows = []
+                for axis in result.axis_results:
+                    values = {r.sample_id: r.rating for r in axis.sample_ratings}
+                    rows.append(
+                        [submission, self.type.value, axis.axis_id]
+                        + [values.get(key, "") for key in self.keys]
+                        + [feedback]
+                    )
+                return rows
+
+
+def stream_csv(table: ResultsCsv, rows: Iterable[list]) -> Iterator[str]:
+    """Writes the header and rows as CSV text, in chunks of `CSV_ROWS_PER_CHUNK` rows."""
+    buffer = _LineBuffer()
+    writer = csv.writer(buffer)
+    writer.writerow(table.header())
+    for count, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if count % CSV_ROWS_PER_CHUNK == 0:
+            yield buffer.drain()
+    yield buffer.drain()
@@ -1,12 +1,32 @@
 from sqlalchemy.exc import NoResultFound
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
 from sqlmodel import Session, create_engine, SQLModel, select
 
 from app.core.config import settings
+from app.core.pool_metrics import PoolMetrics, timed_pool_class
 from app.models import Admin
 
 
+def _engine_options(pool_class: type[Pool]) -> dict:
+    return {
+        "echo": settings.ENVIRONMENT == "local",
+        "poolclass": timed_pool_class(pool_class, PoolMetrics()),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
 engine = create_engine(
-    str(settings.SQLALCHEMY_DATABASE_URI), echo=(settings.ENVIRONMENT == "local")
+    str(settings.SQLALCHEMY_DATABASE_URI), **_engine_options(QueuePool)
+)
+
+# psycopg 3 serves both engines, the async one is used by the hot request handlers
+async_engine = create_async_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI), **_engine_options(AsyncAdaptedQueuePool)
 )
 
 
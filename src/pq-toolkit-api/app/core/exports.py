@@ -0,0 +1,319 @@
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+
+import minio
+import anyio
+from anyio.to_thread import run_sync
+from minio import Minio
+from minio.deleteobjects import DeleteObject
+from pydantic_settings import BaseSettings
+from urllib3.response import HTTPResponse
+
+from app.core.sample_manager import S3Error
+from app.schemas import PqExportJob
+
+logger = logging.getLogger(__name__)
+
+# Seconds between status checks of a waited for job, doubled up to the maximum
+_POLL_INTERVAL = 0.05
+_MAX_POLL_INTERVAL = 1.0
+
+
+class _ChunkReader:
+    """File-like object reading an iterable of byte chunks, for streamed uploads."""
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks = iter(chunks)
+        self._buffer = bytearray()
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size < 0:
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+
+class ExportStore(ABC):
+    """Base class for storage of rendered exports and their job statuses."""
+
+    @abstractmethod
+    def put(self, key: str, chunks: Iterable[bytes], media_type: str) -> None:
+        """Stores the chunks as the content of the object."""
+
+    @abstractmethod
+    def get(self, key: str) -> Iterator[bytes] | None:
+        """Returns the content of the object in chunks, None if it doesn't exist."""
+
+    @abstractmethod
+    def list_keys(self, prefix: str) -> list[str]:
+        """Returns the keys of all objects under the prefix."""
+
+    @abstractmethod
+    def remove(self, keys: list[str]) -> None:
+        """Removes the objects."""
+
+
+class MinioExportStore(ExportStore):
+    """Keeps exports in a private MinIO bucket, shared by all API workers."""
+
+    def __init__(
+        self,
+        endpoint: str,
+        port: int,
+        access_key: str,
+        secret_key: str,
+        bucket_name: str = "exports",
+    ) -> None:
+        self._bucket_name = bucket_name
+        self._client = Minio(
+            endpoint=f"{endpoint}:{port}",
+            access_key=access_key,
+            secret_key=secret_key,
+            secure=False,
+        )
+        if not self._client.bucket_exists(self._bucket_name):
+            self._client.make_bucket(self._bucket_name)
+
+    def put(self, key: str, chunks: Iterable[bytes], media_type: str) -> None:
+        try:
+            self._client.put_object(
+                self._bucket_name,
+                key,
+                _ChunkReader(chunks),
+                length=-1,
+                part_size=10 * 1024 * 1024,
+                content_type=media_type,
+            )
+        except minio.error.S3Error as e:
+            raise S3Error(e.code)
+
+    def _read(self, response: HTTPResponse, chunk_size: int) -> Iterator[bytes]:
+        try:
+            yield from response.stream(chunk_size)
+        finally:
+            response.close()
+            response.release_conn()
+
+    def get(self, key: str, chunk_size: int = 1024 * 1024) -> Iterator[bytes] | None:
+        try:
+            response = self._client.get_object(self._bucket_name, key)
+        except minio.error.S3Error as e:
+            if e.code == "NoSuchKey":
+                return None
+            raise S3Error(e.code)
+        return self._read(response, chunk_size)
+
+    def list_keys(self, prefix: str) -> list[str]:
+        return [
+            obj.object_name
+            for obj in self._client.list_objects(
+                self._bucket_name, prefix=prefix, recursive=True
+            )
+        ]
+
+    def remove(self, keys: list[str]) -> None:
+        errors = self._client.remove_objects(
+            self._bucket_name, [DeleteObject(key) for key in keys]
+        )
+        for error in errors:
+            raise S3Error(error.code)
+
+
+class ExportJobs:
+    """Renders exports in a worker pool and keeps the results in an `ExportStore`.
+
+    The status of a job is stored as `<key>.json` next to its artifact, so any
+    API worker can report on and serve a job started by another one. A job
+    still pending after `timeout` seconds, for example because its worker was
+    stopped, is started again on the next request, as is a failed job.
+    """
+
+    def __init__(
+        self,
+        store: ExportStore,
+        workers: int = 2,
+        timeout: float = 600.0,
+        wait_timeout: float = 10.0,
+    ) -> None:
+        self.store = store
+        self.timeout = timeout
+        self.wait_timeout = wait_timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="export"
+        )
+        self._lock = threading.Lock()
+        self._running: dict[str, Future] = {}
+
+    def status(self, key: str) -> PqExportJob | None:
+        content = self.store.get(f"{key}.json")
+        if content is None:
+            return None
+        return PqExportJob.model_validate_json(b"".join(content))
+
+    def _set_status(self, key: str, job: PqExportJob) -> PqExportJob:
+        self.store.put(
+            f"{key}.json",
+            [job.model_dump_json(by_alias=True).encode()],
+            "application/json",
+        )
+        return job
+
+    def submit(
+        self,
+        key: str,
+        job_id: str,
+        render: Callable[[], Iterable[bytes]],
+        file_name: str,
+        media_type: str,
+        stale_prefix: str | None = None,
+    ) -> PqExportJob:
+        """Starts rendering an export, unless it is already stored or being rendered.
+
+        Args:
+            key (str): storage key of the artifact
+            job_id (str): ID of the job reported to clients
+            render (Callable): produces the artifact content in chunks, runs in the pool
+            file_name (str): file name of the artifact
+            media_type (str): media type of the artifact
+            stale_prefix (str | None): older finished artifacts under this
+                prefix are removed once the job is done, they are replaced by this one
+
+        Returns:
+            PqExportJob: current status of the job
+        """
+        with self._lock:
+            if key in self._running:
+                return self.status(key)
+            job = self.status(key)
+            if job is not None and (
+                job.status == "done"
+                or job.status == "pending"
+                and not self._is_stale(job)
+            ):
+                return job
+            job = self._set_status(
+                key,
+                PqExportJob(
+                    job_id=job_id,
+                    status="pending",
+                    file_name=file_name,
+                    media_type=media_type,
+                    updated_at=datetime.utcnow(),
+                ),
+            )
+            self._running[key] = self._executor.submit(
+                self._run, key, job, render, stale_prefix
+            )
+        return job
+
+    def _run(
+        self,
+        key: str,
+        job: PqExportJob,
+        render: Callable[[], Iterable[bytes]],
+        stale_prefix: str | None,
+    ) -> None:
+        try:
+            self.store.put(key, render(), job.media_type)
+        except Exception as e:
+            logger.exception("Export %s failed", key)
+            self._set_status(
+                key,
+                job.model_copy(
+                    update={
+                        "status": "failed",
+                        "error": str(e),
+                        "updated_at": datetime.utcnow(),
+                    }
+                ),
+            )
+        else:
+            finished_at = datetime.utcnow()
+            # Replaced artifacts are gone by the time waiting clients see the job done
+            if stale_prefix is not None:
+                self._remove_replaced(stale_prefix, key, finished_at)
+            self._set_status(
+                key,
+                job.model_copy(update={"status": "done", "updated_at": finished_at}),
+            )
+        finally:
+            with self._lock:
+                self._running.pop(key, None)
+
+    def _is_stale(self, job: PqExportJob) -> bool:
+        return (datetime.utcnow() - job.updated_at).total_seconds() >= self.timeout
+
+    async def wait(self, key: str) -> PqExportJob | None:
+        """Waits up to `wait_timeout` seconds for a job to finish and returns its status.
+
+        The stored status is polled, so jobs rendered by any API worker can be
+        waited for. A job still rendering is returned as pending, as is a job
+        pending for `timeout` seconds, which the next `submit` starts again.
+        """
+        interval = _POLL_INTERVAL
+        job = await run_sync(self.status, key)
+        with anyio.move_on_after(self.wait_timeout):
+            while (
+                job is not None and job.status == "pending" and not self._is_stale(job)
+            ):
+                await anyio.sleep(interval)
+                interval = min(interval * 2, _MAX_POLL_INTERVAL)
+                job = await run_sync(self.status, key)
+        return job
+
+    def _remove_replaced(self, prefix: str, keep: str, finished_at: datetime) -> None:
+        """Removes finished jobs under the prefix that are older than `keep`.
+
+        Pending jobs are left alone, they may be waited for by another worker.
+        """
+        stored_keys = self.store.list_keys(prefix)
+        keys = []
+        for stored in stored_keys:
+            if not stored.endswith(".json") or stored == f"{keep}.json":
+                continue
+            key = stored.removesuffix(".json")
+            job = self.status(key)
+            if (
+                job is not None
+                and job.status in ("done", "failed")
+                and job.updated_at < finished_at
+            ):
+                # Failed jobs have no artifact
+                keys += [stored, key] if key in stored_keys else [stored]
+        if keys:
+            self.store.remove(keys)
+
+    def remove(self, prefix: str) -> None:
+        """Removes all stored artifacts and statuses under the prefix."""
+        keys = self.store.list_keys(prefix)
+        if keys:
+            self.store.remove(keys)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def export_jobs_from_settings(settings: BaseSettings) -> ExportJobs:
+    store = MinioExportStore(
+        endpoint=settings.MINIO_ENDPOINT,
+        port=settings.MINIO_PORT,
+        access_key=settings.MINIO_ROOT_USER,
+        secret_key=settings.MINIO_ROOT_PASSWORD,
+        bucket_name=settings.EXPORT_BUCKET,
+    )
+    return ExportJobs(
+        store,
+        workers=settings.EXPORT_WORKERS,
+        timeout=settings.EXPORT_JOB_TIMEOUT,
+        wait_timeout=settings.EXPORT_DOWNLOAD_WAIT,
+    )
@@ -0,0 +1,177 @@
+import logging
+import threading
+
+import psycopg
+from sqlalchemy import Engine, event, func, select
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.cache import (
+    ResponseCache,
+    VersionedCache,
+    analysis_cache,
+    experiment_config_cache,
+    published_version_cache,
+    sample_listing_cache,
+    sample_manifest_cache,
+    score_matrix_cache,
+    selection_counts_cache,
+)
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "pq_cache_invalidation"
+_SEPARATOR = ":"
+
+
+def experiment_key(experiment_name: str) -> str:
+    return f"experiment{_SEPARATOR}{experiment_name}"
+
+
+def samples_key(experiment_name: str) -> str:
+    return f"samples{_SEPARATOR}{experiment_name}"
+
+
+def versions_key(experiment_name: str) -> str:
+    return f"versions{_SEPARATOR}{experiment_name}"
+
+
+def results_key(experiment_name: str) -> str:
+    return f"results{_SEPARATOR}{experiment_name}"
+
+
+class InvalidationBus:
+    """Evicts cached entries in every API worker through Postgres LISTEN/NOTIFY.
+
+    Keys are `<namespace>:<experiment name>`, each namespace maps to the
+    caches holding entries of that kind. Changes publish their keys inside
+    the database transaction, so other workers are notified only once the
+    change is committed, and the publishing worker evicts its own entries
+    right after the commit.
+
+    While the listener connection is down notifications can be lost, so
+    registered caches only serve entries younger than `fallback_ttl` until
+    the listener reconnects and drops everything cached meanwhile.
+    """
+
+    def __init__(self, fallback_ttl: float = 30.0, retry_seconds: float = 5.0) -> None:
+        self.fallback_ttl = fallback_ttl
+        self.retry_seconds = retry_seconds
+        self._caches: dict[str, list[ResponseCache | VersionedCache]] = {}
+        self._engine: Engine | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def register(self, namespace: str, cache: ResponseCache | VersionedCache) -> None:
+        self._caches.setdefault(namespace, []).append(cache)
+
+    def evict(self, key: str) -> None:
+        namespace, _, name = key.partition(_SEPARATOR)
+        for cache in self._caches.get(namespace, []):
+            cache.evict(name)
+
+    def _uses_notify(self, engine: Engine | None) -> bool:
+        return engine is not None and engine.dialect.name == "postgresql"
+
+    def publish(self, session: Session | None, *keys: str) -> None:
+        """Sends invalidation of the keys when the session commits.
+
+        Without a session (changes outside the database, like sample uploads)
+        the keys are evicted and sent right away.
+        """
+        if session is None:
+            for key in keys:
+                self.evict(key)
+            if self._uses_notify(self._engine):
+                with self._engine.begin() as connection:
+                    for key in keys:
+                        connection.execute(select(func.pg_notify(CHANNEL, key)))
+            return
+
+        if self._uses_notify(session.get_bind()):
+            for key in keys:
+                session.execute(select(func.pg_notify(CHANNEL, key)))
+        self._evict_after_commit(session, keys)
+
+    async def publish_async(self, session: AsyncSession, *keys: str) -> None:
+        if self._uses_notify(session.sync_session.get_bind()):
+            for key in keys:
+                await session.exec(select(func.pg_notify(CHANNEL, key)))
+        self._evict_after_commit(session.sync_session, keys)
+
+    def _evict_after_commit(self, session: Session, keys: tuple[str, ...]) -> None:
+        def _evict(_session):
+            for key in keys:
+                self.evict(key)
+
+        event.listen(session, "after_commit", _evict, once=True)
+
+    def _set_degraded(self, degraded: bool) -> None:
+        for caches in self._caches.values():
+            for cache in caches:
+                cache.max_age = self.fallback_ttl if degraded else None
+                if not degraded:
+                    # Notifications may have been missed while disconnected
+                    cache.clear()
+
+    def start(self, engine: Engine, fallback_ttl: float | None = None) -> None:
+        """Starts listening for invalidations of other workers, once per worker."""
+        self._engine = engine
+        if fallback_ttl is not None:
+            self.fallback_ttl = fallback_ttl
+        if not self._uses_notify(engine) or self._thread is not None:
+            return
+        conninfo = engine.url.set(drivername="postgresql").render_as_string(
+            hide_password=False
+        )
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._listen, args=(conninfo,), name="pq-invalidation", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        # The daemon listener thread exits with the worker process
+        self._stop.set()
+        self._thread = None
+
+    def _listen(self, conninfo: str) -> None:
+        self._set_degraded(True)
+        while not self._stop.is_set():
+            try:
+                # Keepalives detect connections dropped without an error
+                with psycopg.connect(
+                    conninfo,
+                    autocommit=True,
+                    keepalives=1,
+                    keepalives_idle=10,
+                    keepalives_interval=5,
+                    keepalives_count=3,
+                ) as connection:
+                    connection.execute(f"LISTEN {CHANNEL}")
+                    self._set_degraded(False)
+                    logger.info("Listening for cache invalidations")
+                    for notify in connection.notifies():
+                        self.evict(notify.payload)
+                        if self._stop.is_set():
+                            return
+            except psycopg.Error as e:
+                logger.warning("Cache invalidation listener disconnected: %s", e)
+            self._set_degraded(True)
+            self._stop.wait(self.retry_seconds)
+
+
+invalidation_bus = InvalidationBus()
+invalidation_bus.register("experiment", experiment_config_cache)
+invalidation_bus.register("samples", sample_listing_cache)
+invalidation_bus.register("experiment", sample_manifest_cache)
+invalidation_bus.register("samples", sample_manifest_cache)
+invalidation_bus.register("experiment", analysis_cache)
+invalidation_bus.register("results", analysis_cache)
+# Versioned by results watermark, evicted to free the memory of stale matrices
+invalidation_bus.register("experiment", score_matrix_cache)
+invalidation_bus.register("results", score_matrix_cache)
+# Extended with new results on read, only a config change invalidates the counts
+invalidation_bus.register("experiment", selection_counts_cache)
+# Versions never change, their entries only go away with the experiment
+invalidation_bus.register("versions", published_version_cache)
@@ -0,0 +1,221 @@
+import math
+from collections import Counter
+from collections.abc import Iterable
+
+from fpdf import FPDF
+
+from app.core.csv_export import ResultsCsv
+from app.schemas import (
+    PqTestABResult,
+    PqTestABXResult,
+    PqTestAPEResult,
+    PqTestBase,
+    PqTestMUSHRAResult,
+    PqTestTypes,
+)
+
+FONT = "Arial"
+FONT_SIZE = 7
+ROW_HEIGHT = 4.5
+HEADER_FILL = (173, 216, 230)
+
+
+def _latin1(value) -> str:
+    # Core PDF fonts only cover Latin-1
+    return str(value).encode("latin-1", "replace").decode("latin-1")
+
+
+class _RunningStats:
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.squares = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.squares += value * value
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+
+    def row(self) -> list:
+        mean = self.total / self.count
+        variance = (
+            (self.squares - self.count * mean * mean) / (self.count - 1)
+            if self.count > 1
+            else 0.0
+        )
+        return [
+            self.count,
+            f"{mean:.1f}",
+            f"{math.sqrt(max(variance, 0.0)):.1f}",
+            f"{self.minimum:g}",
+            f"{self.maximum:g}",
+        ]
+
+
+class ResultsSummary:
+    """Aggregates results of one test, one result at a time.
+
+    - AB, ABX: how often each sample was selected for every question, and
+      for ABX how often the X sample was identified
+    - MUSHRA: count, mean, standard deviation and range of scores per sample
+    - APE: the same per axis and sample
+    """
+
+    def __init__(self, test: PqTestBase) -> None:
+        self.type = PqTestTypes(test.type)
+        self.count = 0
+        self.identified = 0
+        self.selections: dict[str, Counter] = {}
+        self.scores: dict[tuple[str, ...], _RunningStats] = {}
+
+    def _score(self, key: tuple[str, ...], value: float) -> None:
+        stats = self.scores.get(key)
+        if stats is None:
+            stats = self.scores[key] = _RunningStats()
+        stats.add(value)
+
+    def add(
+        self,
+        result: PqTestABResult | PqTestABXResult | PqTestMUSHRAResult | PqTestAPEResult,
+    ) -> None:
+        self.count += 1
+        match self.type:
+            case PqTestTypes.AB | PqTestTypes.ABX:
+                for selection in result.selections:
+                    self.selections.setdefault(selection.question_id, Counter())[
+                        selection.sample_id
+                    ] += 1
+                if self.type == PqTestTypes.ABX:
+                    self.identified += result.x_selected == result.x_sample_id
+            case PqTestTypes.MUSHRA:
+                # Stored under a name no sample id can take, listed first
+                self._score(("",), result.reference_score)
+                for score in result.anchors_scores + result.samples_scores:
+                    self._score((score.sample_id,), score.score)
+            case PqTestTypes.APE:
+                for axis in result.axis_results:
+                    for rating in axis.sample_ratings:
+                        self._score((axis.axis_id, rating.sample_id), rating.rating)
+
+    def header(self) -> list[str]:
+        match self.type:
+            case PqTestTypes.AB | PqTestTypes.ABX:
+                return ["Question", "Sample", "Selections", "Share"]
+            case PqTestTypes.MUSHRA:
+                return ["Sample", "Ratings", "Mean", "Std", "Min", "Max"]
+            case PqTestTypes.APE:
+                return ["Axis", "Sample", "Ratings", "Mean", "Std", "Min", "Max"]
+
+    def rows(self) -> list[list]:
+        if self.type in (PqTestTypes.AB, PqTestTypes.ABX):
+            rows = []
+            for question_id, counts in sorted(self.selections.items()):
+                total = sum(counts.values())
+                for sample_id, count in sorted(counts.items()):
+                    rows.append([question_id, sample_id, count, f"{count / total:.0%}"])
+            return rows
+        return [
+            [key if key else "Reference" for key in keys] + stats.row()
+            for keys, stats in sorted(self.scores.items())
+        ]
+
+    def notes(self) -> list[str]:
+        notes = [f"Submissions: {self.count}"]
+        if self.type == PqTestTypes.ABX and self.count:
+            notes.append(
+                f"X sample identified: {self.identified} of {self.count}"
+                f" ({self.identified / self.count:.0%})"
+            )
+        return notes
+
+
+class PdfReport:
+    """Experiment results report with a summary and a results table per test.
+
+    Tables are written row by row with several rows per page, their header
+    repeated on every page, so results can be streamed into the report.
+    """
+
+    def __init__(self, title: str) -> None:
+        self.title = _latin1(title)
+        self.pdf = FPDF(orientation="L", format="A4")
+        self.pdf.set_auto_page_break(auto=False, margin=10)
+        self.pdf.set_margins(10, 10)
+        self.width = self.pdf.w - self.pdf.l_margin - self.pdf.r_margin
+
+    def _fits(self, height: float) -> bool:
+        return self.pdf.get_y() + height <= self.pdf.h - self.pdf.b_margin
+
+    def _heading(self, text: str) -> None:
+        self.pdf.set_font(FONT, "B", 10)
+        self.pdf.cell(0, 8, _latin1(text), ln=1)
+
+    def _fit(self, text: str, width: float) -> str:
+        # Cells don't clip their text, it is shortened to the column width
+        text_width = self.pdf.get_string_width(text)
+        if text_width <= width:
+            return text
+        text = text[: int(len(text) * width / text_width)]
+        while text and self.pdf.get_string_width(text) > width:
+            text = text[:-1]
+        return text
+
+    def _cells(self, values: list, widths: list[float], header: bool) -> None:
+        self.pdf.set_font(FONT, "B" if header else "", FONT_SIZE)
+        if header:
+            self.pdf.set_fill_color(*HEADER_FILL)
+        for value, width in zip(values, widths):
+            self.pdf.cell(
+                width,
+                ROW_HEIGHT,
+                self._fit(_latin1(value), width - 1),
+                border=1,
+                fill=header,
+            )
+        self.pdf.ln(ROW_HEIGHT)
+
+    def _table(self, title: str, header: list[str], rows: Iterable[list]) -> None:
+        # The last column (feedback in results tables) gets the remaining width
+        width = min(self.width / len(header), 40)
+        widths = [width] * (len(header) - 1)
+        widths.append(max(self.width - sum(widths), width))
+        if not self._fits(8 + 2 * ROW_HEIGHT):
+            self.pdf.add_page()
+        self._heading(title)
+        self._cells(header, widths, header=True)
+        for row in rows:
+            if not self._fits(ROW_HEIGHT):
+                self.pdf.add_page()
+                self._heading(f"{title} (continued)")
+                self._cells(header, widths, header=True)
+            self._cells(row, widths, header=False)
+        self.pdf.ln(ROW_HEIGHT)
+
+    def add_test(
+        self,
+        test: PqTestBase,
+        summary: ResultsSummary,
+        table: ResultsCsv,
+        rows: Iterable[list],
+    ) -> None:
+        self.pdf.add_page()
+        self.pdf.set_font(FONT, "B", 12)
+        self.pdf.cell(
+            0,
+            10,
+            f"{self.title} - Test {test.test_number} ({summary.type.value})",
+            ln=1,
+        )
+        self.pdf.set_font(FONT, "", 9)
+        for note in summary.notes():
+            self.pdf.cell(0, 5, _latin1(note), ln=1)
+        self.pdf.ln(2)
+        self._table("Summary", summary.header(), summary.rows())
+        self._table("Results", table.header(), rows)
+
+    def output(self) -> bytes:
+        return self.pdf.output(dest="S").encode("latin-1")
@@ -0,0 +1,92 @@
+import threading
+import time
+
+from anyio.to_thread import current_default_thread_limiter
+from sqlalchemy import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import Pool
+
+from app.schemas import PqPoolStatus, PqThreadpoolStatus
+
+
+class PoolMetrics:
+    """Collects how long requests wait to check out a database connection."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+
+class _TimedPoolMixin:
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            timed_out = True
+            raise
+        finally:
+            self.metrics.record_wait(time.perf_counter() - started, timed_out)
+
+
+def timed_pool_class(pool_class: type[Pool], metrics: PoolMetrics) -> type[Pool]:
+    """Creates a pool class reporting checkout wait times to the given metrics.
+
+    A subclass is created per engine since pools are recreated by SQLAlchemy
+    from their class (for example after a disconnect), which drops any state
+    passed to a single pool instance.
+
+    Args:
+        pool_class (type[Pool]): queue based pool class to extend
+        metrics (PoolMetrics): wait time collector
+
+    Returns:
+        type[Pool]: pool class to pass as `poolclass` to the engine
+    """
+    return type(
+        f"Timed{pool_class.__name__}",
+        (_TimedPoolMixin, pool_class),
+        {"metrics": metrics},
+    )
+
+
+def get_pool_status(engine: Engine) -> PqPoolStatus:
+    pool = engine.pool
+    metrics: PoolMetrics | None = getattr(pool, "metrics", None)
+    status = PqPoolStatus(
+        size=pool.size(),
+        checked_in=pool.checkedin(),
+        checked_out=pool.checkedout(),
+        overflow=pool.overflow(),
+    )
+    if metrics is not None:
+        status.checkouts = metrics.checkouts
+        status.timeouts = metrics.timeouts
+        status.max_wait_seconds = metrics.max_wait
+        if metrics.checkouts:
+            status.avg_wait_seconds = metrics.total_wait / metrics.checkouts
+    return status
+
+
+def get_threadpool_status() -> PqThreadpoolStatus:
+    """Reports usage of the threadpool running sync routes, needs an event loop."""
+    statistics = current_default_thread_limiter().statistics()
+    return PqThreadpoolStatus(
+        total_tokens=int(statistics.total_tokens),
+        borrowed_tokens=statistics.borrowed_tokens,
+        tasks_waiting=statistics.tasks_waiting,
+    )
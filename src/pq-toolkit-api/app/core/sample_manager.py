@@ -99,7 +99,11 @@ class SampleManager:
         return self._check_object_exists(object_name)
 
     def upload_sample(
-        self, experiment_name: str, sample_name: str, sample_data: IOBase
+        self,
+        experiment_name: str,
+        sample_name: str,
+        sample_data: IOBase,
+        metadata: dict[str, str] | None = None,
     ):
         object_name = self._object_name_from_experiment_and_sample(
             experiment_name, sample_name
@@ -111,11 +115,25 @@ class SampleManager:
                 sample_data,
                 length=-1,
                 part_size=10 * 1024 * 1024,
+                metadata=metadata,
             )
             return object_name
         except minio.error.S3Error as e:
             raise S3Error(e.code)
 
+    def get_sample_checksums(
+        self, experiment_name: str, sample_name: str
+    ) -> tuple[str, str | None] | None:
+        """Returns the ETag and the stored `sha256` metadata of a sample, None if it doesn't exist."""
+        object_name = self._object_name_from_experiment_and_sample(
+            experiment_name, sample_name
+        )
+        try:
+            stat = self._client.stat_object(self._sample_bucket_name, object_name)
+        except minio.error.S3Error:
+            return None
+        return stat.etag, stat.metadata.get("x-amz-meta-sha256")
+
     def upload_sample_directly(
         self, sample_name: str, sample_data: IOBase
     ):
@@ -180,6 +198,25 @@ class SampleManager:
 
         return self._sample_data_generator(response, chunk_size)
 
+    def get_sample_header(
+        self, experiment_name: str, sample_name: str, length: int
+    ) -> bytes:
+        """Reads the first `length` bytes of a sample with a range request."""
+        object_name = self._object_name_from_experiment_and_sample(
+            experiment_name, sample_name
+        )
+        try:
+            response: HTTPResponse = self._client.get_object(
+                self._sample_bucket_name, object_name, offset=0, length=length
+            )
+        except minio.error.S3Error as e:
+            raise S3Error(e.code)
+        try:
+            return response.read()
+        finally:
+            response.close()
+            response.release_conn()
+
     def get_sample_directly(
             self, sample_name: str, chunk_size: int = 1024 * 1024
     ):
@@ -228,5 +265,16 @@ class SampleManager:
             sample_names.append(sample_name)
         return sample_names
 
+    def list_matching_sample_objects(
+        self, experiment_name: str
+    ) -> list[minio.datatypes.Object]:
+        """Lists stored objects of the experiment samples, including size and ETag."""
+        return list(
+            self._client.list_objects(
+                bucket_name=self._sample_bucket_name,
+                prefix=experiment_name + self._SEPARATOR,
+            )
+        )
+
     def remove_all_samples(self):
         self._client.remove_bucket(self._sample_bucket_name)
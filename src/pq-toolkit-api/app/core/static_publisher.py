@@ -0,0 +1,138 @@
+import json
+import os
+import shutil
+from abc import ABC, abstractmethod
+from io import BytesIO
+
+import minio
+from minio import Minio
+from minio.deleteobjects import DeleteObject
+from pydantic_settings import BaseSettings
+
+from app.core.sample_manager import S3Error
+
+
+class StaticPublisher(ABC):
+    """Base class for targets of static experiment files.
+
+    Files are written under `experiments/<experiment name>/` and are meant to
+    be served by the gateway without reaching the API. They are sent with
+    `Cache-Control: no-cache`, so clients revalidate them by ETag and pick
+    up a regenerated file right away.
+    """
+
+    PREFIX = "experiments"
+    CACHE_CONTROL = "no-cache"
+
+    def _path(self, experiment_name: str, file_name: str) -> str:
+        return f"{self.PREFIX}/{experiment_name}/{file_name}"
+
+    @abstractmethod
+    def write(self, experiment_name: str, file_name: str, content: bytes) -> str:
+        """Writes a file of the experiment and returns its path."""
+
+    @abstractmethod
+    def remove(self, experiment_name: str) -> None:
+        """Removes all files of the experiment."""
+
+
+class MinioStaticPublisher(StaticPublisher):
+    """Publishes static files to a MinIO bucket readable without credentials."""
+
+    def __init__(
+        self,
+        endpoint: str,
+        port: int,
+        access_key: str,
+        secret_key: str,
+        bucket_name: str = "static",
+    ) -> None:
+        self._bucket_name = bucket_name
+        self._client = Minio(
+            endpoint=f"{endpoint}:{port}",
+            access_key=access_key,
+            secret_key=secret_key,
+            secure=False,
+        )
+        self._ensure_public_bucket_exists()
+
+    def _ensure_public_bucket_exists(self) -> None:
+        if self._client.bucket_exists(self._bucket_name):
+            return
+        self._client.make_bucket(self._bucket_name)
+        read_only_policy = {
+            "Version": "2012-10-17",
+            "Statement": [
+                {
+                    "Effect": "Allow",
+                    "Principal": {"AWS": ["*"]},
+                    "Action": ["s3:GetObject"],
+                    "Resource": [f"arn:aws:s3:::{self._bucket_name}/{self.PREFIX}/*"],
+                }
+            ],
+        }
+        self._client.set_bucket_policy(self._bucket_name, json.dumps(read_only_policy))
+
+    def write(self, experiment_name: str, file_name: str, content: bytes) -> str:
+        path = self._path(experiment_name, file_name)
+        try:
+            self._client.put_object(
+                self._bucket_name,
+                path,
+                BytesIO(content),
+                length=len(content),
+                content_type="application/json",
+                metadata={"Cache-Control": self.CACHE_CONTROL},
+            )
+        except minio.error.S3Error as e:
+            raise S3Error(e.code)
+        return path
+
+    def remove(self, experiment_name: str) -> None:
+        objects = self._client.list_objects(
+            self._bucket_name, prefix=self._path(experiment_name, ""), recursive=True
+        )
+        errors = self._client.remove_objects(
+            self._bucket_name, (DeleteObject(obj.object_name) for obj in objects)
+        )
+        for error in errors:
+            raise S3Error(error.code)
+
+
+class DirectoryStaticPublisher(StaticPublisher):
+    """Publishes static files to a local directory, for example a volume shared with nginx."""
+
+    def __init__(self, directory: str) -> None:
+        self._directory = directory
+
+    def write(self, experiment_name: str, file_name: str, content: bytes) -> str:
+        path = self._path(experiment_name, file_name)
+        target = os.path.join(self._directory, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        # Replaced atomically, readers never see a partially written file
+        temporary = f"{target}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(content)
+        os.replace(temporary, target)
+        return path
+
+    def remove(self, experiment_name: str) -> None:
+        shutil.rmtree(
+            os.path.join(self._directory, self._path(experiment_name, "")),
+            ignore_errors=True,
+        )
+
+
+def static_publisher_from_settings(settings: BaseSettings) -> StaticPublisher | None:
+    match settings.STATIC_PUBLISH_TARGET:
+        case "minio":
+            return MinioStaticPublisher(
+                endpoint=settings.MINIO_ENDPOINT,
+                port=settings.MINIO_PORT,
+                access_key=settings.MINIO_ROOT_USER,
+                secret_key=settings.MINIO_ROOT_PASSWORD,
+                bucket_name=settings.STATIC_PUBLISH_BUCKET,
+            )
+        case "directory":
+            return DirectoryStaticPublisher(settings.STATIC_PUBLISH_DIRECTORY)
+    return None
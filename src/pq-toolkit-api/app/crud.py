@@ -1,12 +1,59 @@
+import base64
+import functools
+import hashlib
+import itertools
+import json
+import logging
+import math
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 import uuid
+from collections.abc import Collection, Iterable, Iterator
+from datetime import datetime, timedelta
+from io import BytesIO
 
+from sqlalchemy import Engine, delete, false
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.exc import NoResultFound, IntegrityError
 
-from app.models import Experiment, Test, ExperimentTestResult, Admin, Sample, Rating
+from app.models import (
+    Experiment,
+    ExperimentVersion,
+    Test,
+    ExperimentTestResult,
+    Admin,
+    Sample,
+    Rating,
+    ResultAggregate,
+    ResultHistogramBin,
+)
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from fastapi import UploadFile
 from fastapi.responses import StreamingResponse
+from app.core.cache import (
+    CachedResponse,
+    analysis_cache,
+    experiment_config_cache,
+    published_version_cache,
+    sample_listing_cache,
+    sample_manifest_cache,
+    score_matrix_cache,
+    selection_counts_cache,
+)
+from app.core.invalidation import (
+    invalidation_bus,
+    experiment_key,
+    results_key,
+    samples_key,
+    versions_key,
+)
+from app.analysis import aggregates, ape, mushra, preference, screening
+from app.analysis.bootstrap import BootstrapPool
+from app.core import archive, audio, columnar, csv_export, pdf_report
+from app.core.exports import ExportJobs
 from app.core.sample_manager import SampleManager
+from app.core.static_publisher import StaticPublisher
 from app.schemas import (
     PqTestABResult,
     PqTestABXResult,
@@ -18,13 +65,31 @@ from app.schemas import (
     PqTestTypes,
     PqTestResultsList,
     PqSampleRatingList,
-    PqSampleRating
+    PqSampleRating,
+    PqSampleObject,
+    PqExperimentVersion,
+    PqExperimentVersionsList,
+    PqConfigDiff,
+    PqManifestSample,
+    PqSampleManifest,
+    PqImportSummary,
+    PqExportRequest,
+    PqExportJob,
+    PqMushraAnalysis,
+    PqApeAnalysis,
+    PqBootstrapOptions,
+    PqResultAggregate,
+    PqResultAggregates,
+    PqPreferenceAnalysis,
+    PqScreeningRules,
+    PqScreeningReport,
 )
 from app.utils import PqException
 from pydantic import ValidationError
-from sqlalchemy.orm import subqueryload
-from sqlalchemy.sql import func
-from fpdf import FPDF
+from sqlalchemy.orm import subqueryload, selectinload
+from sqlalchemy.sql import func, tuple_
+
+logger = logging.getLogger(__name__)
 
 
 class ExperimentNotFound(PqException):
@@ -71,6 +136,29 @@ class IncorrectInputData(PqException):
         super().__init__(f"Incorect data in test result {test_number}!")
 
 
+class ExperimentVersionNotFound(PqException):
+    def __init__(self, experiment_name: str, version: int) -> None:
+        super().__init__(
+            f"Version {version} of experiment {experiment_name} not found!",
+            error_code=404,
+        )
+
+
+class StaticPublishingDisabled(PqException):
+    def __init__(self) -> None:
+        super().__init__("Static publishing is not enabled!", error_code=409)
+
+
+class PublishedResultsWouldBeDeleted(PqException):
+    def __init__(self, experiment_name: str, test_numbers: list[int]) -> None:
+        tests = ", ".join(str(number) for number in test_numbers)
+        super().__init__(
+            f"Tests {tests} of experiment {experiment_name} have results of a "
+            "published version, the config change would delete them!",
+            error_code=409,
+        )
+
+
 def transform_test(test: Test) -> dict:
     test_dict = {"test_number": test.number, "type": test.type}
     if test.test_setup:
@@ -105,6 +193,22 @@ def get_db_experiment_by_name(session: Session, experiment_name: str) -> Experim
     return result
 
 
+async def get_db_experiment_by_name_async(
+        session: AsyncSession, experiment_name: str
+) -> Experiment:
+    # Tests are loaded eagerly, lazy loading is not available in async sessions
+    statement = (
+        select(Experiment)
+        .where(Experiment.name == experiment_name)
+        .options(selectinload(Experiment.tests))
+    )
+    try:
+        result = (await session.exec(statement)).one()
+    except NoResultFound:
+        raise ExperimentNotFound(experiment_name)
+    return result
+
+
 def get_experiment_by_name(session: Session, experiment_name: str) -> PqExperiment:
     result = get_db_experiment_by_name(session, experiment_name)
     if not result.configured:
@@ -112,14 +216,54 @@ def get_experiment_by_name(session: Session, experiment_name: str) -> PqExperime
     return transform_experiment(result)
 
 
+async def get_experiment_by_name_async(
+        session: AsyncSession, experiment_name: str
+) -> PqExperiment:
+    result = await get_db_experiment_by_name_async(session, experiment_name)
+    if not result.configured:
+        raise ExperimentNotConfigured(experiment_name)
+    return transform_experiment(result)
+
+
+async def get_experiment_config_json_async(
+        session: AsyncSession, experiment_name: str
+) -> CachedResponse:
+    cached = experiment_config_cache.get(experiment_name)
+    if cached is not None:
+        return cached
+
+    generation = experiment_config_cache.generation()
+    result = await get_db_experiment_by_name_async(session, experiment_name)
+    if not result.configured:
+        raise ExperimentNotConfigured(experiment_name)
+    content = transform_experiment(result).model_dump_json(by_alias=True).encode()
+    entry = CachedResponse(f"{result.id.hex}-{result.config_version}", content)
+    return experiment_config_cache.set(experiment_name, entry, generation)
+
+
 def remove_experiment_by_name(session: Session, experiment_name: str):
     result = get_db_experiment_by_name(session, experiment_name)
+    delete_result_aggregates(session, [test.id for test in result.tests])
     # Possibly refactor to use cascade delete built into db
     for test in result.tests:
         for test_result in test.experiment_test_results:
             session.delete(test_result)
         session.delete(test)
+    session.flush()
+    versions = session.exec(
+        select(ExperimentVersion).where(ExperimentVersion.experiment_id == result.id)
+    ).all()
+    for version in versions:
+        session.delete(version)
+    session.flush()
     session.delete(result)
+    invalidation_bus.publish(
+        session,
+        experiment_key(experiment_name),
+        samples_key(experiment_name),
+        versions_key(experiment_name),
+        results_key(experiment_name),
+    )
     session.commit()
 
 
@@ -131,6 +275,79 @@ def add_experiment(session: Session, experiment_name: str):
         raise ExperimentAlreadyExists(experiment_name)
 
 
+CLONE_COPY_WORKERS = 8
+
+
+def clone_experiment(
+        session: Session,
+        manager: SampleManager,
+        experiment_name: str,
+        clone_name: str,
+):
+    """Creates a copy of the experiment with its config and samples, without results.
+
+    Samples are copied by the storage server, concurrently, before the new
+    experiment is committed, so it is complete once visible. Copied samples
+    are removed again when the copy or the commit fails.
+    """
+    source = get_db_experiment_by_name(session, experiment_name)
+    clone = Experiment(
+        name=clone_name,
+        full_name=source.full_name,
+        description=source.description,
+        end_text=source.end_text,
+        configured=source.configured,
+        config_hash=source.config_hash,
+        config_version=1,
+    )
+    session.add(clone)
+    try:
+        session.flush()
+    except IntegrityError:
+        raise ExperimentAlreadyExists(clone_name)
+    session.add_all(
+        Test(
+            number=test.number,
+            type=test.type,
+            test_setup=test.test_setup,
+            experiment_id=clone.id,
+        )
+        for test in source.tests
+    )
+
+    sample_names = [obj.name for obj in get_sample_objects(manager, experiment_name)]
+    copied = []
+
+    def copy(name: str) -> None:
+        manager.copy_sample(f"{experiment_name}/{name}", clone_name, name)
+        copied.append(name)
+
+    try:
+        with ThreadPoolExecutor(max_workers=CLONE_COPY_WORKERS) as executor:
+            list(executor.map(copy, sample_names))
+        invalidation_bus.publish(
+            session, experiment_key(clone_name), samples_key(clone_name)
+        )
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        _remove_stored_samples(manager, clone_name, copied)
+        if isinstance(e, IntegrityError):
+            raise ExperimentAlreadyExists(clone_name)
+        raise
+
+
+def _remove_stored_samples(
+        manager: SampleManager, experiment_name: str, sample_names: Iterable[str]
+) -> None:
+    """Removes samples stored by a change that failed, errors are only logged."""
+    for name in sample_names:
+        try:
+            manager.remove_sample(experiment_name, name)
+        except Exception:
+            logger.exception("Removing sample %s/%s failed", experiment_name, name)
+
+
 def transform_test_upload(test: PqTestBase) -> Test:
     test_dict = test.model_dump()
     test_dict.pop("test_number")
@@ -138,26 +355,651 @@ def transform_test_upload(test: PqTestBase) -> Test:
     return Test(number=test.test_number, type=test.type, test_setup=test_dict)
 
 
+def hash_json(data) -> str:
+    return hashlib.sha256(
+        json.dumps(data, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def test_setup_hash(test: Test) -> str:
+    return hash_json({"type": PqTestTypes(test.type).value, "setup": test.test_setup})
+
+
 def upload_experiment_config(
         session: Session, experiment_name: str, json_file: UploadFile
-):
+) -> PqConfigDiff:
+    """Applies an uploaded config, only touching the tests which changed.
+
+    Tests are matched by number and compared by a hash of their setup. Changed
+    tests are updated in place and lose their results, removed tests are
+    deleted with their results, results of untouched tests are kept.
+    Uploading the config currently in use does nothing. A change which would
+    delete results collected under a published version is refused.
+    """
     experiment_upload = PqExperiment.model_validate_json(json_file.file.read())
     experiment_db = get_db_experiment_by_name(session, experiment_name)
-    for test in experiment_db.tests:
+    diff = apply_experiment_config(session, experiment_db, experiment_upload)
+    if diff.changed:
+        session.commit()
+        session.refresh(experiment_db)
+    return diff
+
+
+def apply_experiment_config(
+        session: Session, experiment_db: Experiment, experiment_upload: PqExperiment
+) -> PqConfigDiff:
+    """Stages the config changes of `upload_experiment_config` without committing."""
+    experiment_name = experiment_db.name
+    config_hash = hash_json(
+        experiment_upload.model_dump(mode="json", exclude={"uid", "experiment_use"})
+    )
+    existing_tests = {test.number: test for test in experiment_db.tests}
+    if experiment_db.configured and experiment_db.config_hash == config_hash:
+        return PqConfigDiff(
+            success=True, changed=False, untouched=sorted(existing_tests)
+        )
+
+    diff = PqConfigDiff(success=True, changed=True)
+    uploaded_tests = {
+        test.test_number: transform_test_upload(test) for test in experiment_upload.tests
+    }
+    changed_tests = {
+        number: test
+        for number, test in existing_tests.items()
+        if number not in uploaded_tests
+        or test_setup_hash(uploaded_tests[number]) != test_setup_hash(test)
+    }
+    # Results stay tied to the version they were collected under
+    versioned = session.exec(
+        select(Test.number)
+        .join(ExperimentTestResult)
+        .where(
+            Test.id.in_([test.id for test in changed_tests.values()]),
+            ExperimentTestResult.experiment_version_id.is_not(None),
+        )
+        .distinct()
+    ).all()
+    if versioned:
+        raise PublishedResultsWouldBeDeleted(experiment_name, sorted(versioned))
+
+    for number, test in existing_tests.items():
+        uploaded = uploaded_tests.get(number)
+        if number not in changed_tests:
+            diff.untouched.append(number)
+            continue
+        delete_result_aggregates(session, [test.id])
         for test_result in test.experiment_test_results:
             session.delete(test_result)
-        session.delete(test)
-    session.commit()
+        if uploaded is None:
+            diff.removed.append(number)
+            session.delete(test)
+        else:
+            diff.modified.append(number)
+            test.type = uploaded.type
+            test.test_setup = uploaded.test_setup
+    for number, test in uploaded_tests.items():
+        if number not in existing_tests:
+            diff.added.append(number)
+            test.experiment_id = experiment_db.id
+            session.add(test)
+
     experiment_db.full_name = experiment_upload.name
     experiment_db.description = experiment_upload.description
     experiment_db.end_text = experiment_upload.end_text
-    tests = [
-        transform_test_upload(test)
-        for test in experiment_upload.tests
-    ]
-    experiment_db.tests = tests
     experiment_db.configured = True
+    experiment_db.config_hash = config_hash
+    experiment_db.config_version += 1
+    invalidation_bus.publish(
+        session, experiment_key(experiment_name), results_key(experiment_name)
+    )
+    return diff
+
+
+def get_sample_objects(
+        manager: SampleManager, experiment_name: str
+) -> list[PqSampleObject]:
+    objects = manager.list_matching_sample_objects(experiment_name)
+    return sorted(
+        (
+            PqSampleObject(
+                name=obj.object_name.split("/")[-1], size=obj.size, etag=obj.etag
+            )
+            for obj in objects
+        ),
+        key=lambda sample: sample.name,
+    )
+
+
+# Samples are served by the API, which checks the experiment they belong to
+SAMPLE_URL = "/api/v1/experiments/{experiment_name}/samples/{asset_path}"
+MANIFEST_READ_WORKERS = 8
+# Chunks of 1 MiB read ahead per sample, with at most 4 samples read at once
+ARCHIVE_READ_AHEAD_CHUNKS = 8
+ARCHIVE_READ_WORKERS = 4
+
+
+def ordered_test_samples(test: PqTestBase) -> list:
+    """Samples played in a test, the MUSHRA reference and anchors first."""
+    samples = []
+    reference = getattr(test, "reference", None)
+    if reference is not None:
+        samples.append(reference)
+    samples.extend(getattr(test, "anchors", None) or [])
+    samples.extend(test.samples)
+    return samples
+
+
+@functools.lru_cache(maxsize=4096)
+def sample_duration(
+        manager: SampleManager, experiment_name: str, sample_name: str, etag: str, size: int
+) -> float | None:
+    # Keyed by ETag, a re-uploaded file is read again
+    header = manager.get_sample_header(experiment_name, sample_name, audio.HEADER_SIZE)
+    return audio.audio_duration(sample_name, header, size)
+
+
+def build_sample_manifest(
+        manager: SampleManager,
+        experiment_name: str,
+        experiment: PqExperiment,
+        objects: list[PqSampleObject],
+) -> PqSampleManifest:
+    objects_by_name = {obj.name: obj for obj in objects}
+    tests = sorted(experiment.tests, key=lambda t: t.test_number)
+    used = {
+        sample.asset_path
+        for test in tests
+        for sample in ordered_test_samples(test)
+        if sample.asset_path in objects_by_name
+    }
+    # Only the headers are read, concurrently since each is a storage round trip
+    with ThreadPoolExecutor(max_workers=MANIFEST_READ_WORKERS) as executor:
+        durations = dict(
+            zip(
+                used,
+                executor.map(
+                    lambda name: sample_duration(
+                        manager,
+                        experiment_name,
+                        name,
+                        objects_by_name[name].etag,
+                        objects_by_name[name].size,
+                    ),
+                    used,
+                ),
+            )
+        )
+
+    samples = []
+    for test in tests:
+        for sample in ordered_test_samples(test):
+            stored = objects_by_name.get(sample.asset_path)
+            samples.append(
+                PqManifestSample(
+                    test_number=test.test_number,
+                    sample_id=sample.sample_id,
+                    asset_path=sample.asset_path,
+                    url=SAMPLE_URL.format(
+                        experiment_name=experiment_name, asset_path=sample.asset_path
+                    ),
+                    size=stored.size if stored else None,
+                    etag=stored.etag if stored else None,
+                    duration=durations.get(sample.asset_path),
+                )
+            )
+    return PqSampleManifest(experiment=experiment_name, samples=samples)
+
+
+def get_sample_manifest(
+        session: Session, manager: SampleManager, experiment_name: str
+) -> PqSampleManifest:
+    experiment = get_experiment_by_name(session, experiment_name)
+    return build_sample_manifest(
+        manager, experiment_name, experiment, get_sample_objects(manager, experiment_name)
+    )
+
+
+def get_sample_manifest_json(
+        session: Session, manager: SampleManager, experiment_name: str
+) -> CachedResponse:
+    cached = sample_manifest_cache.get(experiment_name)
+    if cached is not None:
+        return cached
+
+    generation = sample_manifest_cache.generation()
+    manifest = get_sample_manifest(session, manager, experiment_name)
+    content = manifest.model_dump_json(by_alias=True).encode()
+    entry = CachedResponse(hashlib.sha1(content).hexdigest(), content)
+    return sample_manifest_cache.set(experiment_name, entry, generation)
+
+
+class UnsupportedArchiveFormat(PqException):
+    def __init__(self, archive_format: str) -> None:
+        super().__init__(f"Unsupported archive format {archive_format}!")
+
+
+def archive_experiment_samples(
+        session: Session,
+        manager: SampleManager,
+        experiment_name: str,
+        archive_format: str = "zip",
+        test_number: int | None = None,
+) -> tuple[Iterator[bytes], str]:
+    """Streams samples of the experiment, or of one of its tests, as an archive.
+
+    Files are read from storage concurrently ahead of the archive writer and
+    passed on chunk by chunk, with at most `ARCHIVE_READ_AHEAD_CHUNKS` chunks
+    held in memory per file being read, whatever the size of the files.
+
+    Returns:
+        tuple[Iterator[bytes], str]: archive chunks and their media type
+    """
+    if archive_format not in archive.ARCHIVE_FORMATS:
+        raise UnsupportedArchiveFormat(archive_format)
+    writer, media_type = archive.ARCHIVE_FORMATS[archive_format]
+
+    objects = get_sample_objects(manager, experiment_name)
+    if test_number is not None:
+        experiment = get_experiment_by_name(session, experiment_name)
+        test = next(
+            (t for t in experiment.tests if t.test_number == test_number), None
+        )
+        if test is None:
+            raise NoMatchingTest(str(test_number))
+        used = {sample.asset_path for sample in ordered_test_samples(test)}
+        objects = [obj for obj in objects if obj.name in used]
+
+    entries = [archive.ArchiveEntry(obj.name, obj.size) for obj in objects]
+    streams = archive.ordered_streams(
+        lambda entry: manager.get_sample(experiment_name, entry.name),
+        entries,
+        workers=ARCHIVE_READ_WORKERS,
+        max_chunks=ARCHIVE_READ_AHEAD_CHUNKS,
+    )
+    return writer(zip(entries, streams)), media_type
+
+
+BUNDLE_CONFIG = "config.json"
+BUNDLE_RESULTS = "results.ndjson"
+BUNDLE_MANIFEST = "manifest.json"
+BUNDLE_SAMPLES_DIRECTORY = "samples/"
+BUNDLE_UPLOAD_WORKERS = 8
+
+
+class IncorrectBundle(PqException):
+    def __init__(self, reason: str) -> None:
+        super().__init__(f"Incorrect experiment bundle: {reason}")
+
+
+def export_experiment_bundle(
+        session: Session, manager: SampleManager, experiment_name: str
+) -> Iterator[bytes]:
+    """Streams the config, samples and results of the experiment as a ZIP bundle.
+
+    Samples are passed on from storage chunk by chunk and results are read
+    through a server-side cursor and written batch by batch, so the session
+    must stay open while the bundle is streamed. The bundle ends with a
+    manifest listing the SHA-256 checksum of every other file, computed
+    while they are written.
+    """
+    experiment = get_experiment_by_name(session, experiment_name)
+    # Same format as config uploads, the experiment gets a new ID on import
+    config = experiment.model_dump_json(
+        by_alias=True, exclude={"uid"}, exclude_none=True
+    ).encode()
+    samples = [
+        archive.ArchiveEntry(f"{BUNDLE_SAMPLES_DIRECTORY}{obj.name}", obj.size)
+        for obj in get_sample_objects(manager, experiment_name)
+    ]
+    sample_streams = archive.ordered_streams(
+        lambda entry: manager.get_sample(
+            experiment_name, entry.name[len(BUNDLE_SAMPLES_DIRECTORY):]
+        ),
+        samples,
+        workers=ARCHIVE_READ_WORKERS,
+        max_chunks=ARCHIVE_READ_AHEAD_CHUNKS,
+    )
+
+    def results() -> Iterator[bytes]:
+        rows = session.exec(
+            select(ExperimentTestResult)
+            .join(Test)
+            .where(Test.experiment_id == experiment.uid)
+            .order_by(ExperimentTestResult.id)
+            .execution_options(yield_per=RESULTS_YIELD_PER)
+        )
+        for batch in rows.partitions():
+            yield b"".join(
+                json.dumps(
+                    {"experimentUse": row.experiment_use, "testResult": row.test_result}
+                ).encode() + b"\n"
+                for row in batch
+            )
+
+    def files():
+        checksums = {}
+
+        def checksummed(name: str, chunks: Iterable[bytes]) -> Iterator[bytes]:
+            digest = hashlib.sha256()
+            for chunk in chunks:
+                digest.update(chunk)
+                yield chunk
+            checksums[name] = digest.hexdigest()
+
+        checksums[BUNDLE_CONFIG] = hashlib.sha256(config).hexdigest()
+        yield archive.ArchiveEntry(BUNDLE_CONFIG, len(config)), config
+        for entry, stream in zip(samples, sample_streams):
+            yield entry, checksummed(entry.name, stream)
+        # The number of results isn't known before they are written
+        yield archive.ArchiveEntry(BUNDLE_RESULTS, 0), checksummed(
+            BUNDLE_RESULTS, results()
+        )
+        manifest = json.dumps(
+            {"experiment": experiment_name, "sha256": checksums}
+        ).encode()
+        yield archive.ArchiveEntry(BUNDLE_MANIFEST, len(manifest)), manifest
+
+    return archive.stream_zip(files())
+
+
+def read_bundle_file(bundle: zipfile.ZipFile, checksums: dict, name: str) -> bytes:
+    try:
+        data = bundle.read(name)
+    except KeyError:
+        raise IncorrectBundle(f"missing {name}")
+    if hashlib.sha256(data).hexdigest() != checksums.get(name):
+        raise IncorrectBundle(f"checksum mismatch of {name}")
+    return data
+
+
+def import_bundle_sample(
+        manager: SampleManager,
+        experiment_name: str,
+        bundle: zipfile.ZipFile,
+        checksums: dict,
+        path: str,
+) -> bool:
+    """Uploads a sample of the bundle unless it is already stored, returns if it was uploaded."""
+    sample_name = path[len(BUNDLE_SAMPLES_DIRECTORY):]
+    data = read_bundle_file(bundle, checksums, path)
+    stored = manager.get_sample_checksums(experiment_name, sample_name)
+    if stored is not None:
+        etag, sha256 = stored
+        # Single part uploads have the MD5 checksum as their ETag
+        if sha256 == checksums[path] or etag == hashlib.md5(data).hexdigest():
+            return False
+    manager.upload_sample(
+        experiment_name, sample_name, BytesIO(data), metadata={"sha256": checksums[path]}
+    )
+    return True
+
+
+def read_bundle_results(bundle: zipfile.ZipFile, checksums: dict) -> Iterator[dict]:
+    """Yields the results of the bundle line by line, checking their checksum last."""
+    try:
+        file = bundle.open(BUNDLE_RESULTS)
+    except KeyError:
+        raise IncorrectBundle(f"missing {BUNDLE_RESULTS}")
+    digest = hashlib.sha256()
+    with file:
+        for line in file:
+            digest.update(line)
+            try:
+                result = json.loads(line)
+                yield {
+                    "experimentUse": result["experimentUse"],
+                    "testResult": result["testResult"],
+                }
+            except (KeyError, TypeError, ValueError):
+                raise IncorrectBundle(f"invalid {BUNDLE_RESULTS}")
+    if digest.hexdigest() != checksums.get(BUNDLE_RESULTS):
+        raise IncorrectBundle(f"checksum mismatch of {BUNDLE_RESULTS}")
+
+
+def import_experiment_bundle(
+        session: Session,
+        manager: SampleManager,
+        experiment_name: str,
+        bundle_file: UploadFile,
+) -> PqImportSummary:
+    """Restores an experiment from a bundle created by `export_experiment_bundle`.
+
+    The config and results are checked first, reading the results line by
+    line. Samples are then verified and uploaded concurrently, skipping
+    files already stored with the same content. The experiment, its config
+    and results are written in a single transaction, samples uploaded by a
+    failed import are removed again. Results already present (matched by
+    their submission) are not imported twice, so an import can be safely
+    repeated. Like submitted results, imported ones refer to the version
+    published from the imported config, if any.
+    """
+    try:
+        bundle = zipfile.ZipFile(bundle_file.file)
+    except zipfile.BadZipFile:
+        raise IncorrectBundle("not a ZIP archive")
+    with bundle:
+        try:
+            checksums = json.loads(bundle.read(BUNDLE_MANIFEST))["sha256"]
+        except (KeyError, ValueError):
+            raise IncorrectBundle(f"missing {BUNDLE_MANIFEST}")
+        try:
+            experiment_upload = PqExperiment.model_validate_json(
+                read_bundle_file(bundle, checksums, BUNDLE_CONFIG)
+            )
+        except ValidationError:
+            raise IncorrectBundle(f"invalid {BUNDLE_CONFIG}")
+        test_types = {test.test_number: test.type for test in experiment_upload.tests}
+        for result in read_bundle_results(bundle, checksums):
+            test_result = result["testResult"]
+            test_type = test_types.get(test_result.get("testNumber"))
+            if test_type is None:
+                raise NoMatchingTest(str(test_result.get("testNumber")))
+            verify_test_result(test_result, test_type)
+
+        sample_paths = sorted(
+            path for path in checksums if path.startswith(BUNDLE_SAMPLES_DIRECTORY)
+        )
+        uploaded_names = []
+
+        def upload(path: str) -> bool:
+            uploaded = import_bundle_sample(
+                manager, experiment_name, bundle, checksums, path
+            )
+            if uploaded:
+                uploaded_names.append(path[len(BUNDLE_SAMPLES_DIRECTORY):])
+            return uploaded
+
+        try:
+            with ThreadPoolExecutor(max_workers=BUNDLE_UPLOAD_WORKERS) as executor:
+                uploaded = list(executor.map(upload, sample_paths))
+            summary = _import_bundle_results(
+                session, experiment_name, experiment_upload, bundle, checksums
+            )
+        except Exception:
+            session.rollback()
+            _remove_stored_samples(manager, experiment_name, uploaded_names)
+            raise
+    sample_names = [path[len(BUNDLE_SAMPLES_DIRECTORY):] for path in sample_paths]
+    if uploaded_names:
+        invalidation_bus.publish(None, samples_key(experiment_name))
+    summary.uploaded_samples = [n for n, up in zip(sample_names, uploaded) if up]
+    summary.skipped_samples = [n for n, up in zip(sample_names, uploaded) if not up]
+    return summary
+
+
+def _import_bundle_results(
+        session: Session,
+        experiment_name: str,
+        experiment_upload: PqExperiment,
+        bundle: zipfile.ZipFile,
+        checksums: dict,
+) -> PqImportSummary:
+    try:
+        experiment_db = get_db_experiment_by_name(session, experiment_name)
+    except ExperimentNotFound:
+        experiment_db = Experiment(name=experiment_name)
+        session.add(experiment_db)
+        session.flush()
+    summary = PqImportSummary(
+        success=True,
+        config=apply_experiment_config(session, experiment_db, experiment_upload),
+    )
+    session.flush()
+    session.refresh(experiment_db)
+
+    tests = {test.number: test for test in experiment_db.tests}
+    version = session.exec(current_version_statement(experiment_db)).first()
+    existing_uses = set(
+        session.exec(
+            select(ExperimentTestResult.experiment_use)
+            .join(Test)
+            .where(Test.experiment_id == experiment_db.id)
+        ).all()
+    )
+    new_results = (
+        ExperimentTestResult(
+            test_id=tests[result["testResult"]["testNumber"]].id,
+            test_result=result["testResult"],
+            experiment_use=result["experimentUse"],
+            experiment_version_id=version.id if version else None,
+        )
+        for result in read_bundle_results(bundle, checksums)
+        if result["experimentUse"] not in existing_uses
+    )
+    # Written in batches, so the results are never all held at once
+    for batch in iter(lambda: list(itertools.islice(new_results, RESULTS_YIELD_PER)), []):
+        session.add_all(batch)
+        update_result_aggregates(session, experiment_db, batch)
+        session.flush()
+        summary.imported_results += len(batch)
+    invalidation_bus.publish(session, results_key(experiment_name))
     session.commit()
+    return summary
+
+
+def publish_static_experiment(
+        session: Session,
+        manager: SampleManager,
+        publisher: StaticPublisher | None,
+        experiment_name: str,
+) -> list[str]:
+    """Renders the config and sample manifest of the experiment as static files."""
+    if publisher is None:
+        raise StaticPublishingDisabled()
+    experiment = get_experiment_by_name(session, experiment_name)
+    manifest = get_sample_manifest_json(session, manager, experiment_name)
+    return [
+        publisher.write(
+            experiment_name,
+            "experiment.json",
+            experiment.model_dump_json(by_alias=True).encode(),
+        ),
+        publisher.write(
+            experiment_name,
+            "manifest.json",
+            manifest.content,
+        ),
+    ]
+
+
+def transform_experiment_version(version: ExperimentVersion) -> PqExperimentVersion:
+    return PqExperimentVersion(
+        version=version.version,
+        config_hash=version.config_hash,
+        created_at=version.created_at,
+    )
+
+
+def get_latest_experiment_version(
+        session: Session, experiment: Experiment
+) -> ExperimentVersion | None:
+    return session.exec(
+        select(ExperimentVersion)
+        .where(ExperimentVersion.experiment_id == experiment.id)
+        .order_by(ExperimentVersion.version.desc())
+    ).first()
+
+
+def publish_experiment_version(
+        session: Session, manager: SampleManager, experiment_name: str
+) -> PqExperimentVersion:
+    """Freezes the current config and sample files of the experiment into a version.
+
+    Publishing an unchanged experiment returns the latest version instead of
+    creating a new one.
+    """
+    experiment = get_db_experiment_by_name(session, experiment_name)
+    if not experiment.configured:
+        raise ExperimentNotConfigured(experiment_name)
+
+    config = transform_experiment(experiment).model_dump(mode="json", by_alias=True)
+    manifest = [
+        sample.model_dump(mode="json")
+        for sample in get_sample_objects(manager, experiment_name)
+    ]
+    config_hash = hashlib.sha256(
+        json.dumps({"config": config, "samples": manifest}, sort_keys=True).encode()
+    ).hexdigest()
+
+    latest = get_latest_experiment_version(session, experiment)
+    if latest is not None and latest.config_hash == config_hash:
+        if latest.experiment_config_hash != experiment.config_hash:
+            # Published before the hash was stored, or by an identical upload
+            latest.experiment_config_hash = experiment.config_hash
+            session.add(latest)
+            session.commit()
+        return transform_experiment_version(latest)
+
+    version = ExperimentVersion(
+        experiment_id=experiment.id,
+        version=latest.version + 1 if latest is not None else 1,
+        config=config,
+        sample_manifest=manifest,
+        config_hash=config_hash,
+        experiment_config_hash=experiment.config_hash,
+    )
+    session.add(version)
+    session.commit()
+    session.refresh(version)
+    return transform_experiment_version(version)
+
+
+def get_experiment_versions(
+        session: Session, experiment_name: str
+) -> PqExperimentVersionsList:
+    experiment = get_db_experiment_by_name(session, experiment_name)
+    versions = session.exec(
+        select(ExperimentVersion)
+        .where(ExperimentVersion.experiment_id == experiment.id)
+        .order_by(ExperimentVersion.version)
+    ).all()
+    return PqExperimentVersionsList(
+        versions=[transform_experiment_version(version) for version in versions]
+    )
+
+
+async def get_experiment_version_json_async(
+        session: AsyncSession, experiment_name: str, version: int, manifest: bool = False
+) -> CachedResponse:
+    """Serialized config (or sample manifest) of a published version, cached indefinitely."""
+    key = f"{experiment_name}/{version}" + ("/manifest" if manifest else "")
+    cached = published_version_cache.get(key)
+    if cached is not None:
+        return cached
+
+    generation = published_version_cache.generation()
+    statement = (
+        select(ExperimentVersion)
+        .join(Experiment)
+        .where(Experiment.name == experiment_name, ExperimentVersion.version == version)
+    )
+    try:
+        result = (await session.exec(statement)).one()
+    except NoResultFound:
+        raise ExperimentVersionNotFound(experiment_name, version)
+    content = json.dumps(result.sample_manifest if manifest else result.config).encode()
+    entry = CachedResponse(result.config_hash, content)
+    return published_version_cache.set(key, entry, generation)
 
 
 def get_experiment_sample(
@@ -172,19 +1014,64 @@ def upload_experiment_sample(
 ):
     sample_name = audio_file.filename
     sample_data = audio_file.file
-    return manager.upload_sample(experiment_name, sample_name, sample_data)
+    upload_path = manager.upload_sample(experiment_name, sample_name, sample_data)
+    invalidation_bus.publish(None, samples_key(experiment_name))
+    return upload_path
 
 
 def delete_experiment_sample(
         manager: SampleManager, experiment_name: str, sample_name: str
 ):
     manager.remove_sample(experiment_name, sample_name)
+    invalidation_bus.publish(None, samples_key(experiment_name))
 
 
 def get_experiment_samples(manager: SampleManager, experiment_name: str) -> list[str]:
     return manager.list_matching_samples(experiment_name)
 
 
+def get_experiment_samples_json(
+        manager: SampleManager, experiment_name: str
+) -> CachedResponse:
+    cached = sample_listing_cache.get(experiment_name)
+    if cached is not None:
+        return cached
+
+    generation = sample_listing_cache.generation()
+    content = json.dumps(get_experiment_samples(manager, experiment_name)).encode()
+    entry = CachedResponse(hashlib.sha1(content).hexdigest(), content)
+    return sample_listing_cache.set(experiment_name, entry, generation)
+
+
+def current_version_statement(experiment: Experiment):
+    """Selects the latest version frozen from the live config of the experiment.
+
+    Nothing is selected when the config changed since it was last published.
+    """
+    return (
+        select(ExperimentVersion)
+        .where(
+            ExperimentVersion.experiment_id == experiment.id,
+            ExperimentVersion.experiment_config_hash == experiment.config_hash
+            if experiment.config_hash is not None
+            else false(),
+        )
+        .order_by(ExperimentVersion.version.desc())
+        .limit(1)
+    )
+
+
+def result_version_statement(experiment: Experiment, results_data: dict):
+    """Selects the version results refer to, the current one unless given explicitly."""
+    version = results_data.get("experimentVersion")
+    if version is None:
+        return current_version_statement(experiment)
+    return select(ExperimentVersion).where(
+        ExperimentVersion.experiment_id == experiment.id,
+        ExperimentVersion.version == version,
+    )
+
+
 def add_experiment_result(session: Session, experiment_name: str, result_list: dict):
     experiment = get_db_experiment_by_name(session, experiment_name)
     if len(experiment.tests) == 0:
@@ -193,7 +1080,30 @@ def add_experiment_result(session: Session, experiment_name: str, result_list: d
     return get_experiment_tests_results(session, experiment_name, result_name)
 
 
-def add_test_results(session: Session, results_data: dict, experiment: Experiment) -> str:
+async def add_experiment_result_async(
+        session: AsyncSession, experiment_name: str, result_list: dict
+) -> PqTestResultsList:
+    experiment = await get_db_experiment_by_name_async(session, experiment_name)
+    if len(experiment.tests) == 0:
+        raise NoTestsFoundForExperiment(experiment_name)
+    version = (
+        await session.exec(result_version_statement(experiment, result_list))
+    ).first()
+    if version is None and result_list.get("experimentVersion") is not None:
+        raise ExperimentVersionNotFound(experiment_name, result_list["experimentVersion"])
+    result_name, new_results = build_test_results(
+        result_list, experiment, version.id if version else None
+    )
+    session.add_all(new_results)
+    await update_result_aggregates_async(session, experiment, new_results)
+    await invalidation_bus.publish_async(session, results_key(experiment.name))
+    await session.commit()
+    return await get_experiment_tests_results_async(session, experiment, result_name)
+
+
+def build_test_results(
+        results_data: dict, experiment: Experiment, version_id: int | None = None
+) -> tuple[str, list[ExperimentTestResult]]:
     results = results_data.get("results")
     if results is None:
         raise NoResultsData()
@@ -201,21 +1111,206 @@ def add_test_results(session: Session, results_data: dict, experiment: Experimen
     test_info_mapper = {test.number: (test.id, test.type) for test in experiment.tests}
     placeholder = str(uuid.uuid4())  # Generate a unique UUID
 
+    new_results = []
     for result in results:
         test_info = test_info_mapper.get(result.get("testNumber"))
         if test_info is None:
             raise NoMatchingTest(str(result.get("testNumber")))
         verify_test_result(result, test_info[1])
 
-        new_result = ExperimentTestResult(
-            test_id=test_info[0], test_result=result, experiment_use=placeholder
+        new_results.append(
+            ExperimentTestResult(
+                test_id=test_info[0],
+                test_result=result,
+                experiment_use=placeholder,
+                experiment_version_id=version_id,
+            )
         )
-        session.add(new_result)
+    return placeholder, new_results
+
+
+def add_test_results(session: Session, results_data: dict, experiment: Experiment) -> str:
+    version = session.exec(result_version_statement(experiment, results_data)).first()
+    if version is None and results_data.get("experimentVersion") is not None:
+        raise ExperimentVersionNotFound(experiment.name, results_data["experimentVersion"])
+    placeholder, new_results = build_test_results(
+        results_data, experiment, version.id if version else None
+    )
+    session.add_all(new_results)
+    update_result_aggregates(session, experiment, new_results)
+    invalidation_bus.publish(session, results_key(experiment.name))
     session.commit()
 
     return placeholder
 
 
+def _result_totals(
+        experiment: Experiment, results: Iterable[ExperimentTestResult]
+) -> aggregates.ResultTotals:
+    tests = {test.id: test for test in experiment.tests}
+    totals = aggregates.ResultTotals()
+    for result in results:
+        test = tests[result.test_id]
+        totals.add(test.id, test.type, test.test_setup, result.test_result)
+    return totals
+
+
+# Columns of an `aggregates.AggregateKey`
+AGGREGATE_KEY_COLUMNS = ("test_id", "kind", "question_id", "sample_id")
+
+
+def _upsert_statements(dialect: str, totals: aggregates.ResultTotals) -> list:
+    """Statements adding the totals to the stored aggregates and histogram bins.
+
+    Missing rows are inserted, existing ones incremented in place by the
+    database, so submissions to the same test don't lock each other out.
+    Rows are written in key order, concurrent upserts can't deadlock.
+    """
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    keys = sorted(totals)
+    rows = [
+        dict(
+            zip(AGGREGATE_KEY_COLUMNS, key),
+            count=totals[key].count,
+            total=totals[key].total,
+            squares=totals[key].squares,
+        )
+        for key in keys
+    ]
+    bins = [
+        dict(zip(AGGREGATE_KEY_COLUMNS, key), bin=bin_number, count=count)
+        for key in keys
+        for bin_number, count in enumerate(totals[key].histogram)
+        if count
+    ]
+    statements = []
+    for model, values, increments in (
+        (ResultAggregate, rows, ("count", "total", "squares")),
+        (ResultHistogramBin, bins, ("count",)),
+    ):
+        if not values:
+            continue
+        statement = insert(model).values(values)
+        columns = model.__table__.c
+        statements.append(
+            statement.on_conflict_do_update(
+                index_elements=[
+                    column
+                    for column in (*AGGREGATE_KEY_COLUMNS, "bin")
+                    if column in columns
+                ],
+                set_={
+                    column: columns[column] + statement.excluded[column]
+                    for column in increments
+                },
+            )
+        )
+    return statements
+
+
+def update_result_aggregates(
+        session: Session, experiment: Experiment, new_results: list[ExperimentTestResult]
+) -> None:
+    """Adds new results to the aggregates of their tests, in the session transaction."""
+    totals = _result_totals(experiment, new_results)
+    for statement in _upsert_statements(session.get_bind().dialect.name, totals):
+        session.exec(statement)
+
+
+async def update_result_aggregates_async(
+        session: AsyncSession, experiment: Experiment, new_results: list[ExperimentTestResult]
+) -> None:
+    totals = _result_totals(experiment, new_results)
+    for statement in _upsert_statements(session.bind.dialect.name, totals):
+        await session.exec(statement)
+
+
+def delete_result_aggregates(session: Session, test_ids: list[int]) -> None:
+    session.exec(delete(ResultAggregate).where(ResultAggregate.test_id.in_(test_ids)))
+    session.exec(
+        delete(ResultHistogramBin).where(ResultHistogramBin.test_id.in_(test_ids))
+    )
+
+
+def rebuild_result_aggregates(session: Session, experiment_name: str) -> int:
+    """Recomputes the aggregates of the experiment from its stored results.
+
+    Submissions don't wait for the rebuild, results stored while it runs
+    may be counted twice, so it's best run while no results arrive.
+    Returns the number of aggregated results.
+    """
+    experiment = get_db_experiment_by_name(session, experiment_name)
+    test_ids = sorted(test.id for test in experiment.tests)
+    if not test_ids:
+        return 0
+    delete_result_aggregates(session, test_ids)
+    statement = (
+        select(ExperimentTestResult)
+        .where(ExperimentTestResult.test_id.in_(test_ids))
+        .execution_options(yield_per=RESULTS_YIELD_PER)
+    )
+    tests = {test.id: test for test in experiment.tests}
+    totals = aggregates.ResultTotals()
+    count = 0
+    for result in session.exec(statement):
+        test = tests[result.test_id]
+        totals.add(test.id, test.type, test.test_setup, result.test_result)
+        count += 1
+    for upsert in _upsert_statements(session.get_bind().dialect.name, totals):
+        session.exec(upsert)
+    session.commit()
+    return count
+
+
+def get_result_aggregates(session: Session, experiment_name: str) -> PqResultAggregates:
+    experiment = get_db_experiment_by_name(session, experiment_name)
+    rows = session.exec(
+        select(ResultAggregate, Test.number)
+        .join(Test)
+        .where(Test.experiment_id == experiment.id)
+        .order_by(
+            Test.number,
+            ResultAggregate.kind,
+            ResultAggregate.question_id,
+            ResultAggregate.sample_id,
+        )
+    ).all()
+    histograms = {}
+    for row in session.exec(
+        select(ResultHistogramBin)
+        .join(Test)
+        .where(Test.experiment_id == experiment.id)
+    ):
+        key = (row.test_id, row.kind, row.question_id, row.sample_id)
+        histogram = histograms.setdefault(key, [0] * mushra.DISTRIBUTION_BINS)
+        histogram[row.bin] = row.count
+    aggregates_list = []
+    for row, test_number in rows:
+        mean = row.total / row.count if row.count else None
+        variance = (
+            (row.squares - row.count * mean * mean) / (row.count - 1)
+            if row.count > 1
+            else None
+        )
+        aggregates_list.append(
+            PqResultAggregate(
+                test_number=test_number,
+                kind=row.kind,
+                question_id=row.question_id,
+                sample_id=row.sample_id,
+                count=row.count,
+                total=row.total,
+                mean=mean,
+                std=math.sqrt(max(variance, 0.0)) if variance is not None else None,
+                histogram=histograms.get(
+                    (row.test_id, row.kind, row.question_id, row.sample_id),
+                    [0] * mushra.DISTRIBUTION_BINS if row.kind in aggregates.SCORE_KINDS else [],
+                ),
+            )
+        )
+    return PqResultAggregates(experiment=experiment_name, aggregates=aggregates_list)
+
+
 def transform_test_result(
         result: ExperimentTestResult, test_type: PqTestTypes
 ) -> PqTestABResult | PqTestABXResult | PqTestMUSHRAResult | PqTestAPEResult:
@@ -247,33 +1342,578 @@ def verify_test_result(result: dict, test_type: PqTestTypes):
         raise IncorrectInputData(str(e))
 
 
+class IncorrectResultsCursor(PqException):
+    def __init__(self, cursor: str) -> None:
+        super().__init__(f"Incorrect results cursor {cursor}!", error_code=400)
+
+
+# created_at is taken before a result is committed, so a result can become
+# visible after newer ones. Cursors stay this far behind the current time,
+# which leaves submissions in flight time to commit before they are passed.
+RESULTS_CURSOR_SETTLE = timedelta(seconds=5)
+
+
+def results_cursor_horizon() -> datetime:
+    """Latest creation time a results cursor may be moved to."""
+    return datetime.utcnow() - RESULTS_CURSOR_SETTLE
+
+
+def encode_results_cursor(result: ExperimentTestResult) -> str:
+    position = f"{result.created_at.isoformat()}|{result.id}"
+    return base64.urlsafe_b64encode(position.encode()).decode()
+
+
+def decode_results_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        created_at, result_id = base64.urlsafe_b64decode(cursor).decode().split("|")
+        return datetime.fromisoformat(created_at), int(result_id)
+    except ValueError:
+        raise IncorrectResultsCursor(cursor)
+
+
+def results_watermark(session: Session, experiment: Experiment) -> str:
+    """Identifies the config and stored results of an experiment, changes with either."""
+    count, last_created_at, last_id = session.exec(
+        select(
+            func.count(ExperimentTestResult.id),
+            func.max(ExperimentTestResult.created_at),
+            func.max(ExperimentTestResult.id),
+        )
+        .join(Test)
+        .where(Test.experiment_id == experiment.id)
+    ).one()
+    return hash_json(
+        [experiment.config_hash, count, last_created_at, last_id]
+    )[:16]
+
+
 def get_experiment_tests_results(
-        session: Session, experiment_name, result_name=None
+        session: Session,
+        experiment_name,
+        result_name=None,
+        since: str | None = None,
+        limit: int | None = None,
+        excluded: Collection[str] = (),
 ) -> PqTestResultsList:
+    """Lists results of the experiment, optionally only those after the `since` cursor.
+
+    Without `since` and `limit` all results are listed grouped by test,
+    otherwise they are ordered by submission time and paginated by the
+    returned cursor. Results of `excluded` submissions are left out.
+
+    The cursor never passes results created less than `RESULTS_CURSOR_SETTLE`
+    ago, which could still be preceded by results committed later. Paginated
+    listings leave them for a later page, a listing of all results includes
+    them and they are listed again after its cursor.
+    """
     experiment = get_db_experiment_by_name(session, experiment_name)
-    results = []
-    for test in experiment.tests:
-        for result in test.experiment_test_results:
-            if result_name is None or result.experiment_use == result_name:
-                results.append(transform_test_result(result, test.type))
-    return PqTestResultsList(results=results)
+    horizon = results_cursor_horizon()
+    if since is None and limit is None:
+        results = []
+        last = None
+        for test in experiment.tests:
+            for result in test.experiment_test_results:
+                if result.experiment_use in excluded:
+                    continue
+                if result_name is None or result.experiment_use == result_name:
+                    results.append(transform_test_result(result, test.type))
+                    if result.created_at <= horizon and (
+                        last is None
+                        or (result.created_at, result.id) > (last.created_at, last.id)
+                    ):
+                        last = result
+        cursor = encode_results_cursor(last) if last is not None else None
+        return PqTestResultsList(results=results, cursor=cursor)
+
+    statement = experiment_results_statement(
+        experiment,
+        result_name=result_name,
+        since=decode_results_cursor(since) if since is not None else None,
+        excluded=excluded,
+    ).where(ExperimentTestResult.created_at <= horizon)
+    if limit is not None:
+        statement = statement.limit(limit)
+    rows = session.exec(statement).all()
+    return PqTestResultsList(
+        results=[transform_test_result(result, test_type) for result, test_type in rows],
+        # Polling with an unchanged cursor keeps waiting for new results
+        cursor=encode_results_cursor(rows[-1][0]) if rows else since,
+    )
+
+
+RESULTS_YIELD_PER = 500
+
+
+def experiment_results_statement(
+        experiment: Experiment,
+        test_number: int | None = None,
+        result_name: str | None = None,
+        since: tuple[datetime, int] | None = None,
+        excluded: Collection[str] = (),
+):
+    statement = (
+        select(ExperimentTestResult, Test.type)
+        .join(Test)
+        .where(Test.experiment_id == experiment.id)
+        .order_by(ExperimentTestResult.created_at, ExperimentTestResult.id)
+    )
+    if since is not None:
+        statement = statement.where(
+            tuple_(ExperimentTestResult.created_at, ExperimentTestResult.id)
+            > tuple_(*since)
+        )
+    if test_number is not None:
+        statement = statement.where(Test.number == test_number)
+    if result_name is not None:
+        statement = statement.where(ExperimentTestResult.experiment_use == result_name)
+    if excluded:
+        statement = statement.where(
+            ExperimentTestResult.experiment_use.not_in(list(excluded))
+        )
+    return statement
+
+
+def iter_experiment_result_rows(
+        session: Session,
+        experiment: Experiment,
+        test_number: int | None = None,
+        result_name: str | None = None,
+        since: str | None = None,
+        excluded: Collection[str] = (),
+) -> Iterator[
+    tuple[
+        ExperimentTestResult,
+        PqTestABResult | PqTestABXResult | PqTestMUSHRAResult | PqTestAPEResult,
+    ]
+]:
+    """Yields stored results with their schema, fetched in batches through a server-side cursor."""
+    statement = experiment_results_statement(
+        experiment,
+        test_number,
+        result_name,
+        decode_results_cursor(since) if since is not None else None,
+        excluded,
+    )
+    rows = session.exec(statement.execution_options(yield_per=RESULTS_YIELD_PER))
+    for result, test_type in rows:
+        yield result, transform_test_result(result, test_type)
+
+
+def iter_experiment_results(
+        session: Session,
+        experiment: Experiment,
+        test_number: int | None = None,
+        result_name: str | None = None,
+        since: str | None = None,
+        excluded: Collection[str] = (),
+) -> Iterator[PqTestABResult | PqTestABXResult | PqTestMUSHRAResult | PqTestAPEResult]:
+    for _, result in iter_experiment_result_rows(
+        session, experiment, test_number, result_name, since, excluded
+    ):
+        yield result
+
+
+def stream_experiment_results(
+        session: Session,
+        experiment: Experiment,
+        results_format: str = "ndjson",
+        test_number: int | None = None,
+        result_name: str | None = None,
+        since: str | None = None,
+        excluded: Collection[str] = (),
+) -> Iterator[bytes]:
+    """Serializes results as NDJSON lines or as a `PqTestResultsList` JSON document.
+
+    Output is produced in chunks of `RESULTS_YIELD_PER` results, so memory
+    use doesn't depend on the number of results.
+    """
+    results = (
+        result.model_dump_json(by_alias=True).encode()
+        for result in iter_experiment_results(
+            session, experiment, test_number, result_name, since, excluded
+        )
+    )
+    batches = iter(lambda: list(itertools.islice(results, RESULTS_YIELD_PER)), [])
+    if results_format == "ndjson":
+        for batch in batches:
+            yield b"\n".join(batch) + b"\n"
+        return
+
+    yield b'{"results":['
+    separator = b""
+    for batch in batches:
+        yield separator + b",".join(batch)
+        separator = b","
+    yield b"]}"
+
+
+def get_experiment_test(
+        session: Session, experiment_name: str, test_number: int
+) -> tuple[Experiment, PqTestBase]:
+    experiment_db = get_db_experiment_by_name(session, experiment_name)
+    if not experiment_db.configured:
+        raise ExperimentNotConfigured(experiment_name)
+    experiment = transform_experiment(experiment_db)
+    test = next((t for t in experiment.tests if t.test_number == test_number), None)
+    if test is None:
+        raise NoMatchingTest(str(test_number))
+    return experiment_db, test
+
+
+def columnar_results_table(
+        session: Session, experiment_name: str, test_number: int
+) -> tuple[Experiment, columnar.ResultsTable]:
+    experiment_db, test = get_experiment_test(session, experiment_name, test_number)
+    return experiment_db, columnar.ResultsTable(test)
+
+
+def stream_columnar_results(
+        session: Session,
+        experiment: Experiment,
+        table: columnar.ResultsTable,
+        columnar_format: str = "parquet",
+        excluded: Collection[str] = (),
+) -> Iterator[bytes]:
+    """Exports results of a test as a flat Parquet or Arrow IPC table.
+
+    Results are read through a server-side cursor and written in batches
+    of `RESULTS_YIELD_PER` submissions.
+    """
+    rows = (
+        row
+        for stored, result in iter_experiment_result_rows(
+            session, experiment, table.test.test_number, excluded=excluded
+        )
+        for row in table.rows(stored.experiment_use, stored.created_at, result)
+    )
+    batches = iter(lambda: list(itertools.islice(rows, RESULTS_YIELD_PER)), [])
+    return columnar.stream_columnar(table, batches, columnar_format)
+
+
+def build_results_csv(
+        session: Session,
+        experiment: Experiment,
+        test: PqTestBase,
+        excluded: Collection[str] = (),
+) -> csv_export.ResultsCsv:
+    question_ids = None
+    test_type = PqTestTypes(test.type)
+    if test_type in (PqTestTypes.AB, PqTestTypes.ABX) and not test.questions:
+        # Without questions in the config their ids are collected from the results
+        question_ids = sorted(
+            {
+                selection.question_id
+                for result in iter_experiment_results(
+                    session, experiment, test.test_number, excluded=excluded
+                )
+                for selection in result.selections
+            }
+        )
+    return csv_export.ResultsCsv(test, question_ids)
+
+
+def results_csv_table(
+        session: Session,
+        experiment_name: str,
+        test_number: int,
+        excluded: Collection[str] = (),
+) -> tuple[Experiment, csv_export.ResultsCsv]:
+    experiment_db, test = get_experiment_test(session, experiment_name, test_number)
+    return experiment_db, build_results_csv(session, experiment_db, test, excluded)
+
+
+def stream_results_csv(
+        session: Session,
+        experiment: Experiment,
+        table: csv_export.ResultsCsv,
+        excluded: Collection[str] = (),
+) -> Iterator[str]:
+    """Writes results of a test as CSV, reading them through a server-side cursor."""
+    rows = (
+        row
+        for stored, result in iter_experiment_result_rows(
+            session, experiment, table.test.test_number, excluded=excluded
+        )
+        for row in table.rows(stored.experiment_use, result)
+    )
+    return csv_export.stream_csv(table, rows)
+
+
+CSV_RENDER_WORKERS = 4
+
+
+def stream_results_csv_zip(
+        engine: Engine, experiment_name: str, excluded: Collection[str] = ()
+) -> Iterator[bytes]:
+    """Streams a ZIP with a CSV file of results for every test of the experiment.
+
+    Tests are rendered concurrently, each in its own thread and session,
+    at most `CSV_RENDER_WORKERS` at a time, and written to the archive in
+    test order chunk by chunk, so no CSV file is held in memory whole.
+    """
+    with Session(engine) as session:
+        experiment_db = get_db_experiment_by_name(session, experiment_name)
+        experiment = get_experiment_by_name(session, experiment_name)
+
+    def render(test: PqTestBase) -> Iterator[bytes]:
+        with Session(engine) as session:
+            table = build_results_csv(session, experiment_db, test, excluded)
+            for chunk in stream_results_csv(session, experiment_db, table, excluded):
+                yield chunk.encode()
+
+    tests = sorted(experiment.tests, key=lambda t: t.test_number)
+    files = (
+        (
+            # The size isn't known before the CSV is rendered
+            archive.ArchiveEntry(
+                f"{experiment.name}_test_{test.test_number}_{test.type}.csv", 0
+            ),
+            chunks,
+        )
+        for test, chunks in zip(
+            tests, archive.ordered_streams(render, tests, workers=CSV_RENDER_WORKERS)
+        )
+    )
+    return archive.stream_zip(files, compression=zipfile.ZIP_DEFLATED)
 
 
-def modify_experiment_tests_results_for_chart(
-    session: Session, experiment_name: str
+async def get_experiment_tests_results_async(
+        session: AsyncSession, experiment: Experiment, result_name: str
 ) -> PqTestResultsList:
-    original_results = get_experiment_tests_results(session, experiment_name)
+    statement = (
+        select(ExperimentTestResult, Test.type)
+        .join(Test)
+        .where(
+            Test.experiment_id == experiment.id,
+            ExperimentTestResult.experiment_use == result_name,
+        )
+        .order_by(Test.number, ExperimentTestResult.id)
+    )
+    rows = (await session.exec(statement)).all()
+    return PqTestResultsList(
+        results=[transform_test_result(result, test_type) for result, test_type in rows]
+    )
 
-    modified_results = [
-        result.copy(update={"type": test_type})
-        for result, test_type in zip(
-            original_results.results,
-            [test.type for test in get_db_experiment_by_name(session, experiment_name).tests],
+
+def get_mushra_scores(
+        session: Session, experiment_name: str
+) -> tuple[str, list[mushra.MushraScores]]:
+    """Returns the results watermark and score matrices of every MUSHRA test of the experiment.
+
+    Matrices are built once per results watermark and shared by statistics
+    and post-screening, results are not read again until new ones arrive.
+    """
+    experiment_db = get_db_experiment_by_name(session, experiment_name)
+    watermark = results_watermark(session, experiment_db)
+    scores = score_matrix_cache.get(experiment_name, watermark)
+    if scores is not None:
+        return watermark, scores
+
+    experiment = get_experiment_by_name(session, experiment_name)
+    scores = [
+        mushra.mushra_scores(
+            test,
+            (
+                (stored.experiment_use, result)
+                for stored, result in iter_experiment_result_rows(
+                    session, experiment_db, test.test_number
+                )
+            ),
         )
+        for test in sorted(experiment.tests, key=lambda t: t.test_number)
+        if PqTestTypes(test.type) == PqTestTypes.MUSHRA
     ]
+    return watermark, score_matrix_cache.set(experiment_name, watermark, scores)
+
+
+def get_screening_report(
+        session: Session, experiment_name: str, rules: PqScreeningRules
+) -> PqScreeningReport:
+    _, scores = get_mushra_scores(session, experiment_name)
+    submissions = screening.screen_submissions(scores, rules)
+    return PqScreeningReport(
+        experiment=experiment_name,
+        rules=rules,
+        submissions=submissions,
+        excluded=[s.experiment_use for s in submissions if s.excluded],
+    )
 
-    return PqTestResultsList(results=modified_results)
 
+def get_screening_exclusions(
+        session: Session, experiment_name: str, rules: PqScreeningRules | None
+) -> frozenset[str]:
+    """Returns submissions excluded by post-screening, none without rules."""
+    if rules is None:
+        return frozenset()
+    return frozenset(get_screening_report(session, experiment_name, rules).excluded)
+
+
+def _bootstrap_intervals(
+        pool: BootstrapPool | None, options: PqBootstrapOptions | None, test_number: int
+):
+    # Every test is resampled with its own seed derived from the requested one
+    if options is None:
+        return None
+    return functools.partial(
+        (pool or BootstrapPool()).confidence_intervals,
+        resamples=options.resamples,
+        seed=(options.seed, test_number),
+    )
+
+
+def _analysis_key(
+        experiment_name: str, analysis: str, bootstrap: PqBootstrapOptions | None
+) -> str:
+    key = f"{experiment_name}/{analysis}"
+    if bootstrap is not None:
+        key = f"{key}/bootstrap/{bootstrap.resamples}/{bootstrap.seed}"
+    return key
+
+
+def get_mushra_analysis_json(
+        session: Session,
+        experiment_name: str,
+        rules: PqScreeningRules | None = None,
+        bootstrap: PqBootstrapOptions | None = None,
+        pool: BootstrapPool | None = None,
+) -> CachedResponse:
+    """Returns serialized `PqMushraAnalysis` statistics of every MUSHRA test of the experiment.
+
+    With post-screening `rules` the submissions they exclude are left out,
+    with `bootstrap` options bootstrap intervals are computed in the `pool`.
+    Entries are versioned by the results watermark, so they are recomputed
+    once new results arrive even if an invalidation was missed.
+    """
+    watermark, scores = get_mushra_scores(session, experiment_name)
+    key = _analysis_key(experiment_name, "mushra", bootstrap)
+    if rules is not None:
+        key = f"{key}/{hash_json(rules.model_dump())[:16]}"
+    cached = analysis_cache.get(key)
+    if cached is not None and cached.version == watermark:
+        return cached
+
+    generation = analysis_cache.generation()
+    excluded = get_screening_exclusions(session, experiment_name, rules)
+    analysis = PqMushraAnalysis(
+        experiment=experiment_name,
+        tests=[
+            mushra.analyze_mushra_test(
+                test_scores,
+                excluded,
+                _bootstrap_intervals(pool, bootstrap, test_scores.test.test_number),
+            )
+            for test_scores in scores
+        ],
+        bootstrap=bootstrap,
+    )
+    entry = CachedResponse(watermark, analysis.model_dump_json(by_alias=True).encode())
+    return analysis_cache.set(key, entry, generation)
+
+
+def get_ape_analysis_json(
+        session: Session,
+        experiment_name: str,
+        bootstrap: PqBootstrapOptions | None = None,
+        pool: BootstrapPool | None = None,
+) -> CachedResponse:
+    """Returns serialized `PqApeAnalysis` statistics of every APE test of the experiment."""
+    experiment_db = get_db_experiment_by_name(session, experiment_name)
+    watermark = results_watermark(session, experiment_db)
+    key = _analysis_key(experiment_name, "ape", bootstrap)
+    cached = analysis_cache.get(key)
+    if cached is not None and cached.version == watermark:
+        return cached
+
+    generation = analysis_cache.generation()
+    experiment = get_experiment_by_name(session, experiment_name)
+    analysis = PqApeAnalysis(
+        experiment=experiment_name,
+        tests=[
+            ape.analyze_ape_test(
+                test,
+                iter_experiment_results(session, experiment_db, test.test_number),
+                _bootstrap_intervals(pool, bootstrap, test.test_number),
+            )
+            for test in sorted(experiment.tests, key=lambda t: t.test_number)
+            if PqTestTypes(test.type) == PqTestTypes.APE
+        ],
+        bootstrap=bootstrap,
+    )
+    entry = CachedResponse(watermark, analysis.model_dump_json(by_alias=True).encode())
+    return analysis_cache.set(key, entry, generation)
+
+PREFERENCE_TEST_TYPES = (PqTestTypes.AB, PqTestTypes.ABX)
+
+
+def _count_new_selections(
+        session: Session, experiment: Experiment, counts: preference.SelectionCounts
+) -> preference.SelectionCounts:
+    statement = experiment_results_statement(experiment, since=counts.cursor).where(
+        Test.type.in_(PREFERENCE_TEST_TYPES)
+    )
+    rows = session.exec(statement.execution_options(yield_per=RESULTS_YIELD_PER))
+    for batch in iter(lambda: list(itertools.islice(rows, RESULTS_YIELD_PER)), []):
+        last, _ = batch[-1]
+        counts = preference.count_selections(
+            counts,
+            (transform_test_result(result, test_type) for result, test_type in batch),
+            (last.created_at, last.id),
+        )
+    return counts
+
+
+def get_selection_counts(
+        session: Session, experiment_name: str
+) -> preference.SelectionCounts:
+    """Returns selection counts of the AB and ABX tests of the experiment.
+
+    Cached counts are extended with the results stored after their cursor,
+    so only new results are read. They are counted again from the start
+    when the config changes or results were committed out of cursor order.
+    """
+    experiment_db = get_db_experiment_by_name(session, experiment_name)
+    version = f"{experiment_db.id}/{experiment_db.config_hash}"
+    stored = session.exec(
+        select(func.count(ExperimentTestResult.id))
+        .join(Test)
+        .where(Test.experiment_id == experiment_db.id, Test.type.in_(PREFERENCE_TEST_TYPES))
+    ).one()
+
+    counts = selection_counts_cache.get(experiment_name, version)
+    if counts is not None:
+        counts = _count_new_selections(session, experiment_db, counts)
+        if counts.results < stored:
+            counts = None
+    if counts is None:
+        experiment = get_experiment_by_name(session, experiment_name)
+        counts = _count_new_selections(
+            session,
+            experiment_db,
+            preference.empty_selection_counts(
+                test
+                for test in experiment.tests
+                if PqTestTypes(test.type) in PREFERENCE_TEST_TYPES
+            ),
+        )
+    return selection_counts_cache.set(experiment_name, version, counts)
+
+
+def get_preference_analysis_json(session: Session, experiment_name: str) -> CachedResponse:
+    """Returns serialized `PqPreferenceAnalysis` statistics of every AB and ABX test."""
+    experiment_db = get_db_experiment_by_name(session, experiment_name)
+    watermark = results_watermark(session, experiment_db)
+    key = f"{experiment_name}/preference"
+    cached = analysis_cache.get(key)
+    if cached is not None and cached.version == watermark:
+        return cached
+
+    generation = analysis_cache.generation()
+    analysis = PqPreferenceAnalysis(
+        experiment=experiment_name,
+        tests=preference.analyze_selections(get_selection_counts(session, experiment_name)),
+    )
+    entry = CachedResponse(watermark, analysis.model_dump_json(by_alias=True).encode())
+    return analysis_cache.set(key, entry, generation)
 
 
 def authenticate(session: Session, username: str, hashed_password: str) -> Admin | None:
@@ -311,6 +1951,26 @@ def add_sample_rating(session: Session, sample: PqSampleRating):
     )
 
 
+async def add_sample_rating_async(
+        session: AsyncSession, sample: PqSampleRating
+) -> PqSampleRating:
+    sample_record = (
+        await session.exec(select(Sample).where(Sample.id == int(sample.sample_id)))
+    ).first()
+    if not sample_record:
+        raise ValueError(f"Sample '{sample.name}' not found")
+
+    session.add(Rating(sample_id=sample_record.id, rating=sample.rating))
+    await session.commit()
+
+    return PqSampleRating(
+        sampleId=str(sample_record.id),
+        name=sample_record.title,
+        assetPath=sample_record.file_path,
+        rating=sample.rating
+    )
+
+
 def upload_sample(
         session: Session, manager: SampleManager, audio_file: UploadFile
 ):
@@ -354,6 +2014,7 @@ def assign_sample_to_experiment(session: Session, manager: SampleManager, experi
     if not sample:
         raise ValueError(f"Sample with id '{sample_id}' not found")
     manager.copy_sample(sample.file_path,experiment_name, sample.file_path.split("/")[-1])
+    invalidation_bus.publish(None, samples_key(experiment_name))
     return sample.file_path.split("/")[-1]
 
 def create_sample(session: Session, file_path: str, title: str) -> Sample:
@@ -385,250 +2046,171 @@ def delete_sample(
     session.commit()
 
 
-def prepare_csv_result(session: Session, result_dict: dict):
+def render_pdf_report(
+        session: Session, experiment_name: str, excluded: Collection[str] = ()
+) -> bytes:
+    """Renders a PDF report with a summary and a results table for every test with results.
 
-    match result_dict["test_type"]:
-        case "AB":
-            assert all(isinstance(result, PqTestABResult) for result in result_dict["results"]), \
-                "Not all results are instances of PqTestABResult"
+    Results are read twice through a server-side cursor, first to aggregate
+    the summary and then to write the table, so they are never all loaded.
+    """
+    experiment_db = get_db_experiment_by_name(session, experiment_name)
+    experiment = get_experiment_by_name(session, experiment_name)
+    report = pdf_report.PdfReport(f"Experiment: {experiment_name}")
+    for test in sorted(experiment.tests, key=lambda t: t.test_number):
+        summary = pdf_report.ResultsSummary(test)
+        for result in iter_experiment_results(
+            session, experiment_db, test.test_number, excluded=excluded
+        ):
+            summary.add(result)
+        if not summary.count:
+            continue
+        table = build_results_csv(session, experiment_db, test, excluded)
+        rows = (
+            row
+            for stored, result in iter_experiment_result_rows(
+                session, experiment_db, test.test_number, excluded=excluded
+            )
+            for row in table.rows(stored.experiment_use, result)
+        )
+        report.add_test(test, summary, table, rows)
+    return report.output()
 
-            print(result_dict["results"])
-            all_questions = sorted({
-                selection.question_id
-                for result in result_dict["results"]
-                for selection in result.selections
-            })
 
-            headers = ["Test type"] + [f"question {i + 1},sample {i + 1}" for i in range(len(all_questions))] + ["Feedback"]
-            csv_content = ",".join(headers) + "\n"
+class IncorrectExportRequest(PqException):
+    def __init__(self, reason: str) -> None:
+        super().__init__(f"Incorrect export request: {reason}!")
 
-            for result in result_dict["results"]:
-                row = [result_dict["test_type"]]
-                question_to_sample = {sel.question_id: sel.sample_id for sel in result.selections}
 
-                for question in all_questions:
-                    sample = question_to_sample.get(question, "Null")
-                    row.extend([question, sample])
+class ExportJobNotFound(PqException):
+    def __init__(self, job_id: str) -> None:
+        super().__init__(f"Export {job_id} not found!", error_code=404)
 
-                row.append(getattr(result, "feedback", "") or "")
-                csv_content += ",".join(row) + "\n"
 
-            return csv_content
+class ExportNotReady(PqException):
+    def __init__(self, job: PqExportJob) -> None:
+        reason = f": {job.error}" if job.error else ""
+        super().__init__(
+            f"Export {job.job_id} is {job.status}{reason}!", error_code=409
+        )
+
+
+def describe_export(
+        session: Session, experiment: Experiment, export: PqExportRequest
+) -> tuple[str, str, str]:
+    """Validates an export request, returns its name, file name and media type."""
+    match export.kind:
+        case "pdf":
+            return "pdf", f"{experiment.name}_all_tests.pdf", "application/pdf"
+        case "csv" if export.test_number is None:
+            return "csv", f"{experiment.name}.zip", "application/zip"
+        case "csv":
+            _, test = get_experiment_test(session, experiment.name, export.test_number)
+            return (
+                f"csv_test_{export.test_number}",
+                f"{experiment.name}_test_{export.test_number}_{test.type}.csv",
+                "text/csv",
+            )
+        case "columnar":
+            if export.test_number is None:
+                raise IncorrectExportRequest("columnar exports require a test number")
+            columnar_results_table(session, experiment.name, export.test_number)
+            extension = "parquet" if export.columnar_format == "parquet" else "arrows"
+            return (
+                f"{export.columnar_format}_test_{export.test_number}",
+                f"{experiment.name}_test_{export.test_number}.{extension}",
+                columnar.COLUMNAR_FORMATS[export.columnar_format],
+            )
+
+
+def render_export(
+        engine: Engine, experiment_name: str, export: PqExportRequest
+) -> Iterator[bytes]:
+    with Session(engine) as session:
+        excluded = get_screening_exclusions(session, experiment_name, export.screening)
+    match export.kind:
+        case "pdf":
+            with Session(engine) as session:
+                yield render_pdf_report(session, experiment_name, excluded)
+        case "csv" if export.test_number is None:
+            yield from stream_results_csv_zip(engine, experiment_name, excluded)
+        case "csv":
+            with Session(engine) as session:
+                experiment, table = results_csv_table(
+                    session, experiment_name, export.test_number, excluded
+                )
+                for chunk in stream_results_csv(session, experiment, table, excluded):
+                    yield chunk.encode()
+        case "columnar":
+            with Session(engine) as session:
+                experiment, table = columnar_results_table(
+                    session, experiment_name, export.test_number
+                )
+                yield from stream_columnar_results(
+                    session, experiment, table, export.columnar_format, excluded
+                )
+
+
+def export_key(experiment_name: str, job_id: str) -> str:
+    # Job IDs are `<export name>.<results watermark>`
+    export_name, _, watermark = job_id.rpartition(".")
+    if not export_name or "/" in job_id:
+        raise ExportJobNotFound(job_id)
+    return f"{experiment_name}/{export_name}/{watermark}"
+
+
+def submit_export_job(
+        session: Session,
+        jobs: ExportJobs,
+        engine: Engine,
+        experiment_name: str,
+        export: PqExportRequest,
+) -> PqExportJob:
+    """Starts rendering an export in the background, unless it is already stored.
+
+    The job ID depends on the export and the results watermark, so while no
+    results arrive and the config doesn't change, requests get the finished
+    job right away. An export replaced by a newer one is removed.
+    """
+    experiment = get_db_experiment_by_name(session, experiment_name)
+    export_name, file_name, media_type = describe_export(session, experiment, export)
+    if export.screening is not None:
+        # Stored separately from the unscreened export, which isn't replaced by it
+        export_name = f"{export_name}_screened_{hash_json(export.screening.model_dump())[:8]}"
+    job_id = f"{export_name}.{results_watermark(session, experiment)}"
+    return jobs.submit(
+        export_key(experiment_name, job_id),
+        job_id,
+        functools.partial(render_export, engine, experiment_name, export),
+        file_name,
+        media_type,
+        stale_prefix=f"{experiment_name}/{export_name}/",
+    )
 
-        case "ABX":
-            assert all(isinstance(result, PqTestABXResult) for result in result_dict["results"]), \
-                "Not all results are instances of PqTestABXResult"
-            print(result_dict["results"])
-            all_questions = sorted({
-                selection.question_id
-                for result in result_dict["results"]
-                for selection in result.selections
-            })
-
-            headers = ["Test type", "xSample", "xSelected"] + [
-                f"question {i + 1},sample {i + 1}" for i in range(len(all_questions))
-            ] + ["Feedback"]
-            csv_content = ",".join(headers) + "\n"
-
-            for result in result_dict["results"]:
-                row = [result_dict["test_type"], result.x_sample_id, result.x_selected]
-                question_to_sample = {sel.question_id: sel.sample_id for sel in result.selections}
-
-                for question in all_questions:
-                    sample = question_to_sample.get(question, "Null")
-                    row.extend([question, sample])
-
-                row.append(getattr(result, "feedback", "") or "")
-                csv_content += ",".join(row) + "\n"
-
-            return csv_content
-
-        case "MUSHRA":
-            assert all(isinstance(result, PqTestMUSHRAResult) for result in result_dict["results"]), \
-                "Not all results are instances of PqTestMUSHRAResult"
-
-            all_anchors = sorted({
-                anchor.sample_id
-                for result in result_dict["results"]
-                for anchor in result.anchors_scores
-            })
-            all_samples = sorted({
-                sample.sample_id
-                for result in result_dict["results"]
-                for sample in result.samples_scores
-            })
-
-            headers = (["Test type", "ReferenceFile", "ReferenceScore"]
-                       + [f"Anchor Sample {i+1},Anchor Score {i+1}"for i in range(len(all_anchors))]
-                       + [f"Sample {i+1},Sample Score {i+1}" for i in range(len(all_samples))]
-                       + ["Feedback"])
-            csv_content = ",".join(headers) + "\n"
-            for result in result_dict["results"]:
-                row = [result_dict["test_type"], result_dict["reference_file"], result.reference_score]
-                for anchor in result.anchors_scores:
-                    row.extend([anchor.sample_id, anchor.score])
-                for sample in result.samples_scores:
-                    row.extend([sample.sample_id, sample.score])
-                row.append(getattr(result, "feedback", "") or "")
-                csv_content += ",".join(map(str, row)) + "\n"
-
-            return csv_content
-
-        case "APE":
-            assert all(isinstance(result, PqTestAPEResult) for result in result_dict["results"]), \
-            "Not all results are instances of PqTestAPEResult"
-
-            all_samples = sorted({
-                sample.sample_id
-                for result in result_dict["results"]
-                for axis in result.axis_results
-                for sample in axis.sample_ratings
-            })
-            headers = ["Test type", "Axis"] + [f"Sample {i+1},Sample Score {i+1}" for i in range(len(all_samples))] + ["Feedback"]
-            csv_content = ",".join(headers) + "\n"
-            for result in result_dict["results"]:
-                for axis in result.axis_results:
-                    row = [result_dict["test_type"], axis.axis_id]
-                    for sample in axis.sample_ratings:
-                        row.extend([sample.sample_id, sample.rating])
-                    row.append(getattr(result, "feedback", "") or "")
-                    csv_content += ",".join(map(str, row)) + "\n"
-            return csv_content
-
-    return
-
-def generate_csv_for_test(session: Session, experiment, results, test_number: int):
-    results_dict = {
-        "test_type": experiment.tests[test_number - 1].type,
-        "results": []
-    }
-    if results_dict["test_type"] == "MUSHRA":
-        results_dict["reference_file"] = experiment.tests[test_number - 1].reference.asset_path
-
-    for r in results:
-        result_dict = dict([r])
-        for k, v in result_dict.items():
-            for test_result in v:
-                if test_result.test_number == test_number:
-                    results_dict["results"].append(test_result)
-    csv_data = prepare_csv_result(session, results_dict)
-    return csv_data
-
-def generate_pdf_for_experiment(session, experiment, experiment_name, results) -> bytes:
-    pdf = FPDF()
-    pdf.set_auto_page_break(auto=True, margin=15)
-    for idx, test in enumerate(experiment.tests):
-        test_number = idx + 1
-        test_results = []
-        for r in results:
-            result_dict = dict([r])
-            for k, v in result_dict.items():
-                for test_result in v:
-                    if hasattr(test_result, 'test_number') and test_result.test_number == test_number:
-                        test_results.append(test_result)
-        if not test_results:
-            continue
-        match test.type:
-            case "AB":
-                all_questions = sorted({
-                    selection.question_id
-                    for result in test_results
-                    for selection in result.selections
-                })
-                headers = ["Test type"] + [f"Question {i + 1}" for i in range(len(all_questions))] + [f"Sample {i + 1}" for i in range(len(all_questions))] + ["Feedback"]
-                data_matrix = []
-                for result in test_results:
-                    row = [str(test.type)]
-                    question_to_sample = {sel.question_id: sel.sample_id for sel in result.selections}
-                    for question in all_questions:
-                        row.append(question)
-                    for question in all_questions:
-                        row.append(question_to_sample.get(question, "Null"))
-                    row.append(getattr(result, "feedback", "") or "")
-                    data_matrix.append(row)
-            case "ABX":
-                all_questions = sorted({
-                    selection.question_id
-                    for result in test_results
-                    for selection in result.selections
-                })
-                headers = ["Test type", "xSample", "xSelected"] + [f"Question {i + 1}" for i in range(len(all_questions))] + [f"Sample {i + 1}" for i in range(len(all_questions))] + ["Feedback"]
-                data_matrix = []
-                for result in test_results:
-                    row = [str(test.type), result.x_sample_id, result.x_selected]
-                    question_to_sample = {sel.question_id: sel.sample_id for sel in result.selections}
-                    for question in all_questions:
-                        row.append(question)
-                    for question in all_questions:
-                        row.append(question_to_sample.get(question, "Null"))
-                    row.append(getattr(result, "feedback", "") or "")
-                    data_matrix.append(row)
-            case "MUSHRA":
-                all_anchors = sorted({
-                    anchor.sample_id
-                    for result in test_results
-                    for anchor in result.anchors_scores
-                })
-                all_samples = sorted({
-                    sample.sample_id
-                    for result in test_results
-                    for sample in result.samples_scores
-                })
-                headers = ["Test type", "Reference File", "Reference Score"]
-                for i in range(len(all_anchors)):
-                    headers += [f"Anchor Sample {i+1}", f"Anchor Score {i+1}"]
-                for i in range(len(all_samples)):
-                    headers += [f"Sample {i+1}", f"Sample Score {i+1}"]
-                headers += ["Feedback"]
-                data_matrix = []
-                for result in test_results:
-                    reference_file = getattr(getattr(test, 'reference', None), 'asset_path', None)
-                    row = [str(test.type), reference_file, result.reference_score if hasattr(result, 'reference_score') else ""]
-                    for anchor in getattr(result, 'anchors_scores', []):
-                        row.extend([anchor.sample_id, anchor.score])
-                    for sample in getattr(result, 'samples_scores', []):
-                        row.extend([sample.sample_id, sample.score])
-                    row.append(getattr(result, "feedback", "") or "")
-                    data_matrix.append(row)
-            case "APE":
-                all_samples = sorted({
-                    sample.sample_id
-                    for result in test_results
-                    for axis in result.axis_results
-                    for sample in axis.sample_ratings
-                })
-                headers = ["Test type", "Axis"]
-                for i in range(len(all_samples)):
-                    headers += [f"Sample {i+1}", f"Samp Score {i+1}"]
-                headers += ["Feedback"]
-                data_matrix = []
-                for result in test_results:
-                    for axis in result.axis_results:
-                        row = [str(test.type), axis.axis_id]
-                        for sample in axis.sample_ratings:
-                            row.extend([sample.sample_id, sample.rating])
-                        row.append(getattr(result, "feedback", "") or "")
-                        data_matrix.append(row)
-            case _:
-                headers = []
-                data_matrix = []
-        for row in data_matrix:
-            pdf.add_page()
-            pdf.set_font("Arial", size=9)
-            pdf.cell(0, 10, txt=f"Experiment: {experiment_name} - Test {test_number} ({test.type})", ln=True, align='C')
-            pdf.ln(2)
-
-            for i, header in enumerate(headers):
-                value = row[i] if i < len(row) else ""
-                pdf.set_fill_color(173, 216, 230)
-                pdf.set_font("Arial", 'B', 9)
-                pdf.cell(50, 8, str(header), border=1, align='L', fill=True)
-
-                pdf.set_fill_color(255, 255, 255)
-                pdf.set_font("Arial", '', 9)
-                pdf.cell(130, 8, str(value), border=1, align='L', fill=True)
-
-                pdf.ln(8)
-
-    return pdf.output(dest='S').encode('latin1')
 
+def get_export_job(jobs: ExportJobs, experiment_name: str, job_id: str) -> PqExportJob:
+    job = jobs.status(export_key(experiment_name, job_id))
+    if job is None:
+        raise ExportJobNotFound(job_id)
+    return job
+
+
+async def wait_for_export_job(
+        jobs: ExportJobs, experiment_name: str, job_id: str
+) -> PqExportJob:
+    job = await jobs.wait(export_key(experiment_name, job_id))
+    if job is None:
+        raise ExportJobNotFound(job_id)
+    return job
+
+
+def get_export_artifact(
+        jobs: ExportJobs, experiment_name: str, job_id: str
+) -> tuple[PqExportJob, Iterator[bytes]]:
+    job = get_export_job(jobs, experiment_name, job_id)
+    if job.status != "done":
+        raise ExportNotReady(job)
+    content = jobs.store.get(export_key(experiment_name, job_id))
+    if content is None:
+        raise ExportJobNotFound(job_id)
+    return job, content
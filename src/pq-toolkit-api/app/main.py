@@ -1,22 +1,72 @@
+# Imported first, the worker start time is recorded on import outside gunicorn
+from app.core import server
+
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+
+from anyio.to_thread import current_default_thread_limiter, run_sync
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from fastapi.routing import APIRoute
 from starlette.middleware.cors import CORSMiddleware
 from app.api.main_router import api_router
 from app.core.config import settings
+from app.core.db import engine, async_engine
+from app.analysis.bootstrap import BootstrapPool
+from app.core.exports import export_jobs_from_settings
+from app.core.invalidation import invalidation_bus
+from app.core.sample_manager import SampleManager
+from app.core.static_publisher import static_publisher_from_settings
 
 import logging
 from app.utils import PqException
 
+logger = logging.getLogger(__name__)
+
 
 def custom_generate_unique_id(route: APIRoute) -> str:
     return f"{route.tags[0]}-{route.name}"
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Sync routes run in this threadpool, sized together with the DB pool
+    current_default_thread_limiter().total_tokens = settings.THREADPOOL_TOKENS
+
+    # Connection pools are opened once per worker and shared by its requests
+    app.state.sample_manager = await run_sync(SampleManager.from_settings, settings)
+    app.state.static_publisher = await run_sync(
+        static_publisher_from_settings, settings
+    )
+    app.state.export_jobs = await run_sync(export_jobs_from_settings, settings)
+    app.state.bootstrap_pool = BootstrapPool(settings.BOOTSTRAP_WORKERS)
+    async with async_engine.connect():
+        pass
+    await run_sync(lambda: engine.connect().close())
+    invalidation_bus.start(engine, fallback_ttl=settings.CACHE_FALLBACK_TTL)
+
+    app.state.startup_seconds = time.perf_counter() - server.worker_started_at
+    logger.info(
+        "Worker %d ready in %.3fs (event loop: %s)",
+        os.getpid(),
+        app.state.startup_seconds,
+        type(asyncio.get_running_loop()).__module__,
+    )
+    yield
+    app.state.export_jobs.shutdown()
+    app.state.bootstrap_pool.shutdown()
+    invalidation_bus.stop()
+    await async_engine.dispose()
+    engine.dispose()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     root_path="/api/",
     generate_unique_id_function=custom_generate_unique_id,
+    lifespan=lifespan,
 )
 
 logging.basicConfig(level=settings.LOG_LEVEL)
@@ -1,7 +1,8 @@
 import uuid
+from datetime import datetime
 from uuid import UUID
 
-from sqlalchemy import Column, JSON
+from sqlalchemy import Column, Index, JSON, UniqueConstraint, func
 from sqlmodel import SQLModel, Field, Relationship
 
 from app.schemas import PqTestTypes
@@ -33,6 +34,8 @@ class Experiment(SQLModel, table=True):
     description: str | None = Field(default=None)
     end_text: str | None
     configured: bool = False
+    config_version: int = 0
+    config_hash: str | None = Field(default=None)
 
     tests: list["Test"] = Relationship(back_populates="experiment")
 
@@ -50,15 +53,74 @@ class Test(SQLModel, table=True):
     )
 
 
+class ExperimentVersion(SQLModel, table=True):
+    __table_args__ = (UniqueConstraint("experiment_id", "version"),)
+
+    id: int | None = Field(default=None, primary_key=True)
+    experiment_id: UUID = Field(foreign_key="experiment.id", index=True)
+    version: int
+    config: dict = Field(sa_column=Column(JSON))
+    sample_manifest: list = Field(sa_column=Column(JSON))
+    config_hash: str
+    # Config hash of the experiment when the version was published, results
+    # are only linked to a version frozen from the live config
+    experiment_config_hash: str | None = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
 class ExperimentTestResult(SQLModel, table=True):
+    # Keyset pagination of results goes through (created_at, id)
+    __table_args__ = (
+        Index("ix_experimenttestresult_created_at_id", "created_at", "id"),
+    )
+
     id: int | None = Field(default=None, primary_key=True)
     test_result: dict = Field(sa_column=Column(JSON))
     test_id: int = Field(foreign_key="test.id")
     experiment_use: str
+    experiment_version_id: int | None = Field(
+        default=None, foreign_key="experimentversion.id"
+    )
+    created_at: datetime = Field(
+        default_factory=datetime.utcnow, sa_column_kwargs={"server_default": func.now()}
+    )
 
     test: Test = Relationship(back_populates="experiment_test_results")
 
 
+class ResultAggregate(SQLModel, table=True):
+    # Running totals of the results of a test, incremented in place with every
+    # stored result, so concurrent submissions don't wait for each other
+    __table_args__ = (
+        UniqueConstraint("test_id", "kind", "question_id", "sample_id"),
+    )
+
+    id: int | None = Field(default=None, primary_key=True)
+    test_id: int = Field(foreign_key="test.id", index=True)
+    kind: str
+    question_id: str = ""
+    sample_id: str = ""
+    count: int = 0
+    total: float = 0.0
+    squares: float = 0.0
+
+
+class ResultHistogramBin(SQLModel, table=True):
+    # Number of scores of an aggregate in one 10 point range, only stored once
+    # a score falls into it
+    __table_args__ = (
+        UniqueConstraint("test_id", "kind", "question_id", "sample_id", "bin"),
+    )
+
+    id: int | None = Field(default=None, primary_key=True)
+    test_id: int = Field(foreign_key="test.id", index=True)
+    kind: str
+    question_id: str = ""
+    sample_id: str = ""
+    bin: int
+    count: int = 0
+
+
 class Rating(SQLModel, table=True):
     id: int | None = Field(default=None, primary_key=True)
     sample_id: int = Field(foreign_key="sample.id")
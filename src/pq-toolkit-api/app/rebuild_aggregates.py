@@ -0,0 +1,34 @@
+import argparse
+import logging
+
+from sqlmodel import Session, select
+
+from app import crud
+from app.core.db import engine
+from app.models import Experiment
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def rebuild(experiment_names: list[str]) -> None:
+    with Session(engine) as session:
+        if not experiment_names:
+            experiment_names = list(session.exec(select(Experiment.name)).all())
+        for name in experiment_names:
+            count = crud.rebuild_result_aggregates(session, name)
+            logger.info("Rebuilt aggregates of %s from %d results", name, count)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Recomputes the result aggregates from the stored results."
+    )
+    parser.add_argument(
+        "experiments", nargs="*", help="names of the experiments, all when omitted"
+    )
+    rebuild(parser.parse_args().experiments)
+
+
+if __name__ == "__main__":
+    main()
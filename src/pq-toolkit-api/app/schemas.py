@@ -1,8 +1,9 @@
 from pydantic import BaseModel, Field, AliasChoices, ConfigDict, field_validator, UUID4
+from datetime import datetime
 from enum import Enum
 import inspect
 import uuid
-from typing import Optional
+from typing import Literal, Optional
 
 
 class AccessToken(BaseModel):
@@ -199,9 +200,19 @@ class PqTestAPEResult(PqTestBaseResult):
 
 
 class PqTestResultsList(BaseModel):
+    """
+    Class representing a list of test results.
+
+    Attributes:
+        results: Test results.
+        cursor: Position after the last listed result, pass it as `since` to fetch only newer results.
+            It is kept a few seconds behind the latest submissions, so none of them are skipped.
+    """
+
     results: list[
         PqTestABResult | PqTestABXResult | PqTestMUSHRAResult | PqTestAPEResult
     ]
+    cursor: str | None = None
 
 
 class PqExperiment(BaseModel):
@@ -250,6 +261,86 @@ class PqExperimentsList(BaseModel):
     experiments: list[str]
 
 
+class PqSampleObject(BaseModel):
+    """
+    Class representing a stored sample file of an experiment.
+
+    Attributes:
+        name: File name of the sample.
+        size: Size in bytes.
+        etag: Storage ETag of the file content.
+    """
+
+    name: str
+    size: int
+    etag: str
+
+
+class PqManifestSample(BaseModel):
+    """
+    Class representing a sample file used by an experiment test.
+
+    Attributes:
+        test_number: Number of the test using the sample.
+        sample_id: An ID of the sample within the test.
+        asset_path: File name of the sample.
+        url: Path the sample file is downloaded from.
+        size: Size in bytes, None when the file is not uploaded.
+        etag: Storage ETag of the file content, None when the file is not uploaded.
+        duration: Duration in seconds, None when it can't be read from the file.
+    """
+
+    test_number: int = Field(
+        alias="testNumber", validation_alias=AliasChoices("testNumber", "test_number")
+    )
+    sample_id: str = Field(
+        alias="sampleId", validation_alias=AliasChoices("sampleId", "sample_id")
+    )
+    asset_path: str = Field(
+        alias="assetPath", validation_alias=AliasChoices("assetPath", "asset_path")
+    )
+    url: str
+    size: int | None = None
+    etag: str | None = None
+    duration: float | None = None
+
+
+class PqSampleManifest(BaseModel):
+    """
+    Class representing every sample of an experiment in test order.
+
+    Attributes:
+        experiment: Experiment name.
+        samples: Samples of all tests, ordered by test number.
+    """
+
+    experiment: str
+    samples: list[PqManifestSample]
+
+
+class PqExperimentVersion(BaseModel):
+    """
+    Class representing an immutable published version of an experiment.
+
+    Attributes:
+        version: Version number, increasing per experiment.
+        config_hash: SHA-256 of the config and sample manifest of the version.
+        created_at: Publication time.
+    """
+
+    version: int
+    config_hash: str = Field(
+        alias="configHash", validation_alias=AliasChoices("configHash", "config_hash")
+    )
+    created_at: datetime = Field(
+        alias="createdAt", validation_alias=AliasChoices("createdAt", "created_at")
+    )
+
+
+class PqExperimentVersionsList(BaseModel):
+    versions: list[PqExperimentVersion]
+
+
 class PqResultsList(BaseModel):
     results: list[str]
 
@@ -258,12 +349,581 @@ class PqSuccessResponse(BaseModel):
     success: bool
 
 
+class PqConfigDiff(PqSuccessResponse):
+    """
+    Class representing changes applied by an experiment config upload.
+
+    Attributes:
+        changed: False when the uploaded config was identical to the current one.
+        added: Numbers of new tests.
+        removed: Numbers of deleted tests, their results are deleted.
+        modified: Numbers of tests with a changed setup, their results are deleted.
+        untouched: Numbers of unchanged tests, their results are kept.
+    """
+
+    changed: bool
+    added: list[int] = []
+    removed: list[int] = []
+    modified: list[int] = []
+    untouched: list[int] = []
+
+
+class PqImportSummary(PqSuccessResponse):
+    """
+    Class representing the outcome of an experiment bundle import.
+
+    Attributes:
+        config: Changes applied to the experiment config.
+        uploaded_samples: Names of uploaded sample files.
+        skipped_samples: Names of sample files already stored with the same content.
+        imported_results: Number of imported test results.
+    """
+
+    config: PqConfigDiff
+    uploaded_samples: list[str] = Field(
+        default=[],
+        alias="uploadedSamples",
+        validation_alias=AliasChoices("uploadedSamples", "uploaded_samples"),
+    )
+    skipped_samples: list[str] = Field(
+        default=[],
+        alias="skippedSamples",
+        validation_alias=AliasChoices("skippedSamples", "skipped_samples"),
+    )
+    imported_results: int = Field(
+        default=0,
+        alias="importedResults",
+        validation_alias=AliasChoices("importedResults", "imported_results"),
+    )
+
+
+class PqScreeningRules(BaseModel):
+    """
+    Class representing ITU-R BS.1534 post-screening rules of MUSHRA listeners.
+
+    Attributes:
+        reference_threshold: Hidden reference scores below it fail a trial.
+        anchor_threshold: Anchor scores above it fail a trial, None disables the rule.
+        max_failed_share: Share of failed trials above which a submission is excluded.
+    """
+
+    reference_threshold: int = Field(
+        default=90,
+        alias="referenceThreshold",
+        validation_alias=AliasChoices("referenceThreshold", "reference_threshold"),
+    )
+    anchor_threshold: int | None = Field(
+        default=90,
+        alias="anchorThreshold",
+        validation_alias=AliasChoices("anchorThreshold", "anchor_threshold"),
+    )
+    max_failed_share: float = Field(
+        default=0.15,
+        ge=0,
+        le=1,
+        alias="maxFailedShare",
+        validation_alias=AliasChoices("maxFailedShare", "max_failed_share"),
+    )
+
+
+class PqScreenedSubmission(BaseModel):
+    """
+    Class representing the post-screening outcome of one submission.
+
+    Attributes:
+        experiment_use: ID of the submission.
+        trials: Number of MUSHRA results in the submission.
+        reference_failures: Trials with the hidden reference scored too low.
+        anchor_failures: Trials with an anchor scored too high.
+        excluded: Whether the submission is excluded.
+    """
+
+    experiment_use: str = Field(
+        alias="experimentUse",
+        validation_alias=AliasChoices("experimentUse", "experiment_use"),
+    )
+    trials: int
+    reference_failures: int = Field(
+        alias="referenceFailures",
+        validation_alias=AliasChoices("referenceFailures", "reference_failures"),
+    )
+    anchor_failures: int = Field(
+        alias="anchorFailures",
+        validation_alias=AliasChoices("anchorFailures", "anchor_failures"),
+    )
+    excluded: bool
+
+
+class PqScreeningReport(BaseModel):
+    """
+    Class representing the post-screening of all MUSHRA submissions of an experiment.
+
+    Attributes:
+        experiment: Experiment name.
+        rules: Applied rules.
+        submissions: Outcome per submission with MUSHRA results.
+        excluded: IDs of excluded submissions.
+    """
+
+    experiment: str
+    rules: PqScreeningRules
+    submissions: list[PqScreenedSubmission]
+    excluded: list[str]
+
+
+class PqExportRequest(BaseModel):
+    """
+    Class representing an export of experiment results to be rendered in the background.
+
+    Attributes:
+        kind: Export format, a PDF report, CSV results or a columnar table.
+        test_number: Test to export, required for columnar exports. CSV exports
+            of all tests are archived in a ZIP file.
+        columnar_format: File format of columnar exports.
+        screening: Post-screening rules, submissions they exclude are left out.
+    """
+
+    kind: Literal["pdf", "csv", "columnar"]
+    test_number: int | None = Field(
+        default=None,
+        alias="testNumber",
+        validation_alias=AliasChoices("testNumber", "test_number"),
+    )
+    columnar_format: Literal["parquet", "arrow"] = Field(
+        default="parquet",
+        alias="columnarFormat",
+        validation_alias=AliasChoices("columnarFormat", "columnar_format"),
+    )
+    screening: PqScreeningRules | None = None
+
+
+class PqExportJob(BaseModel):
+    """
+    Class representing a background export job and its stored artifact.
+
+    Attributes:
+        job_id: Job ID, the same for every request of an export while results don't change.
+        status: Job status, the artifact can be downloaded once it is done.
+        file_name: File name of the artifact.
+        media_type: Media type of the artifact.
+        error: Reason of the failure of a failed job.
+        updated_at: Time of the last status change.
+    """
+
+    job_id: str = Field(alias="jobId", validation_alias=AliasChoices("jobId", "job_id"))
+    status: Literal["pending", "done", "failed"]
+    file_name: str = Field(
+        alias="fileName", validation_alias=AliasChoices("fileName", "file_name")
+    )
+    media_type: str = Field(
+        alias="mediaType", validation_alias=AliasChoices("mediaType", "media_type")
+    )
+    error: str | None = None
+    updated_at: datetime = Field(
+        alias="updatedAt", validation_alias=AliasChoices("updatedAt", "updated_at")
+    )
+
+
+class PqBootstrapOptions(BaseModel):
+    """
+    Class representing options of bootstrap confidence intervals.
+
+    Attributes:
+        resamples: Number of resamples of the submissions.
+        seed: Seed of the random resampling, the same seed gives the same intervals.
+    """
+
+    resamples: int = Field(default=2000, ge=100, le=10000)
+    seed: int = Field(default=0, ge=0)
+
+
+class PqMushraCondition(BaseModel):
+    """
+    Class representing scores given to one condition of a MUSHRA test.
+
+    Attributes:
+        sample_id: An ID of the sample.
+        kind: Role of the sample in the test.
+        count: Number of scores.
+        mean: Mean score, None without scores.
+        median: Median score, None without scores.
+        std: Sample standard deviation, None with less than two scores.
+        ci_low: Lower bound of the 95% confidence interval of the mean.
+        ci_high: Upper bound of the 95% confidence interval of the mean.
+        boot_ci_low: Lower bound of the 95% bootstrap confidence interval of the mean, if requested.
+        boot_ci_high: Upper bound of the 95% bootstrap confidence interval of the mean, if requested.
+        distribution: Number of scores in each 10 point range, the last one including 100.
+    """
+
+    sample_id: str = Field(
+        alias="sampleId", validation_alias=AliasChoices("sampleId", "sample_id")
+    )
+    kind: Literal["reference", "anchor", "sample"]
+    count: int
+    mean: float | None = None
+    median: float | None = None
+    std: float | None = None
+    ci_low: float | None = Field(
+        default=None, alias="ciLow", validation_alias=AliasChoices("ciLow", "ci_low")
+    )
+    ci_high: float | None = Field(
+        default=None, alias="ciHigh", validation_alias=AliasChoices("ciHigh", "ci_high")
+    )
+    boot_ci_low: float | None = Field(
+        default=None,
+        alias="bootCiLow",
+        validation_alias=AliasChoices("bootCiLow", "boot_ci_low"),
+    )
+    boot_ci_high: float | None = Field(
+        default=None,
+        alias="bootCiHigh",
+        validation_alias=AliasChoices("bootCiHigh", "boot_ci_high"),
+    )
+    distribution: list[int]
+
+
+class PqMushraTestAnalysis(BaseModel):
+    """
+    Class representing statistics of a MUSHRA test.
+
+    Attributes:
+        test_number: A number of the test.
+        submissions: Number of submitted results.
+        conditions: Statistics of the reference, anchors and samples, in this order.
+    """
+
+    test_number: int = Field(
+        alias="testNumber", validation_alias=AliasChoices("testNumber", "test_number")
+    )
+    submissions: int
+    conditions: list[PqMushraCondition]
+
+
+class PqMushraAnalysis(BaseModel):
+    """
+    Class representing statistics of all MUSHRA tests of an experiment.
+
+    Attributes:
+        experiment: Experiment name.
+        tests: Statistics of every MUSHRA test, ordered by test number.
+        bootstrap: Bootstrap options of the bootstrap confidence intervals, None without them.
+    """
+
+    experiment: str
+    tests: list[PqMushraTestAnalysis]
+    bootstrap: PqBootstrapOptions | None = None
+
+
+class PqApeSample(BaseModel):
+    """
+    Class representing ratings of one sample on an axis of an APE test.
+
+    Attributes:
+        sample_id: An ID of the sample.
+        count: Number of ratings.
+        mean: Mean rating, None without ratings.
+        std: Sample standard deviation, None with less than two ratings.
+        ci_low: Lower bound of the 95% confidence interval of the mean.
+        ci_high: Upper bound of the 95% confidence interval of the mean.
+        boot_ci_low: Lower bound of the 95% bootstrap confidence interval of the mean, if requested.
+        boot_ci_high: Upper bound of the 95% bootstrap confidence interval of the mean, if requested.
+        rank_score: Mean rank of the sample scaled from 0 (rated lowest) to 1 (rated highest).
+        rank_ci_low: Lower bound of the 95% confidence interval of the rank score.
+        rank_ci_high: Upper bound of the 95% confidence interval of the rank score.
+    """
+
+    sample_id: str = Field(
+        alias="sampleId", validation_alias=AliasChoices("sampleId", "sample_id")
+    )
+    count: int
+    mean: float | None = None
+    std: float | None = None
+    ci_low: float | None = Field(
+        default=None, alias="ciLow", validation_alias=AliasChoices("ciLow", "ci_low")
+    )
+    ci_high: float | None = Field(
+        default=None, alias="ciHigh", validation_alias=AliasChoices("ciHigh", "ci_high")
+    )
+    boot_ci_low: float | None = Field(
+        default=None,
+        alias="bootCiLow",
+        validation_alias=AliasChoices("bootCiLow", "boot_ci_low"),
+    )
+    boot_ci_high: float | None = Field(
+        default=None,
+        alias="bootCiHigh",
+        validation_alias=AliasChoices("bootCiHigh", "boot_ci_high"),
+    )
+    rank_score: float | None = Field(
+        default=None,
+        alias="rankScore",
+        validation_alias=AliasChoices("rankScore", "rank_score"),
+    )
+    rank_ci_low: float | None = Field(
+        default=None,
+        alias="rankCiLow",
+        validation_alias=AliasChoices("rankCiLow", "rank_ci_low"),
+    )
+    rank_ci_high: float | None = Field(
+        default=None,
+        alias="rankCiHigh",
+        validation_alias=AliasChoices("rankCiHigh", "rank_ci_high"),
+    )
+
+
+class PqApeAxis(BaseModel):
+    """
+    Class representing statistics of one axis of an APE test.
+
+    Attributes:
+        axis_id: An ID of the axis.
+        raters: Number of submissions rating every sample on the axis.
+        kendall_w: Kendall's coefficient of concordance of their rankings, None with less than two.
+        samples: Statistics of every sample of the test.
+    """
+
+    axis_id: str = Field(alias="axisId", validation_alias=AliasChoices("axisId", "axis_id"))
+    raters: int
+    kendall_w: float | None = Field(
+        default=None,
+        alias="kendallW",
+        validation_alias=AliasChoices("kendallW", "kendall_w"),
+    )
+    samples: list[PqApeSample]
+
+
+class PqApeTestAnalysis(BaseModel):
+    """
+    Class representing statistics of an APE test.
+
+    Attributes:
+        test_number: A number of the test.
+        submissions: Number of submitted results.
+        axes: Statistics of every axis of the test.
+    """
+
+    test_number: int = Field(
+        alias="testNumber", validation_alias=AliasChoices("testNumber", "test_number")
+    )
+    submissions: int
+    axes: list[PqApeAxis]
+
+
+class PqApeAnalysis(BaseModel):
+    """
+    Class representing statistics of all APE tests of an experiment.
+
+    Attributes:
+        experiment: Experiment name.
+        tests: Statistics of every APE test, ordered by test number.
+        bootstrap: Bootstrap options of the bootstrap confidence intervals, None without them.
+    """
+
+    experiment: str
+    tests: list[PqApeTestAnalysis]
+    bootstrap: PqBootstrapOptions | None = None
+
+class PqSelectionShare(BaseModel):
+    """
+    Class representing how often a sample was selected for a question.
+
+    Attributes:
+        sample_id: An ID of the sample.
+        count: Number of selections.
+        share: Share of the selections of the question, None without selections.
+        p_value: Exact two-sided binomial test p-value against selecting each sample equally often.
+    """
+
+    sample_id: str = Field(
+        alias="sampleId", validation_alias=AliasChoices("sampleId", "sample_id")
+    )
+    count: int
+    share: float | None = None
+    p_value: float | None = Field(
+        default=None, alias="pValue", validation_alias=AliasChoices("pValue", "p_value")
+    )
+
+
+class PqQuestionPreference(BaseModel):
+    """
+    Class representing the selections made for one question of an AB or ABX test.
+
+    Attributes:
+        question_id: An ID of the question.
+        selections: Number of selections.
+        samples: Selections of every sample of the test.
+    """
+
+    question_id: str = Field(
+        alias="questionId", validation_alias=AliasChoices("questionId", "question_id")
+    )
+    selections: int
+    samples: list[PqSelectionShare]
+
+
+class PqIdentification(BaseModel):
+    """
+    Class representing how often the X sample of an ABX test was identified.
+
+    Attributes:
+        trials: Number of results.
+        correct: Number of results identifying the X sample.
+        rate: Share of correct identifications, None without results.
+        p_value: Exact one-sided binomial test p-value against guessing.
+    """
+
+    trials: int
+    correct: int
+    rate: float | None = None
+    p_value: float | None = Field(
+        default=None, alias="pValue", validation_alias=AliasChoices("pValue", "p_value")
+    )
+
+
+class PqPreferenceTestAnalysis(BaseModel):
+    """
+    Class representing selection statistics of an AB or ABX test.
+
+    Attributes:
+        test_number: A number of the test.
+        type: A type of the test.
+        submissions: Number of submitted results.
+        questions: Selections made for every question of the test.
+        identification: Identification of the X sample, only for ABX tests.
+    """
+
+    test_number: int = Field(
+        alias="testNumber", validation_alias=AliasChoices("testNumber", "test_number")
+    )
+    type: PqTestTypes
+    submissions: int
+    questions: list[PqQuestionPreference]
+    identification: PqIdentification | None = None
+
+
+class PqPreferenceAnalysis(BaseModel):
+    """
+    Class representing selection statistics of all AB and ABX tests of an experiment.
+
+    Attributes:
+        experiment: Experiment name.
+        tests: Statistics of every AB and ABX test, ordered by test number.
+    """
+
+    experiment: str
+    tests: list[PqPreferenceTestAnalysis]
+
+
+class PqResultAggregate(BaseModel):
+    """
+    Class representing running totals of one kind of value of a test.
+
+    Attributes:
+        test_number: A number of the test.
+        kind: Kind of value, `reference`, `anchor` or `sample` scores of MUSHRA tests,
+            `rating` of APE tests, `selection` of AB and ABX tests and `identification`
+            of the X sample of ABX tests (1 when identified, 0 otherwise).
+        question_id: ID of the question or APE axis, empty for MUSHRA and identification values.
+        sample_id: An ID of the sample, empty for identification values.
+        count: Number of values.
+        total: Sum of the values.
+        mean: Mean value, None without values.
+        std: Sample standard deviation, None with less than two values.
+        histogram: Number of scores in each 10 point range, empty for selections and identifications.
+    """
+
+    test_number: int = Field(
+        alias="testNumber", validation_alias=AliasChoices("testNumber", "test_number")
+    )
+    kind: Literal["reference", "anchor", "sample", "rating", "selection", "identification"]
+    question_id: str = Field(
+        alias="questionId", validation_alias=AliasChoices("questionId", "question_id")
+    )
+    sample_id: str = Field(
+        alias="sampleId", validation_alias=AliasChoices("sampleId", "sample_id")
+    )
+    count: int
+    total: float
+    mean: float | None = None
+    std: float | None = None
+    histogram: list[int]
+
+
+class PqResultAggregates(BaseModel):
+    """
+    Class representing the running totals of all tests of an experiment.
+
+    Attributes:
+        experiment: Experiment name.
+        aggregates: Totals ordered by test number, kind, question and sample.
+    """
+
+    experiment: str
+    aggregates: list[PqResultAggregate]
+
 class PqErrorResponse(BaseModel):
     message: str
 
 
 class PqApiStatus(BaseModel):
+    """
+    Class representing health of the API worker answering the request.
+
+    Attributes:
+        status: Health status.
+        worker_pid: Process id of the worker.
+        startup_seconds: Time the worker took from start until it was ready to serve requests.
+    """
+
     status: str = "HEALTHY"
+    worker_pid: int | None = None
+    startup_seconds: float | None = None
+
+
+class PqPoolStatus(BaseModel):
+    """
+    Class representing utilization of a database connection pool.
+
+    Attributes:
+        size: Configured number of persistent connections.
+        checked_in: Idle connections in the pool.
+        checked_out: Connections currently in use.
+        overflow: Connections opened above the pool size (negative when not all persistent connections are open).
+        checkouts: Number of checkouts since the worker started.
+        timeouts: Number of checkouts which timed out waiting for a connection.
+        avg_wait_seconds: Average time spent waiting for a connection.
+        max_wait_seconds: Longest time spent waiting for a connection.
+    """
+
+    size: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    checkouts: int = 0
+    timeouts: int = 0
+    avg_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+
+
+class PqThreadpoolStatus(BaseModel):
+    """
+    Class representing utilization of the threadpool serving sync routes.
+
+    Attributes:
+        total_tokens: Maximum number of concurrently running threads.
+        borrowed_tokens: Threads currently in use.
+        tasks_waiting: Tasks waiting for a free thread.
+    """
+
+    total_tokens: int
+    borrowed_tokens: int
+    tasks_waiting: int
+
+
+class PqPoolsStatus(BaseModel):
+    database: PqPoolStatus
+    async_database: PqPoolStatus
+    threadpool: PqThreadpoolStatus
 
 
 class PqExperimentName(BaseModel):
@@ -0,0 +1,121 @@
+"""Throughput benchmark of the participant-facing API routes.
+
+Fires concurrent requests at a running API and reports requests per second
+for the experiment fetch, results upload and sample rating routes. Run it
+against two API revisions (for example before and after a change) started
+with the same deployment flavor to compare them:
+
+    python benchmarks/hot_routes.py --base-url http://localhost:8000/api/v1 \\
+        --experiment demo --sample-id 1 --concurrency 64 --requests 2000
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+
+def _results_payload(experiment: dict) -> dict:
+    # Builds a valid submission for the first test of the experiment
+    test = experiment["tests"][0]
+    result = {"testNumber": test["testNumber"]}
+    match test["type"]:
+        case "AB":
+            result["selections"] = [
+                {
+                    "questionId": q["questionId"],
+                    "sampleId": test["samples"][0]["sampleId"],
+                }
+                for q in test["questions"]
+            ]
+        case "ABX":
+            sample_id = test["samples"][0]["sampleId"]
+            result.update(xSampleId=sample_id, xSelected=sample_id, selections=[])
+        case "MUSHRA":
+            result.update(
+                referenceScore=100,
+                anchorsScores=[
+                    {"sampleId": a["sampleId"], "score": 20} for a in test["anchors"]
+                ],
+                samplesScores=[
+                    {"sampleId": s["sampleId"], "score": 70} for s in test["samples"]
+                ],
+            )
+        case "APE":
+            result["axisResults"] = [
+                {
+                    "axisId": axis["questionId"],
+                    "sampleRatings": [
+                        {"sampleId": s["sampleId"], "rating": 50}
+                        for s in test["samples"]
+                    ],
+                }
+                for axis in test["axis"]
+            ]
+    return {"results": [result]}
+
+
+def _measure(name: str, request, concurrency: int, total: int) -> None:
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=concurrency, pool_maxsize=concurrency
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    def _call(_):
+        try:
+            response = request(session)
+        except requests.RequestException:
+            # Dropped connections count as failed requests
+            return False
+        return response.status_code < 400
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        succeeded = sum(executor.map(_call, range(total)))
+    elapsed = time.perf_counter() - started
+    print(
+        f"{name:<20} {total / elapsed:>10.1f} req/s "
+        f"({succeeded}/{total} ok, {elapsed:.2f}s)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000/api/v1")
+    parser.add_argument("--experiment", required=True)
+    parser.add_argument("--sample-id", help="Sample id used for the rating route")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=1000)
+    args = parser.parse_args()
+
+    experiment_url = f"{args.base_url}/experiments/{args.experiment}"
+    experiment = requests.get(experiment_url).json()
+    payload = _results_payload(experiment)
+
+    _measure(
+        "GET experiment",
+        lambda s: s.get(experiment_url),
+        args.concurrency,
+        args.requests,
+    )
+    _measure(
+        "POST results",
+        lambda s: s.post(f"{experiment_url}/results", json=payload),
+        args.concurrency,
+        args.requests,
+    )
+    if args.sample_id:
+        rating = {"sampleId": args.sample_id, "name": "", "assetPath": "", "rating": 3}
+        _measure(
+            "PUT rate",
+            lambda s: s.put(f"{args.base_url}/samples/rate", json=rating),
+            args.concurrency,
+            args.requests,
+        )
+
+
+if __name__ == "__main__":
+    main()
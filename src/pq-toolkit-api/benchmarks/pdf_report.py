@@ -0,0 +1,133 @@
+"""Render time and size of the PDF results report of a synthetic experiment.
+
+Builds an experiment with a MUSHRA and an AB test in a temporary SQLite
+database, stores the requested number of results split between the tests
+and renders the report in-process, without a running API:
+
+    python benchmarks/pdf_report.py --results 10000 --samples 8
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from io import BytesIO
+
+from fastapi import UploadFile
+from sqlmodel import Session, SQLModel, create_engine
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import app.crud as crud  # noqa: E402
+
+EXPERIMENT = "benchmark"
+
+
+def _config(samples: int) -> dict:
+    sample_ids = [f"s{i}" for i in range(samples)]
+    return {
+        "name": "PDF report benchmark",
+        "description": "Synthetic results",
+        "end_text": "",
+        "tests": [
+            {
+                "test_number": 1,
+                "type": "MUSHRA",
+                "reference": {"sample_id": "ref", "asset_path": "ref.wav"},
+                "anchors": [{"sample_id": "anchor", "asset_path": "anchor.wav"}],
+                "samples": [
+                    {"sample_id": s, "asset_path": f"{s}.wav"} for s in sample_ids
+                ],
+            },
+            {
+                "test_number": 2,
+                "type": "AB",
+                "samples": [
+                    {"sample_id": s, "asset_path": f"{s}.wav"} for s in sample_ids[:2]
+                ],
+                "questions": [
+                    {"question_id": f"q{i}", "text": "Which sounds better?"}
+                    for i in range(3)
+                ],
+            },
+        ],
+    }
+
+
+def _results(count: int, samples: int, rng: random.Random) -> list[dict]:
+    results = []
+    for n in range(count):
+        if n % 2 == 0:
+            results.append(
+                {
+                    "testNumber": 1,
+                    "referenceScore": rng.randint(90, 100),
+                    "anchorsScores": [
+                        {"sampleId": "anchor", "score": rng.randint(0, 30)}
+                    ],
+                    "samplesScores": [
+                        {"sampleId": f"s{i}", "score": rng.randint(0, 100)}
+                        for i in range(samples)
+                    ],
+                    "feedback": "Sounded fine" if n % 10 == 0 else None,
+                }
+            )
+        else:
+            results.append(
+                {
+                    "testNumber": 2,
+                    "selections": [
+                        {"questionId": f"q{i}", "sampleId": rng.choice(["s0", "s1"])}
+                        for i in range(3)
+                    ],
+                }
+            )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--results", type=int, default=10000)
+    parser.add_argument("--samples", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'benchmark.db')}")
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as session:
+            crud.add_experiment(session, EXPERIMENT)
+            crud.upload_experiment_config(
+                session,
+                EXPERIMENT,
+                UploadFile(
+                    filename="config.json",
+                    file=BytesIO(json.dumps(_config(args.samples)).encode()),
+                ),
+            )
+            experiment = crud.get_db_experiment_by_name(session, EXPERIMENT)
+            results = _results(args.results, args.samples, random.Random(args.seed))
+            # One submission per participant, like the frontend sends them
+            for n in range(0, len(results), 2):
+                _, rows = crud.build_test_results(
+                    {"results": results[n : n + 2]}, experiment
+                )
+                session.add_all(rows)
+            session.commit()
+
+        with Session(engine) as session:
+            started = time.perf_counter()
+            content = crud.render_pdf_report(session, EXPERIMENT)
+            elapsed = time.perf_counter() - started
+
+    print(f"results: {args.results}")
+    print(f"render time: {elapsed:.2f} s")
+    print(f"size: {len(content) / 1024:.0f} KiB")
+    print(f"pages: {content.count(b'/Type /Page' + bytes([10]))}")
+
+
+if __name__ == "__main__":
+    main()
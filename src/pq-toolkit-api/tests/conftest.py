@@ -4,9 +4,34 @@ from app.models import Experiment
 from fastapi import UploadFile
 from io import BytesIO
 from app.crud import upload_experiment_config
+from app.core.exports import ExportJobs, ExportStore
+from app.core.cache import (
+    analysis_cache,
+    experiment_config_cache,
+    published_version_cache,
+    sample_listing_cache,
+    sample_manifest_cache,
+    score_matrix_cache,
+    selection_counts_cache,
+)
+from minio.datatypes import Object
+import hashlib
 import json
 
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    # Caches are module level and would leak between test databases
+    yield
+    experiment_config_cache.clear()
+    sample_listing_cache.clear()
+    published_version_cache.clear()
+    sample_manifest_cache.clear()
+    analysis_cache.clear()
+    score_matrix_cache.clear()
+    selection_counts_cache.clear()
+
+
 @pytest.fixture(name="engine")
 def engine_fixture():
     engine = create_engine("sqlite:///:memory:")
@@ -14,6 +39,14 @@ def engine_fixture():
     return engine
 
 
+@pytest.fixture
+def file_engine(tmp_path):
+    # Work done in other threads opens its own connections, which need a file database
+    engine = create_engine(f"sqlite:///{tmp_path / 'pq.db'}")
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
 @pytest.fixture(name="session")
 def session_fixture(engine):
     with Session(engine) as session:
@@ -77,6 +110,91 @@ def upload_config(session):
         json_file = UploadFile(
             filename="config.json", file=BytesIO(json.dumps(config_data).encode())
         )
-        upload_experiment_config(session, experiment_name, json_file)
+        return upload_experiment_config(session, experiment_name, json_file)
 
     return _upload_config
+
+
+class InMemorySampleManager:
+    """Keeps sample files in a dict, mirrors the SampleManager methods used by crud."""
+
+    def __init__(self):
+        self.objects: dict[str, bytes] = {}
+        self.metadata: dict[str, dict] = {}
+
+    def upload_sample(self, experiment_name, sample_name, sample_data, metadata=None):
+        object_name = f"{experiment_name}/{sample_name}"
+        self.objects[object_name] = sample_data.read()
+        self.metadata[object_name] = metadata or {}
+        return object_name
+
+    def get_sample_checksums(self, experiment_name, sample_name):
+        object_name = f"{experiment_name}/{sample_name}"
+        if object_name not in self.objects:
+            return None
+        etag = hashlib.md5(self.objects[object_name]).hexdigest()
+        return etag, self.metadata[object_name].get("sha256")
+
+    def copy_sample(
+        self, source_object_name, target_experiment_name, target_sample_name
+    ):
+        object_name = f"{target_experiment_name}/{target_sample_name}"
+        self.objects[object_name] = self.objects[source_object_name]
+        self.metadata[object_name] = self.metadata.get(source_object_name, {})
+        return object_name
+
+    def get_sample(self, experiment_name, sample_name):
+        return iter([self.objects[f"{experiment_name}/{sample_name}"]])
+
+    def remove_sample(self, experiment_name, sample_name):
+        object_name = f"{experiment_name}/{sample_name}"
+        del self.objects[object_name]
+        self.metadata.pop(object_name, None)
+
+    def get_sample_header(self, experiment_name, sample_name, length):
+        return self.objects[f"{experiment_name}/{sample_name}"][:length]
+
+    def list_matching_samples(self, experiment_name):
+        return [
+            obj.object_name.split("/")[-1]
+            for obj in self.list_matching_sample_objects(experiment_name)
+        ]
+
+    def list_matching_sample_objects(self, experiment_name):
+        return [
+            Object("samples", name, size=len(data), etag=str(hash(data)))
+            for name, data in sorted(self.objects.items())
+            if name.startswith(f"{experiment_name}/")
+        ]
+
+
+@pytest.fixture
+def sample_manager():
+    return InMemorySampleManager()
+
+
+class InMemoryExportStore(ExportStore):
+    def __init__(self):
+        self.objects: dict[str, bytes] = {}
+
+    def put(self, key, chunks, media_type):
+        self.objects[key] = b"".join(chunks)
+
+    def get(self, key):
+        if key not in self.objects:
+            return None
+        return iter([self.objects[key]])
+
+    def list_keys(self, prefix):
+        return sorted(key for key in self.objects if key.startswith(prefix))
+
+    def remove(self, keys):
+        for key in keys:
+            del self.objects[key]
+
+
+@pytest.fixture
+def export_jobs():
+    jobs = ExportJobs(InMemoryExportStore(), workers=2)
+    yield jobs
+    jobs.shutdown()
@@ -0,0 +1,321 @@
+import math
+
+import numpy as np
+import pytest
+
+from app.analysis.ape import analyze_ape_test, average_ranks, kendall_w, rating_array
+from app.analysis.bootstrap import BootstrapPool
+from app.analysis.mushra import (
+    analyze_mushra_test,
+    condition_statistics,
+    mushra_scores,
+    score_matrix,
+)
+from app.analysis.preference import (
+    analyze_selections,
+    count_selections,
+    empty_selection_counts,
+)
+from app.analysis.screening import screen_submissions
+from app.analysis.stats import binomial_test, t_critical
+from app.schemas import (
+    PqScreeningRules,
+    PqTestAPE,
+    PqTestAPEResult,
+    PqTestABX,
+    PqTestABXResult,
+    PqTestMUSHRA,
+    PqTestMUSHRAResult,
+)
+
+MUSHRA_TEST = PqTestMUSHRA(
+    test_number=1,
+    reference={"sample_id": "ref", "asset_path": "ref.wav"},
+    anchors=[{"sample_id": "low", "asset_path": "low.wav"}],
+    samples=[
+        {"sample_id": "s1", "asset_path": "s1.wav"},
+        {"sample_id": "s2", "asset_path": "s2.wav"},
+    ],
+)
+
+
+def mushra_result(reference: int, scores: dict[str, int]) -> PqTestMUSHRAResult:
+    return PqTestMUSHRAResult(
+        testNumber=1,
+        referenceScore=reference,
+        anchorsScores=[
+            {"sampleId": "low", "score": scores["low"]} for _ in range("low" in scores)
+        ],
+        samplesScores=[
+            {"sampleId": sample_id, "score": score}
+            for sample_id, score in scores.items()
+            if sample_id != "low"
+        ],
+    )
+
+
+def test_t_critical():
+    assert t_critical(np.array([1, 2, 3, 10, 30])) == pytest.approx(
+        [12.7062, 4.3027, 3.1824, 2.2281, 2.0423], rel=2e-3
+    )
+    assert np.isnan(t_critical(np.array([0]))[0])
+
+
+def test_score_matrix_marks_missing_scores():
+    matrix = score_matrix(
+        MUSHRA_TEST,
+        [
+            mushra_result(100, {"low": 20, "s1": 60, "s2": 70}),
+            # s2 not rated, `other` is not part of the test
+            mushra_result(95, {"low": 10, "s1": 80, "other": 5}),
+        ],
+    )
+    np.testing.assert_array_equal(matrix, [[100, 20, 60, 70], [95, 10, 80, np.nan]])
+
+
+def test_condition_statistics():
+    matrix = np.array([[100, 20, 60], [90, 30, 80], [95, 25, 100]], dtype=float)
+    stats = condition_statistics(matrix)
+    np.testing.assert_array_equal(stats["count"], [3, 3, 3])
+    np.testing.assert_allclose(stats["mean"], [95, 25, 80])
+    np.testing.assert_allclose(stats["median"], [95, 25, 80])
+    np.testing.assert_allclose(stats["std"], [5, 5, 20])
+    half_width = 4.3027 * np.array([5, 5, 20]) / np.sqrt(3)
+    np.testing.assert_allclose(stats["ci_high"], stats["mean"] + half_width, rtol=1e-3)
+    # 100 falls into the last bin
+    assert stats["distribution"][2].tolist() == [0, 0, 0, 0, 0, 0, 1, 0, 1, 1]
+
+
+def test_analysis_of_sparse_results():
+    analysis = analyze_mushra_test(
+        mushra_scores(MUSHRA_TEST, [("a", mushra_result(100, {"low": 20, "s1": 60}))])
+    )
+    assert analysis.submissions == 1
+    reference, low, s1, s2 = analysis.conditions
+    assert (reference.kind, low.kind, s1.kind) == ("reference", "anchor", "sample")
+    assert s1.mean == 60 and s1.std is None and s1.ci_low is None
+    assert s2.count == 0 and s2.mean is None and sum(s2.distribution) == 0
+
+
+def test_analysis_without_results():
+    analysis = analyze_mushra_test(mushra_scores(MUSHRA_TEST, []))
+    assert analysis.submissions == 0
+    assert [condition.count for condition in analysis.conditions] == [0, 0, 0, 0]
+
+
+def screening_scores():
+    return mushra_scores(
+        MUSHRA_TEST,
+        [
+            ("a", mushra_result(100, {"low": 20, "s1": 60, "s2": 70})),
+            ("a", mushra_result(95, {"low": 10, "s1": 80, "s2": 50})),
+            # Missed the hidden reference in one of two trials
+            ("b", mushra_result(40, {"low": 20, "s1": 90, "s2": 60})),
+            ("b", mushra_result(100, {"low": 30, "s1": 70, "s2": 60})),
+            # Rated the anchor above the threshold
+            ("c", mushra_result(100, {"low": 95, "s1": 70, "s2": 80})),
+        ],
+    )
+
+
+def test_screen_submissions():
+    screened = screen_submissions([screening_scores()], PqScreeningRules())
+    assert [
+        (
+            s.experiment_use,
+            s.trials,
+            s.reference_failures,
+            s.anchor_failures,
+            s.excluded,
+        )
+        for s in screened
+    ] == [("a", 2, 0, 0, False), ("b", 2, 1, 0, True), ("c", 1, 0, 1, True)]
+
+
+def test_screening_rules_can_be_relaxed():
+    screened = screen_submissions(
+        [screening_scores()],
+        PqScreeningRules(anchor_threshold=None, max_failed_share=0.5),
+    )
+    assert [s.excluded for s in screened] == [False, False, False]
+
+
+def test_analysis_leaves_out_excluded_submissions():
+    analysis = analyze_mushra_test(screening_scores(), excluded={"b", "c"})
+    assert analysis.submissions == 2
+    assert analysis.conditions[0].mean == 97.5
+
+
+def exact_binomial_test(k: int, n: int, p: float) -> float:
+    pmf = [math.comb(n, j) * p**j * (1 - p) ** (n - j) for j in range(n + 1)]
+    return sum(value for value in pmf if value <= pmf[k] * (1 + 1e-7))
+
+
+def test_binomial_test():
+    cases = [(7, 10, 0.5), (0, 10, 0.5), (5, 10, 0.5), (9, 20, 0.25), (1, 3, 1 / 3)]
+    k, n, p = map(np.array, zip(*cases))
+    np.testing.assert_allclose(
+        binomial_test(k, n, p), [exact_binomial_test(*case) for case in cases]
+    )
+    assert binomial_test(7, 10, alternative="greater") == pytest.approx(0.171875)
+    # Many trials don't overflow
+    assert binomial_test(5100, 10000) == pytest.approx(0.0466, abs=1e-4)
+    assert np.isnan(binomial_test(0, 0))
+
+
+ABX_TEST = PqTestABX(
+    test_number=2,
+    samples=[
+        {"sample_id": "a", "asset_path": "a.wav"},
+        {"sample_id": "b", "asset_path": "b.wav"},
+    ],
+    questions=[{"question_id": "q1", "text": "Which is warmer?"}],
+)
+
+
+def abx_result(x_selected: str, sample_id: str) -> PqTestABXResult:
+    return PqTestABXResult(
+        testNumber=2,
+        xSampleId="a",
+        xSelected=x_selected,
+        selections=[{"questionId": "q1", "sampleId": sample_id}],
+    )
+
+
+def test_selection_counts_are_extended():
+    empty = empty_selection_counts([ABX_TEST])
+    first = count_selections(empty, [abx_result("a", "a")] * 6, None)
+    counts = count_selections(
+        first,
+        # An unknown sample is not counted
+        [abx_result("a", "a")] * 3 + [abx_result("b", "b"), abx_result("a", "other")],
+        None,
+    )
+    assert empty.submissions.tolist() == [0] and first.results == 6
+    assert counts.results == 11
+    assert counts.selections[0].tolist() == [[9, 1]]
+
+    (analysis,) = analyze_selections(counts)
+    share_a, share_b = analysis.questions[0].samples
+    assert analysis.questions[0].selections == 10
+    assert (share_a.count, share_a.share) == (9, 0.9)
+    assert share_a.p_value == pytest.approx(exact_binomial_test(9, 10, 0.5))
+    assert analysis.identification.correct == 10
+    assert analysis.identification.p_value == pytest.approx(12 / 2**11)
+
+
+def test_selection_counts_of_abx_test_without_questions():
+    test = ABX_TEST.model_copy(update={"questions": None})
+    result = abx_result("a", "a").model_copy(update={"selections": []})
+    counts = count_selections(empty_selection_counts([test]), [result] * 3, None)
+
+    (analysis,) = analyze_selections(counts)
+    assert analysis.submissions == 3 and analysis.questions == []
+    assert analysis.identification.correct == 3
+
+
+APE_TEST = PqTestAPE(
+    test_number=3,
+    axis=[
+        {"question_id": "warmth", "text": "Warmth"},
+        {"question_id": "clarity", "text": "Clarity"},
+    ],
+    samples=[{"sample_id": f"s{n}", "asset_path": f"s{n}.wav"} for n in range(3)],
+)
+
+
+def ape_result(ratings: dict[str, list[int]]) -> PqTestAPEResult:
+    return PqTestAPEResult(
+        testNumber=3,
+        axisResults=[
+            {
+                "axisId": axis_id,
+                "sampleRatings": [
+                    {"sampleId": f"s{n}", "rating": rating}
+                    for n, rating in enumerate(axis_ratings)
+                ],
+            }
+            for axis_id, axis_ratings in ratings.items()
+        ],
+    )
+
+
+def test_rating_array_and_ranks():
+    ratings = rating_array(
+        APE_TEST,
+        [
+            ape_result({"warmth": [10, 50, 90], "clarity": [30, 30, 80]}),
+            # Clarity not rated, `other` is not part of the test
+            ape_result({"warmth": [70, 20, 40], "other": [1, 2, 3]}),
+        ],
+    )
+    assert ratings.shape == (2, 2, 3)
+    assert np.isnan(ratings[1, 1]).all()
+    np.testing.assert_array_equal(average_ranks(ratings)[:, 0], [[1, 2, 3], [3, 1, 2]])
+    assert average_ranks(ratings)[0, 1].tolist() == [1.5, 1.5, 3]
+
+
+def test_kendall_w():
+    # Rows are raters ranking four samples on a single axis
+    ranks = np.array([[1, 2, 3, 4], [1, 2, 3, 4], [1, 2, 3, 4]], dtype=float)[
+        :, None, :
+    ]
+    w, raters = kendall_w(ranks)
+    assert raters.tolist() == [3] and w[0] == pytest.approx(1)
+
+    ranks = np.array([[1, 2, 3, 4], [4, 3, 2, 1]], dtype=float)[:, None, :]
+    assert kendall_w(ranks)[0][0] == pytest.approx(0)
+
+    # Rank sums 3.5, 6 and 8.5, two raters with a tie of two samples
+    ranks = average_ranks(np.array([[0, 0, 1], [0, 1, 2], [0, 1, 1]], dtype=float))
+    w, _ = kendall_w(ranks[:, None, :])
+    assert w[0] == pytest.approx(12 * (2.5**2 + 0 + 2.5**2) / (9 * 24 - 3 * (6 + 6)))
+
+
+def test_ape_analysis():
+    analysis = analyze_ape_test(
+        APE_TEST,
+        [
+            ape_result({"warmth": [10, 50, 90], "clarity": [30, 30, 80]}),
+            ape_result({"warmth": [20, 60, 70], "clarity": [40, 20, 90]}),
+        ],
+    )
+    warmth, clarity = analysis.axes
+    assert analysis.submissions == 2
+    assert warmth.raters == 2 and warmth.kendall_w == pytest.approx(1)
+    assert [sample.rank_score for sample in warmth.samples] == [0, 0.5, 1]
+    assert warmth.samples[0].mean == 15 and warmth.samples[0].count == 2
+    assert [sample.rank_score for sample in clarity.samples] == [0.375, 0.125, 1]
+
+
+def test_bootstrap_intervals_are_reproducible():
+    rng = np.random.default_rng(1)
+    values = rng.normal(50, 10, size=(400, 3))
+    values[::7, 2] = np.nan
+
+    inline = BootstrapPool()
+    low, high = inline.confidence_intervals(values, resamples=600, seed=3)
+    assert (low < np.nanmean(values, axis=0)).all()
+    assert (high > np.nanmean(values, axis=0)).all()
+    # Close to the normal interval of the mean
+    np.testing.assert_allclose(high - low, 2 * 1.96 * 10 / np.sqrt(400), rtol=0.2)
+
+    pool = BootstrapPool(workers=2)
+    try:
+        parallel = pool.confidence_intervals(values, resamples=600, seed=3)
+    finally:
+        pool.shutdown()
+    np.testing.assert_array_equal(parallel, (low, high))
+    other = inline.confidence_intervals(values, resamples=600, seed=4)
+    assert not np.array_equal(other, (low, high))
+
+
+def test_bootstrap_intervals_in_analysis():
+    pool = BootstrapPool()
+    analysis = analyze_mushra_test(
+        screening_scores(),
+        bootstrap=lambda values: pool.confidence_intervals(values, 200, 0),
+    )
+    reference = analysis.conditions[0]
+    assert reference.boot_ci_low <= reference.mean <= reference.boot_ci_high
+    assert analyze_mushra_test(screening_scores()).conditions[0].boot_ci_low is None
@@ -0,0 +1,88 @@
+import tarfile
+import threading
+import zipfile
+from io import BytesIO
+
+import pytest
+
+from app.core.archive import (
+    ArchiveEntry,
+    ordered_streams,
+    stream_tar,
+    stream_zip,
+)
+
+FILES = {"a.wav": b"a" * 10, "b.wav": b"b" * 20, "c.wav": b"c" * 30}
+
+
+def entries():
+    return [ArchiveEntry(name, len(data)) for name, data in FILES.items()]
+
+
+@pytest.mark.parametrize("writer", [stream_zip, stream_tar])
+def test_stream_archive(writer):
+    files = [(entry, FILES[entry.name]) for entry in entries()]
+    content = b"".join(writer(files))
+
+    if writer is stream_zip:
+        with zipfile.ZipFile(BytesIO(content)) as archive:
+            assert archive.testzip() is None
+            assert {name: archive.read(name) for name in archive.namelist()} == FILES
+    else:
+        with tarfile.open(fileobj=BytesIO(content)) as archive:
+            assert {
+                member.name: archive.extractfile(member).read()
+                for member in archive.getmembers()
+            } == FILES
+
+
+def test_stream_zip_writes_files_chunk_by_chunk():
+    files = [(entry, iter([FILES[entry.name]] * 2)) for entry in entries()]
+    content = b"".join(stream_zip(files, compression=zipfile.ZIP_DEFLATED))
+
+    with zipfile.ZipFile(BytesIO(content)) as archive:
+        assert archive.testzip() is None
+        assert {name: archive.read(name) for name in archive.namelist()} == {
+            name: data * 2 for name, data in FILES.items()
+        }
+
+
+def test_stream_tar_writes_files_chunk_by_chunk():
+    files = [
+        (ArchiveEntry(entry.name, entry.size * 2), iter([FILES[entry.name]] * 2))
+        for entry in entries()
+    ]
+    content = b"".join(stream_tar(files))
+
+    with tarfile.open(fileobj=BytesIO(content)) as archive:
+        assert {
+            member.name: archive.extractfile(member).read()
+            for member in archive.getmembers()
+        } == {name: data * 2 for name, data in FILES.items()}
+
+    # The content must match the size written to the header
+    with pytest.raises(ValueError):
+        b"".join(stream_tar([(ArchiveEntry("a.wav", 5), iter([FILES["a.wav"]]))]))
+
+
+def test_ordered_streams_keep_order_and_bound_chunks_ahead():
+    produced = {name: 0 for name in FILES}
+
+    def produce(name):
+        for _ in range(10):
+            produced[name] += 1
+            yield FILES[name]
+        if name == "c.wav":
+            raise ValueError(name)
+
+    streams = ordered_streams(produce, list(FILES), workers=3, max_chunks=2)
+    first = next(streams)
+    assert next(first) == FILES["a.wav"]
+    # Later items wait for the consumer once their queues are full
+    threading.Event().wait(0.3)
+    assert produced["b.wav"] <= 3
+    assert b"".join(first) == FILES["a.wav"] * 9
+    assert b"".join(next(streams)) == FILES["b.wav"] * 10
+    with pytest.raises(ValueError):
+        b"".join(next(streams))
+    streams.close()
@@ -0,0 +1,51 @@
+import struct
+import wave
+from io import BytesIO
+
+import pytest
+
+from app.core.audio import HEADER_SIZE, audio_duration
+
+
+def wav_file(seconds: float, sample_rate: int = 8000) -> bytes:
+    buffer = BytesIO()
+    with wave.open(buffer, "wb") as f:
+        f.setnchannels(2)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(b"\x00" * int(seconds * sample_rate) * 4)
+    return buffer.getvalue()
+
+
+def mp3_file(frames: int, xing: bool = False) -> bytes:
+    # MPEG 1 layer III, 128 kbps, 44.1 kHz, stereo: 417 byte frames
+    header = struct.pack(">I", 0xFFFB9000)
+    frame = header + b"\x00" * 413
+    first = frame
+    if xing:
+        info = b"Xing" + struct.pack(">II", 0x1, frames)
+        first = header + b"\x00" * 32 + info + b"\x00" * (413 - 32 - len(info))
+    id3 = b"ID3\x03\x00\x00\x00\x00\x00\x0a" + b"\x00" * 10
+    return id3 + first + frame * (frames - 1)
+
+
+def test_wav_duration():
+    content = wav_file(1.5)
+    assert audio_duration("a.wav", content[:HEADER_SIZE], len(content)) == 1.5
+
+
+def test_mp3_duration():
+    content = mp3_file(100)
+    duration = audio_duration("a.mp3", content[:HEADER_SIZE], len(content))
+    assert duration == pytest.approx(100 * 1152 / 44100, rel=0.01)
+
+
+def test_mp3_duration_from_xing_header():
+    content = mp3_file(100, xing=True)
+    duration = audio_duration("a.mp3", content[:HEADER_SIZE], 10**9)
+    assert duration == 100 * 1152 / 44100
+
+
+def test_unknown_duration():
+    assert audio_duration("a.flac", b"fLaC", 4) is None
+    assert audio_duration("a.wav", b"not a wav file", 14) is None
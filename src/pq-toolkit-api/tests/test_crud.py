@@ -1,7 +1,56 @@
+import asyncio
+import copy
+import csv
+import hashlib
+import io
+import json
+import tarfile
+import threading
+import zipfile
+from datetime import datetime, timedelta
+from io import BytesIO
+
 import pytest
-from sqlmodel import select
+from fastapi import UploadFile
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
 from app.crud import (
     get_experiment_by_name,
+    get_experiment_versions,
+    publish_experiment_version,
+    PublishedResultsWouldBeDeleted,
+    publish_static_experiment,
+    get_sample_manifest,
+    upload_experiment_sample,
+    archive_experiment_samples,
+    export_experiment_bundle,
+    import_experiment_bundle,
+    IncorrectBundle,
+    clone_experiment,
+    stream_experiment_results,
+    IncorrectResultsCursor,
+    columnar_results_table,
+    stream_columnar_results,
+    results_csv_table,
+    stream_results_csv,
+    stream_results_csv_zip,
+    submit_export_job,
+    render_pdf_report,
+    get_mushra_analysis_json,
+    get_screening_report,
+    get_preference_analysis_json,
+    get_ape_analysis_json,
+    get_result_aggregates,
+    rebuild_result_aggregates,
+    get_selection_counts,
+    wait_for_export_job,
+    get_export_job,
+    get_export_artifact,
+    ExportJobNotFound,
+    IncorrectExportRequest,
+    upload_experiment_config,
+    get_experiment_tests_results,
+    ExperimentVersionNotFound,
     add_experiment,
     remove_experiment_by_name,
     add_experiment_result,
@@ -9,14 +58,27 @@ from app.crud import (
     ExperimentAlreadyExists,
     ExperimentNotConfigured,
     IncorrectInputData,
+    NoMatchingTest,
+)
+from app.core.exports import ExportJobs
+from app.core.static_publisher import DirectoryStaticPublisher
+from tests.test_audio import mp3_file
+from app.models import (
+    Experiment,
+    ExperimentTestResult,
+    ExperimentVersion,
+    ResultAggregate,
 )
-from app.models import Experiment
 from app.schemas import (
     PqTestResultsList,
     PqTestABResult,
     PqTestAPEResult,
     PqTestABXResult,
     PqTestMUSHRAResult,
+    PqExportJob,
+    PqExportRequest,
+    PqScreeningRules,
+    PqBootstrapOptions,
 )
 
 
@@ -367,3 +429,1159 @@ def test_add_experiment_results_invalid(
 
     with pytest.raises(expected_error):
         add_experiment_result(session, experiment_name, test_result)
+
+
+def test_publish_experiment_version(
+    session,
+    create_experiment,
+    upload_config,
+    experiment_data,
+    updated_experiment_data,
+    sample_manager,
+):
+    experiment_name = "Test Experiment"
+    create_experiment(experiment_name)
+    upload_config(experiment_name, experiment_data)
+    sample_manager.upload_sample(experiment_name, "file_sample_5.mp3", BytesIO(b"a"))
+
+    first = publish_experiment_version(session, sample_manager, experiment_name)
+    assert first.version == 1
+    # Publishing an unchanged experiment does not create a new version
+    assert publish_experiment_version(session, sample_manager, experiment_name) == first
+
+    sample_manager.upload_sample(experiment_name, "file_sample_5.mp3", BytesIO(b"b"))
+    second = publish_experiment_version(session, sample_manager, experiment_name)
+    assert second.version == 2
+    assert second.config_hash != first.config_hash
+
+    upload_config(experiment_name, updated_experiment_data)
+    third = publish_experiment_version(session, sample_manager, experiment_name)
+    versions = get_experiment_versions(session, experiment_name).versions
+    assert [version.version for version in versions] == [1, 2, third.version]
+    assert third.version == 3
+
+
+def test_results_reference_experiment_version(
+    session, create_experiment, upload_config, experiment_data, sample_manager
+):
+    experiment_name = "Test Experiment"
+    create_experiment(experiment_name)
+    upload_config(experiment_name, experiment_data)
+    publish_experiment_version(session, sample_manager, experiment_name)
+    result_list = {
+        "results": [
+            {"testNumber": 1, "selections": [{"questionId": "q1", "sampleId": "s1"}]}
+        ]
+    }
+    add_experiment_result(session, experiment_name, result_list)
+    result = session.exec(select(ExperimentTestResult)).one()
+    version = session.exec(select(ExperimentVersion)).one()
+    assert result.experiment_version_id == version.id
+
+    with pytest.raises(ExperimentVersionNotFound):
+        add_experiment_result(
+            session, experiment_name, {**result_list, "experimentVersion": 7}
+        )
+
+    # The live config no longer matches the published version
+    experiment_data["description"] = "Updated Experiment Description"
+    upload_config(experiment_name, experiment_data)
+    add_experiment_result(session, experiment_name, result_list)
+    result = session.exec(
+        select(ExperimentTestResult).order_by(ExperimentTestResult.id.desc())
+    ).first()
+    assert result.experiment_version_id is None
+    # Unless the results name the version they were taken from
+    add_experiment_result(
+        session, experiment_name, {**result_list, "experimentVersion": 1}
+    )
+    result = session.exec(
+        select(ExperimentTestResult).order_by(ExperimentTestResult.id.desc())
+    ).first()
+    assert result.experiment_version_id == version.id
+
+
+def test_update_experiment_config_keeps_published_results(
+    session, create_experiment, upload_config, experiment_data, sample_manager
+):
+    experiment_name = "Test Experiment"
+    create_experiment(experiment_name)
+    upload_config(experiment_name, experiment_data)
+    publish_experiment_version(session, sample_manager, experiment_name)
+    add_experiment_result(
+        session,
+        experiment_name,
+        {
+            "results": [
+                {
+                    "testNumber": 1,
+                    "selections": [{"questionId": "q1", "sampleId": "s1"}],
+                }
+            ]
+        },
+    )
+
+    experiment_data["tests"][0]["questions"][0]["text"] = "Which is brighter?"
+    with pytest.raises(PublishedResultsWouldBeDeleted):
+        upload_config(experiment_name, experiment_data)
+    result = session.exec(select(ExperimentTestResult)).one()
+    assert result.experiment_version_id is not None
+    assert (
+        get_experiment_by_name(session, experiment_name).tests[0].questions[0].text
+        == "Select better quality"
+    )
+
+
+def test_update_experiment_config_keeps_untouched_tests(
+    session, create_experiment, upload_config, experiment_data, updated_experiment_data
+):
+    experiment_name = "Test Experiment"
+    create_experiment(experiment_name)
+    upload_config(experiment_name, experiment_data)
+    result_list = {
+        "results": [
+            {"testNumber": 1, "selections": [{"questionId": "q1", "sampleId": "s1"}]}
+        ]
+    }
+    add_experiment_result(session, experiment_name, result_list)
+    experiment = session.exec(
+        select(Experiment).where(Experiment.name == experiment_name)
+    ).one()
+    config_version = experiment.config_version
+
+    diff = upload_config(experiment_name, experiment_data)
+    assert not diff.changed
+    assert diff.untouched == [1]
+    assert experiment.config_version == config_version
+
+    diff = upload_config(experiment_name, updated_experiment_data)
+    assert diff.changed
+    assert diff.added == [2]
+    assert diff.untouched == [1]
+    assert len(session.exec(select(ExperimentTestResult)).all()) == 1
+
+    modified_data = {
+        **updated_experiment_data,
+        "tests": updated_experiment_data["tests"][:1],
+    }
+    modified_data["tests"][0]["questions"] = [
+        {"question_id": "q1", "text": "Fixed typo"}
+    ]
+    diff = upload_config(experiment_name, modified_data)
+    assert diff.modified == [1]
+    assert diff.removed == [2]
+    assert session.exec(select(ExperimentTestResult)).all() == []
+
+
+def test_publish_static_experiment(
+    session, create_experiment, upload_config, experiment_data, sample_manager, tmp_path
+):
+    experiment_name = "Test Experiment"
+    create_experiment(experiment_name)
+    upload_config(experiment_name, experiment_data)
+    publisher = DirectoryStaticPublisher(str(tmp_path))
+
+    paths = publish_static_experiment(
+        session, sample_manager, publisher, experiment_name
+    )
+    assert paths == [
+        f"experiments/{experiment_name}/experiment.json",
+        f"experiments/{experiment_name}/manifest.json",
+    ]
+    config = json.loads((tmp_path / paths[0]).read_text())
+    assert config["name"] == experiment_data["name"]
+    manifest = json.loads((tmp_path / paths[1]).read_text())
+    assert manifest["samples"][0]["assetPath"] == "file_sample_5.mp3"
+    assert manifest["samples"][0]["size"] is None
+
+    upload_experiment_sample(
+        sample_manager,
+        experiment_name,
+        UploadFile(filename="file_sample_5.mp3", file=BytesIO(b"abc")),
+    )
+    publish_static_experiment(session, sample_manager, publisher, experiment_name)
+    manifest = json.loads((tmp_path / paths[1]).read_text())
+    assert manifest["samples"][0]["size"] == 3
+
+    publisher.remove(experiment_name)
+    assert not (tmp_path / paths[0]).exists()
+
+
+def test_get_sample_manifest(
+    session, create_experiment, upload_config, updated_experiment_data, sample_manager
+):
+    experiment_name = "Test Experiment"
+    create_experiment(experiment_name)
+    upload_config(experiment_name, updated_experiment_data)
+    sample_manager.upload_sample(
+        experiment_name, "file_sample_700.mp3", BytesIO(mp3_file(10))
+    )
+
+    manifest = get_sample_manifest(session, sample_manager, experiment_name)
+    assert [(s.test_number, s.sample_id) for s in manifest.samples] == [
+        (1, "s1"),
+        (2, "s2"),
+    ]
+    assert manifest.samples[0].size is None
+    assert manifest.samples[0].duration is None
+    assert manifest.samples[1].url.endswith(
+        f"/experiments/{experiment_name}/samples/file_sample_700.mp3"
+    )
+    assert manifest.samples[1].duration == pytest.approx(10 * 1152 / 44100, rel=0.01)
+
+
+def test_archive_experiment_samples(
+    session, create_experiment, upload_config, updated_experiment_data, sample_manager
+):
+    experiment_name = "Test Experiment"
+    create_experiment(experiment_name)
+    upload_config(experiment_name, updated_experiment_data)
+    sample_manager.upload_sample(experiment_name, "file_sample_5.mp3", BytesIO(b"5"))
+    sample_manager.upload_sample(experiment_name, "file_sample_700.mp3", BytesIO(b"7"))
+
+    chunks, media_type = archive_experiment_samples(
+        session, sample_manager, experiment_name
+    )
+    assert media_type == "application/zip"
+    with zipfile.ZipFile(BytesIO(b"".join(chunks))) as archive:
+        assert archive.namelist() == ["file_sample_5.mp3", "file_sample_700.mp3"]
+
+    chunks, _ = archive_experiment_samples(
+        session, sample_manager, experiment_name, test_number=2
+    )
+    with zipfile.ZipFile(BytesIO(b"".join(chunks))) as archive:
+        assert archive.read("file_sample_700.mp3") == b"7"
+        assert archive.namelist() == ["file_sample_700.mp3"]
+
+    chunks, media_type = archive_experiment_samples(
+        session, sample_manager, experiment_name, archive_format="tar"
+    )
+    assert media_type == "application/x-tar"
+    with tarfile.open(fileobj=BytesIO(b"".join(chunks))) as archive:
+        assert archive.extractfile("file_sample_5.mp3").read() == b"5"
+
+
+def test_export_import_experiment_bundle(
+    session, create_experiment, upload_config, experiment_data, sample_manager
+):
+    experiment_name = "Test Experiment"
+    create_experiment(experiment_name)
+    upload_config(experiment_name, experiment_data)
+    sample_manager.upload_sample(experiment_name, "file_sample_5.mp3", BytesIO(b"5"))
+    add_experiment_result(
+        session,
+        experiment_name,
+        {
+            "results": [
+                {
+                    "testNumber": 1,
+                    "selections": [{"questionId": "q1", "sampleId": "s1"}],
+                }
+            ]
+        },
+    )
+
+    bundle = b"".join(
+        export_experiment_bundle(session, sample_manager, experiment_name)
+    )
+    with zipfile.ZipFile(BytesIO(bundle)) as archive:
+        assert archive.namelist() == [
+            "config.json",
+            "samples/file_sample_5.mp3",
+            "results.ndjson",
+            "manifest.json",
+        ]
+
+    def import_bundle(name):
+        bundle_file = UploadFile(filename="bundle.zip", file=BytesIO(bundle))
+        return import_experiment_bundle(session, sample_manager, name, bundle_file)
+
+    summary = import_bundle("Imported Experiment")
+    assert summary.config.added == [1]
+    assert summary.uploaded_samples == ["file_sample_5.mp3"]
+    assert summary.imported_results == 1
+    imported = get_experiment_by_name(session, "Imported Experiment")
+    assert imported.name == experiment_data["name"]
+
+    # Repeating the import changes nothing
+    summary = import_bundle("Imported Experiment")
+    assert not summary.config.changed
+    assert summary.skipped_samples == ["file_sample_5.mp3"]
+    assert summary.imported_results == 0
+
+
+def test_imported_results_reference_current_version(
+    session, create_experiment, upload_config, experiment_data, sample_manager
+):
+    create_experiment("Test Experiment")
+    upload_config("Test Experiment", experiment_data)
+    add_experiment_result(
+        session,
+        "Test Experiment",
+        {
+            "results": [
+                {
+                    "testNumber": 1,
+                    "selections": [{"questionId": "q1", "sampleId": "s1"}],
+                }
+            ]
+        },
+    )
+    bundle = b"".join(
+        export_experiment_bundle(session, sample_manager, "Test Experiment")
+    )
+
+    # Published from the same config as the bundle's
+    create_experiment("Imported Experiment")
+    upload_config("Imported Experiment", experiment_data)
+    published = publish_experiment_version(
+        session, sample_manager, "Imported Experiment"
+    )
+    import_experiment_bundle(
+        session,
+        sample_manager,
+        "Imported Experiment",
+        UploadFile(filename="bundle.zip", file=BytesIO(bundle)),
+    )
+
+    version = session.exec(
+        select(ExperimentVersion).where(ExperimentVersion.version == published.version)
+    ).one()
+    imported = session.exec(
+        select(ExperimentTestResult).where(
+            ExperimentTestResult.experiment_version_id == version.id
+        )
+    ).all()
+    assert len(imported) == 1
+
+
+def test_import_experiment_bundle_checksum_mismatch(session, sample_manager):
+    content = BytesIO()
+    with zipfile.ZipFile(content, "w") as archive:
+        archive.writestr("config.json", "{}")
+        archive.writestr("manifest.json", json.dumps({"sha256": {"config.json": "0"}}))
+    bundle_file = UploadFile(filename="bundle.zip", file=BytesIO(content.getvalue()))
+
+    with pytest.raises(IncorrectBundle):
+        import_experiment_bundle(session, sample_manager, "Experiment", bundle_file)
+
+
+def test_import_experiment_bundle_checks_results_before_uploading_samples(
+    session, create_experiment, upload_config, experiment_data, sample_manager
+):
+    def bundle_file(results):
+        files = {
+            "config.json": json.dumps(experiment_data).encode(),
+            "samples/file_sample_5.mp3": b"5",
+            "results.ndjson": b"".join(
+                json.dumps({"experimentUse": "use", "testResult": r}).encode() + b"\n"
+                for r in results
+            ),
+        }
+        content = BytesIO()
+        with zipfile.ZipFile(content, "w") as archive:
+            for name, data in files.items():
+                archive.writestr(name, data)
+            checksums = {
+                name: hashlib.sha256(data).hexdigest() for name, data in files.items()
+            }
+            archive.writestr("manifest.json", json.dumps({"sha256": checksums}))
+        return UploadFile(filename="bundle.zip", file=BytesIO(content.getvalue()))
+
+    selections = [{"questionId": "q1", "sampleId": "s1"}]
+    with pytest.raises(NoMatchingTest):
+        import_experiment_bundle(
+            session,
+            sample_manager,
+            "Experiment",
+            bundle_file([{"testNumber": 9, "selections": selections}]),
+        )
+    assert sample_manager.objects == {}
+
+    # Samples uploaded before the transaction failed are removed
+    create_experiment("Experiment")
+    published_data = copy.deepcopy(experiment_data)
+    published_data["tests"][0]["questions"][0]["text"] = "Which is brighter?"
+    upload_config("Experiment", published_data)
+    publish_experiment_version(session, sample_manager, "Experiment")
+    add_experiment_result(
+        session,
+        "Experiment",
+        {"results": [{"testNumber": 1, "selections": selections}]},
+    )
+    with pytest.raises(PublishedResultsWouldBeDeleted):
+        import_experiment_bundle(
+            session,
+            sample_manager,
+            "Experiment",
+            bundle_file([{"testNumber": 1, "selections": selections}]),
+        )
+    assert sample_manager.objects == {}
+
+
+def test_clone_experiment(
+    session, create_experiment, upload_config, experiment_data, sample_manager
+):
+    experiment_name = "Test Experiment"
+    create_experiment(experiment_name)
+    upload_config(experiment_name, experiment_data)
+    sample_manager.upload_sample(experiment_name, "file_sample_5.mp3", BytesIO(b"5"))
+    add_experiment_result(
+        session,
+        experiment_name,
+        {
+            "results": [
+                {
+                    "testNumber": 1,
+                    "selections": [{"questionId": "q1", "sampleId": "s1"}],
+                }
+            ]
+        },
+    )
+
+    clone_experiment(session, sample_manager, experiment_name, "Cloned Experiment")
+
+    clone = get_experiment_by_name(session, "Cloned Experiment")
+    source = get_experiment_by_name(session, experiment_name)
+    assert clone.tests == source.tests
+    assert clone.uid != source.uid
+    assert sample_manager.objects["Cloned Experiment/file_sample_5.mp3"] == b"5"
+    assert get_experiment_tests_results(session, "Cloned Experiment").results == []
+
+    with pytest.raises(ExperimentAlreadyExists):
+        clone_experiment(session, sample_manager, experiment_name, "Cloned Experiment")
+
+
+def test_clone_experiment_removes_copied_samples_when_commit_fails(
+    session,
+    create_experiment,
+    upload_config,
+    experiment_data,
+    sample_manager,
+    monkeypatch,
+):
+    experiment_name = "Test Experiment"
+    create_experiment(experiment_name)
+    upload_config(experiment_name, experiment_data)
+    sample_manager.upload_sample(experiment_name, "file_sample_5.mp3", BytesIO(b"5"))
+
+    def commit():
+        # The clone name was taken concurrently
+        raise IntegrityError("INSERT", {}, Exception("duplicate key"))
+
+    monkeypatch.setattr(session, "commit", commit)
+    with pytest.raises(ExperimentAlreadyExists):
+        clone_experiment(session, sample_manager, experiment_name, "Cloned Experiment")
+    assert list(sample_manager.objects) == ["Test Experiment/file_sample_5.mp3"]
+
+
+def test_stream_experiment_results(
+    session, create_experiment, upload_config, updated_experiment_data
+):
+    experiment_name = "Test Experiment"
+    create_experiment(experiment_name)
+    upload_config(experiment_name, updated_experiment_data)
+    for _ in range(3):
+        add_experiment_result(
+            session,
+            experiment_name,
+            {
+                "results": [
+                    {
+                        "testNumber": 1,
+                        "selections": [{"questionId": "q1", "sampleId": "s1"}],
+                    },
+                    {
+                        "testNumber": 2,
+                        "xSampleId": "s2",
+                        "xSelected": "s2",
+                        "selections": [{"questionId": "q2", "sampleId": "s2"}],
+                    },
+                ]
+            },
+        )
+    experiment = session.exec(
+        select(Experiment).where(Experiment.name == experiment_name)
+    ).one()
+
+    document = b"".join(stream_experiment_results(session, experiment, "json"))
+    expected = get_experiment_tests_results(session, experiment_name)
+    # Ordered by submission rather than grouped by test
+    assert sorted(json.loads(document)["results"], key=json.dumps) == sorted(
+        expected.model_dump(by_alias=True)["results"], key=json.dumps
+    )
+
+    lines = b"".join(
+        stream_experiment_results(session, experiment, "ndjson", test_number=2)
+    ).splitlines()
+    assert [json.loads(line)["testNumber"] for line in lines] == [2, 2, 2]
+
+    result_name = session.exec(select(ExperimentTestResult.experiment_use)).first()
+    lines = b"".join(
+        stream_experiment_results(session, experiment, result_name=result_name)
+    ).splitlines()
+    assert len(lines) == 2
+
+
+def test_get_experiment_tests_results_since_cursor(
+    session, create_experiment, upload_config, experiment_data, monkeypatch
+):
+    monkeypatch.setattr("app.crud.RESULTS_CURSOR_SETTLE", timedelta(0))
+    experiment_name = "Test Experiment"
+    create_experiment(experiment_name)
+    upload_config(experiment_name, experiment_data)
+    result_list = {
+        "results": [
+            {"testNumber": 1, "selections": [{"questionId": "q1", "sampleId": "s1"}]}
+        ]
+    }
+    for _ in range(3):
+        add_experiment_result(session, experiment_name, result_list)
+
+    first_page = get_experiment_tests_results(session, experiment_name, limit=2)
+    assert len(first_page.results) == 2
+    second_page = get_experiment_tests_results(
+        session, experiment_name, since=first_page.cursor
+    )
+    assert len(second_page.results) == 1
+    assert (
+        second_page.cursor
+        == get_experiment_tests_results(session, experiment_name).cursor
+    )
+
+    # Nothing new, the cursor stays in place
+    empty = get_experiment_tests_results(
+        session, experiment_name, since=second_page.cursor
+    )
+    assert empty.results == []
+    assert empty.cursor == second_page.cursor
+
+    add_experiment_result(session, experiment_name, result_list)
+    newest = get_experiment_tests_results(session, experiment_name, since=empty.cursor)
+    assert len(newest.results) == 1
+
+    with pytest.raises(IncorrectResultsCursor):
+        get_experiment_tests_results(session, experiment_name, since="invalid")
+
+
+def test_results_cursor_waits_for_results_in_flight(
+    session, create_experiment, upload_config, experiment_data
+):
+    experiment_name = "Test Experiment"
+    create_experiment(experiment_name)
+    upload_config(experiment_name, experiment_data)
+    result_list = {
+        "results": [
+            {"testNumber": 1, "selections": [{"questionId": "q1", "sampleId": "s1"}]}
+        ]
+    }
+    add_experiment_result(session, experiment_name, result_list)
+    add_experiment_result(session, experiment_name, result_list)
+    first, second = session.exec(
+        select(ExperimentTestResult).order_by(ExperimentTestResult.id)
+    ).all()
+    first.created_at = datetime.utcnow() - timedelta(minutes=1)
+    # Created before the cursor is taken, but committed only after it
+    second.created_at = datetime.utcnow() - timedelta(seconds=1)
+    session.add_all([first, second])
+    session.commit()
+
+    listed = get_experiment_tests_results(session, experiment_name)
+    assert len(listed.results) == 2
+    page = get_experiment_tests_results(session, experiment_name, limit=10)
+    assert len(page.results) == 1
+    assert page.cursor == listed.cursor
+
+    second.created_at = datetime.utcnow() - timedelta(seconds=30)
+    session.add(second)
+    session.commit()
+    newer = get_experiment_tests_results(session, experiment_name, since=page.cursor)
+    assert len(newer.results) == 1
+
+
+def test_stream_columnar_results(
+    session, create_experiment, upload_config, experiment_data
+):
+    pa = pytest.importorskip("pyarrow")
+    experiment_name = "Test Experiment"
+    create_experiment(experiment_name)
+    experiment_data["tests"].append(
+        {
+            "test_number": 2,
+            "type": "MUSHRA",
+            "reference": {"sample_id": "ref", "asset_path": "ref.wav"},
+            "anchors": [{"sample_id": "anchor", "asset_path": "anchor.wav"}],
+            "samples": [
+                {"sample_id": "a", "asset_path": "a.wav"},
+                # Named like a fixed column
+                {"sample_id": "feedback", "asset_path": "feedback.wav"},
+            ],
+        }
+    )
+    upload_config(experiment_name, experiment_data)
+    for scores in ([("feedback", 20), ("a", 40)], [("a", 60), ("feedback", 80)]):
+        add_experiment_result(
+            session,
+            experiment_name,
+            {
+                "results": [
+                    {
+                        "testNumber": 2,
+                        "referenceScore": 100,
+                        "anchorsScores": [{"sampleId": "anchor", "score": 10}],
+                        "samplesScores": [
+                            {"sampleId": sample_id, "score": score}
+                            for sample_id, score in scores
+                        ],
+                    }
+                ]
+            },
+        )
+
+    experiment, table = columnar_results_table(session, experiment_name, 2)
+    content = b"".join(stream_columnar_results(session, experiment, table, "arrow"))
+    result = pa.ipc.open_stream(content).read_all()
+    assert result.column_names == [
+        "submission",
+        "created_at",
+        "feedback",
+        "score_ref",
+        "score_anchor",
+        "score_a",
+        "score_feedback",
+    ]
+    assert result.column("score_a").to_pylist() == [40, 60]
+    assert result.column("score_feedback").to_pylist() == [20, 80]
+    assert result.column("feedback").to_pylist() == [None, None]
+
+    content = b"".join(stream_columnar_results(session, experiment, table, "parquet"))
+    parquet = pytest.importorskip("pyarrow.parquet")
+    assert parquet.read_table(pa.BufferReader(content)).equals(result)
+
+
+def test_stream_results_csv(session, create_experiment, upload_config, experiment_data):
+    experiment_name = "Test Experiment"
+    create_experiment(experiment_name)
+    experiment_data["tests"].append(
+        {
+            "test_number": 2,
+            "type": "MUSHRA",
+            "reference": {"sample_id": "ref", "asset_path": "ref.wav"},
+            "anchors": [],
+            "samples": [
+                {"sample_id": "a", "asset_path": "a.wav"},
+                {"sample_id": "b", "asset_path": "b.wav"},
+            ],
+        }
+    )
+    upload_config(experiment_name, experiment_data)
+    for scores, feedback in (
+        ([("b", 20), ("a", 40)], "fine"),
+        ([("a", 60)], "loud, clear"),
+    ):
+        add_experiment_result(
+            session,
+            experiment_name,
+            {
+                "results": [
+                    {
+                        "testNumber": 2,
+                        "referenceScore": 100,
+                        "anchorsScores": [],
+                        "samplesScores": [
+                            {"sampleId": sample_id, "score": score}
+                            for sample_id, score in scores
+                        ],
+                        "feedback": feedback,
+                    }
+                ]
+            },
+        )
+
+    experiment, table = results_csv_table(session, experiment_name, 2)
+    rows = list(
+        csv.reader(io.StringIO("".join(stream_results_csv(session, experiment, table))))
+    )
+    assert rows[0] == ["Submission", "Test type", "ref", "a", "b", "Feedback"]
+    assert [row[2:] for row in rows[1:]] == [
+        ["100", "40", "20", "fine"],
+        ["100", "60", "", "loud, clear"],
+    ]
+
+    experiment, table = results_csv_table(session, experiment_name, 1)
+    rows = list(
+        csv.reader(io.StringIO("".join(stream_results_csv(session, experiment, table))))
+    )
+    assert rows == [["Submission", "Test type", "q1", "Feedback"]]
+
+
+def test_stream_results_csv_zip(file_engine, updated_experiment_data):
+    experiment_name = "Test Experiment"
+    with Session(file_engine) as session:
+        add_experiment(session, experiment_name)
+        upload_experiment_config(
+            session,
+            experiment_name,
+            UploadFile(
+                filename="config.json",
+                file=BytesIO(json.dumps(updated_experiment_data).encode()),
+            ),
+        )
+        add_experiment_result(
+            session,
+            experiment_name,
+            {
+                "results": [
+                    {
+                        "testNumber": 1,
+                        "selections": [{"questionId": "q1", "sampleId": "s1"}],
+                    }
+                ]
+            },
+        )
+
+    content = b"".join(stream_results_csv_zip(file_engine, experiment_name))
+    with zipfile.ZipFile(BytesIO(content)) as archive:
+        assert archive.namelist() == [
+            "Updated Experiment Name_test_1_AB.csv",
+            "Updated Experiment Name_test_2_ABX.csv",
+        ]
+        rows = list(
+            csv.reader(io.StringIO(archive.read(archive.namelist()[0]).decode()))
+        )
+    assert rows[0] == ["Submission", "Test type", "q1", "Feedback"]
+    assert rows[1][1:] == ["AB", "s1", ""]
+
+
+def test_export_jobs_reuse_stored_exports(file_engine, export_jobs, experiment_data):
+    experiment_name = "Test Experiment"
+    result = {
+        "results": [
+            {"testNumber": 1, "selections": [{"questionId": "q1", "sampleId": "s1"}]}
+        ]
+    }
+    with Session(file_engine) as session:
+        add_experiment(session, experiment_name)
+        upload_experiment_config(
+            session,
+            experiment_name,
+            UploadFile(
+                filename="config.json",
+                file=BytesIO(json.dumps(experiment_data).encode()),
+            ),
+        )
+        add_experiment_result(session, experiment_name, result)
+
+        export = PqExportRequest(kind="csv", test_number=1)
+        job = submit_export_job(
+            session, export_jobs, file_engine, experiment_name, export
+        )
+        assert job.file_name == "Test Experiment_test_1_AB.csv"
+        job = asyncio.run(wait_for_export_job(export_jobs, experiment_name, job.job_id))
+        assert job.status == "done"
+        _, content = get_export_artifact(export_jobs, experiment_name, job.job_id)
+        assert b"".join(content).decode().splitlines()[1].endswith(",AB,s1,")
+
+        # Nothing changed, the stored export is returned without rendering it again
+        assert (
+            submit_export_job(
+                session, export_jobs, file_engine, experiment_name, export
+            )
+            == job
+        )
+
+        add_experiment_result(session, experiment_name, result)
+        new_job = submit_export_job(
+            session, export_jobs, file_engine, experiment_name, export
+        )
+        assert new_job.job_id != job.job_id
+        assert (
+            asyncio.run(
+                wait_for_export_job(export_jobs, experiment_name, new_job.job_id)
+            ).status
+            == "done"
+        )
+        # Replaced by the new export
+        with pytest.raises(ExportJobNotFound):
+            get_export_job(export_jobs, experiment_name, job.job_id)
+
+
+def test_export_job_validation(
+    session, export_jobs, create_experiment, upload_config, experiment_data
+):
+    create_experiment("Test Experiment")
+    upload_config("Test Experiment", experiment_data)
+    with pytest.raises(IncorrectExportRequest):
+        submit_export_job(
+            session,
+            export_jobs,
+            None,
+            "Test Experiment",
+            PqExportRequest(kind="columnar"),
+        )
+    with pytest.raises(NoMatchingTest):
+        submit_export_job(
+            session,
+            export_jobs,
+            None,
+            "Test Experiment",
+            PqExportRequest(kind="csv", test_number=5),
+        )
+    with pytest.raises(ExportJobNotFound):
+        get_export_job(export_jobs, "Test Experiment", "pdf.unknown")
+
+
+def test_wait_for_export_job_of_another_worker(export_jobs):
+    # Started by another worker sharing the store, no job runs in this one
+    other_worker = ExportJobs(export_jobs.store, workers=1)
+    started = threading.Event()
+    release = threading.Event()
+
+    def render():
+        started.set()
+        release.wait(5)
+        yield b"content"
+
+    job = other_worker.submit("Test/csv/1", "csv.1", render, "results.csv", "text/csv")
+    started.wait(5)
+    threading.Timer(0.2, release.set).start()
+    assert job.status == "pending"
+    assert asyncio.run(export_jobs.wait("Test/csv/1")).status == "done"
+    assert b"".join(export_jobs.store.get("Test/csv/1")) == b"content"
+    other_worker.shutdown()
+
+    # A job left pending by a stopped worker isn't waited for past the timeout
+    stale = job.model_copy(update={"updated_at": datetime(2000, 1, 1)})
+    export_jobs.store.put("Test/csv/2.json", [stale.model_dump_json().encode()], "")
+    assert asyncio.run(export_jobs.wait("Test/csv/2")).status == "pending"
+
+    # A job rendering for longer than the wait timeout is returned as pending
+    export_jobs.wait_timeout = 0.1
+    fresh = job.model_copy(update={"updated_at": datetime.utcnow()})
+    export_jobs.store.put("Test/csv/3.json", [fresh.model_dump_json().encode()], "")
+    assert asyncio.run(export_jobs.wait("Test/csv/3")).status == "pending"
+
+
+def test_finished_export_job_keeps_pending_jobs_of_other_workers(export_jobs):
+    def store_job(key, status, updated_at):
+        job = PqExportJob(
+            job_id=key,
+            status=status,
+            file_name="results.csv",
+            media_type="text/csv",
+            updated_at=updated_at,
+        )
+        export_jobs.store.put(f"{key}.json", [job.model_dump_json().encode()], "")
+
+    store_job("Test/csv/old", "done", datetime(2000, 1, 1))
+    export_jobs.store.put("Test/csv/old", [b"old"], "text/csv")
+    store_job("Test/csv/failed", "failed", datetime(2000, 1, 1))
+    # Rendered by another worker, which still waits for it
+    store_job("Test/csv/other", "pending", datetime.utcnow())
+
+    export_jobs.submit(
+        "Test/csv/new",
+        "csv.new",
+        lambda: [b"new"],
+        "results.csv",
+        "text/csv",
+        stale_prefix="Test/csv/",
+    )
+    assert asyncio.run(export_jobs.wait("Test/csv/new")).status == "done"
+    assert export_jobs.store.list_keys("Test/csv/") == [
+        "Test/csv/new",
+        "Test/csv/new.json",
+        "Test/csv/other.json",
+    ]
+
+
+def test_render_pdf_report_skips_tests_without_results(
+    session, create_experiment, upload_config, updated_experiment_data
+):
+    create_experiment("Test Experiment")
+    upload_config("Test Experiment", updated_experiment_data)
+    result = {"testNumber": 1, "selections": [{"questionId": "q1", "sampleId": "s1"}]}
+    add_experiment_result(session, "Test Experiment", {"results": [result] * 3})
+
+    content = render_pdf_report(session, "Test Experiment")
+
+    assert content.startswith(b"%PDF")
+    # Only the AB test has results, its summary and table share a page
+    assert content.count(b"/Type /Page\n") == 1
+
+
+def test_mushra_analysis_is_cached_per_results_watermark(
+    session, create_experiment, upload_config
+):
+    create_experiment("Test Experiment")
+    upload_config(
+        "Test Experiment",
+        {
+            "name": "MUSHRA Experiment",
+            "description": "",
+            "end_text": "",
+            "tests": [
+                {
+                    "test_number": 1,
+                    "type": "MUSHRA",
+                    "reference": {"sample_id": "ref", "asset_path": "ref.wav"},
+                    "anchors": [],
+                    "samples": [{"sample_id": "s1", "asset_path": "s1.wav"}],
+                }
+            ],
+        },
+    )
+
+    def submit(score):
+        result = {
+            "testNumber": 1,
+            "referenceScore": 100,
+            "anchorsScores": [],
+            "samplesScores": [{"sampleId": "s1", "score": score}],
+        }
+        add_experiment_result(session, "Test Experiment", {"results": [result]})
+
+    submit(40)
+    first = get_mushra_analysis_json(session, "Test Experiment")
+    assert get_mushra_analysis_json(session, "Test Experiment") is first
+
+    submit(60)
+    second = get_mushra_analysis_json(session, "Test Experiment")
+    assert second.version != first.version
+    analysis = json.loads(second.content)
+    assert analysis["tests"][0]["submissions"] == 2
+    assert analysis["tests"][0]["conditions"][1]["mean"] == 50
+
+
+def test_screening_excludes_listeners_missing_the_reference(
+    session, create_experiment, upload_config
+):
+    create_experiment("Test Experiment")
+    upload_config(
+        "Test Experiment",
+        {
+            "name": "MUSHRA Experiment",
+            "description": "",
+            "end_text": "",
+            "tests": [
+                {
+                    "test_number": 1,
+                    "type": "MUSHRA",
+                    "reference": {"sample_id": "ref", "asset_path": "ref.wav"},
+                    "anchors": [],
+                    "samples": [{"sample_id": "s1", "asset_path": "s1.wav"}],
+                }
+            ],
+        },
+    )
+    for reference, score in ((100, 40), (95, 60), (50, 100)):
+        result = {
+            "testNumber": 1,
+            "referenceScore": reference,
+            "anchorsScores": [],
+            "samplesScores": [{"sampleId": "s1", "score": score}],
+        }
+        add_experiment_result(session, "Test Experiment", {"results": [result]})
+
+    rules = PqScreeningRules()
+    report = get_screening_report(session, "Test Experiment", rules)
+    assert len(report.submissions) == 3
+    assert len(report.excluded) == 1
+
+    results = get_experiment_tests_results(
+        session, "Test Experiment", excluded=set(report.excluded)
+    )
+    assert [r.reference_score for r in results.results] == [100, 95]
+
+    analysis = json.loads(
+        get_mushra_analysis_json(session, "Test Experiment", rules).content
+    )
+    assert analysis["tests"][0]["submissions"] == 2
+    assert analysis["tests"][0]["conditions"][1]["mean"] == 50
+    unscreened = json.loads(
+        get_mushra_analysis_json(session, "Test Experiment").content
+    )
+    assert unscreened["tests"][0]["submissions"] == 3
+
+
+def test_selection_counts_are_updated_with_new_results(
+    session, create_experiment, upload_config, updated_experiment_data
+):
+    create_experiment("Test Experiment")
+    upload_config("Test Experiment", updated_experiment_data)
+
+    def submit(*sample_ids):
+        results = [
+            {
+                "testNumber": 1,
+                "selections": [{"questionId": "q1", "sampleId": sample_id}],
+            }
+            for sample_id in sample_ids
+        ]
+        add_experiment_result(session, "Test Experiment", {"results": results})
+
+    submit("s1", "s1")
+    first = get_selection_counts(session, "Test Experiment")
+    assert first.results == 2
+    submit("s1")
+    second = get_selection_counts(session, "Test Experiment")
+    assert second.results == 3 and second.cursor > first.cursor
+    assert second.selections[0].tolist() == [[3]]
+
+    # A result committed behind the cursor is noticed and everything is counted again
+    session.add(
+        ExperimentTestResult(
+            test_id=session.exec(select(ExperimentTestResult.test_id)).first(),
+            test_result={
+                "testNumber": 1,
+                "selections": [{"questionId": "q1", "sampleId": "s1"}],
+            },
+            experiment_use="late",
+            created_at=first.cursor[0],
+        )
+    )
+    session.commit()
+    assert get_selection_counts(session, "Test Experiment").selections[0].tolist() == [
+        [4]
+    ]
+
+    analysis = json.loads(
+        get_preference_analysis_json(session, "Test Experiment").content
+    )
+    ab, abx = analysis["tests"]
+    assert ab["questions"][0]["samples"][0] == {
+        "sampleId": "s1",
+        "count": 4,
+        "share": 1.0,
+        "pValue": 1.0,
+    }
+    assert abx["identification"] == {
+        "trials": 0,
+        "correct": 0,
+        "rate": None,
+        "pValue": None,
+    }
+
+
+def test_ape_analysis_json(session, create_experiment, upload_config):
+    create_experiment("Test Experiment")
+    upload_config(
+        "Test Experiment",
+        {
+            "name": "APE Experiment",
+            "description": "",
+            "end_text": "",
+            "tests": [
+                {
+                    "test_number": 1,
+                    "type": "APE",
+                    "axis": [{"question_id": "warmth", "text": "Warmth"}],
+                    "samples": [
+                        {"sample_id": "s1", "asset_path": "s1.wav"},
+                        {"sample_id": "s2", "asset_path": "s2.wav"},
+                    ],
+                }
+            ],
+        },
+    )
+    for ratings in ((20, 80), (30, 60)):
+        result = {
+            "testNumber": 1,
+            "axisResults": [
+                {
+                    "axisId": "warmth",
+                    "sampleRatings": [
+                        {"sampleId": "s1", "rating": ratings[0]},
+                        {"sampleId": "s2", "rating": ratings[1]},
+                    ],
+                }
+            ],
+        }
+        add_experiment_result(session, "Test Experiment", {"results": [result]})
+
+    cached = get_ape_analysis_json(session, "Test Experiment")
+    assert get_ape_analysis_json(session, "Test Experiment") is cached
+    options = PqBootstrapOptions(resamples=200, seed=1)
+    boot = get_ape_analysis_json(session, "Test Experiment", options)
+    assert boot is not cached
+    assert get_ape_analysis_json(session, "Test Experiment", options) is boot
+    boot_analysis = json.loads(boot.content)
+    assert boot_analysis["bootstrap"] == {"resamples": 200, "seed": 1}
+    boot_sample = boot_analysis["tests"][0]["axes"][0]["samples"][1]
+    assert 60 <= boot_sample["bootCiLow"] <= boot_sample["bootCiHigh"] <= 80
+    (axis,) = json.loads(cached.content)["tests"][0]["axes"]
+    assert axis["raters"] == 2 and axis["kendallW"] == 1
+    assert [sample["rankScore"] for sample in axis["samples"]] == [0, 1]
+    assert axis["samples"][1]["mean"] == 70
+
+
+def test_result_aggregates_follow_stored_results(
+    session, create_experiment, upload_config, updated_experiment_data
+):
+    create_experiment("Test Experiment")
+    mushra_test = {
+        "test_number": 3,
+        "type": "MUSHRA",
+        "reference": {"sample_id": "ref", "asset_path": "ref.wav"},
+        "anchors": [],
+        "samples": [{"sample_id": "s1", "asset_path": "s1.wav"}],
+    }
+    updated_experiment_data["tests"].append(mushra_test)
+    upload_config("Test Experiment", updated_experiment_data)
+
+    for reference, score, sample_id in (
+        (100, 40, "s1"),
+        (90, 100, "s1"),
+        (95, 55, "s2"),
+    ):
+        add_experiment_result(
+            session,
+            "Test Experiment",
+            {
+                "results": [
+                    {
+                        "testNumber": 3,
+                        "referenceScore": reference,
+                        "anchorsScores": [],
+                        "samplesScores": [{"sampleId": "s1", "score": score}],
+                    },
+                    {
+                        "testNumber": 2,
+                        "xSampleId": "s2",
+                        "xSelected": sample_id,
+                        "selections": [{"questionId": "q2", "sampleId": sample_id}],
+                    },
+                ]
+            },
+        )
+
+    def summary():
+        return [
+            (a.test_number, a.kind, a.question_id, a.sample_id, a.count, a.mean)
+            for a in get_result_aggregates(session, "Test Experiment").aggregates
+        ]
+
+    assert summary() == [
+        (2, "identification", "", "", 3, 1 / 3),
+        (2, "selection", "q2", "s1", 2, 1),
+        (2, "selection", "q2", "s2", 1, 1),
+        (3, "reference", "", "ref", 3, 95),
+        (3, "sample", "", "s1", 3, 65),
+    ]
+    sample = get_result_aggregates(session, "Test Experiment").aggregates[-1]
+    assert sample.std == pytest.approx(31.22, abs=0.01)
+    assert sample.histogram == [0, 0, 0, 0, 1, 1, 0, 0, 0, 1]
+
+    incremental = summary()
+    assert rebuild_result_aggregates(session, "Test Experiment") == 6
+    assert summary() == incremental
+
+    # Changing a test drops its results together with their aggregates
+    mushra_test["samples"].append({"sample_id": "s3", "asset_path": "s3.wav"})
+    upload_config("Test Experiment", updated_experiment_data)
+    session.commit()
+    assert [row[0] for row in summary()] == [2, 2, 2]
+
+    remove_experiment_by_name(session, "Test Experiment")
+    session.commit()
+    assert session.exec(select(ResultAggregate)).all() == []
@@ -0,0 +1,165 @@
+import asyncio
+import json
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlmodel import SQLModel, create_engine, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.crud import (
+    add_experiment_result_async,
+    add_sample_rating_async,
+    get_experiment_by_name_async,
+    get_experiment_config_json_async,
+    get_experiment_version_json_async,
+    get_result_aggregates,
+    publish_experiment_version,
+    ExperimentVersionNotFound,
+    ExperimentNotConfigured,
+    ExperimentNotFound,
+)
+from app.models import Rating, Sample
+from app.schemas import PqSampleRating, PqTestABResult, PqTestResultsList
+
+
+@pytest.fixture(name="engine")
+def engine_fixture(tmp_path):
+    # A file database is shared between the sync setup session and the async session
+    engine = create_engine(f"sqlite:///{tmp_path / 'pq-toolkit.db'}")
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+@pytest.fixture(name="async_engine")
+def async_engine_fixture(engine):
+    return create_async_engine(
+        f"sqlite+aiosqlite:///{engine.url.database}", poolclass=NullPool
+    )
+
+
+@pytest.fixture
+def run_async(async_engine):
+    def _run_async(crud_function, *args):
+        async def _run():
+            async with AsyncSession(async_engine, expire_on_commit=False) as session:
+                return await crud_function(session, *args)
+
+        return asyncio.run(_run())
+
+    return _run_async
+
+
+def test_get_experiment_by_name_async(
+    create_experiment, upload_config, experiment_data, run_async
+):
+    experiment_name = "Test Experiment"
+    create_experiment(experiment_name)
+    upload_config(experiment_name, experiment_data)
+    experiment = run_async(get_experiment_by_name_async, experiment_name)
+    assert experiment.name == experiment_data["name"]
+    assert len(experiment.tests) == 1
+
+
+def test_get_experiment_by_name_async_errors(create_experiment, run_async):
+    with pytest.raises(ExperimentNotFound):
+        run_async(get_experiment_by_name_async, "Nonexistent Experiment")
+    create_experiment("Test Experiment")
+    with pytest.raises(ExperimentNotConfigured):
+        run_async(get_experiment_by_name_async, "Test Experiment")
+
+
+def test_get_experiment_config_json_async(
+    create_experiment,
+    upload_config,
+    experiment_data,
+    updated_experiment_data,
+    run_async,
+):
+    experiment_name = "Test Experiment"
+    create_experiment(experiment_name)
+    upload_config(experiment_name, experiment_data)
+    config = run_async(get_experiment_config_json_async, experiment_name)
+    assert json.loads(config.content)["name"] == experiment_data["name"]
+    assert run_async(get_experiment_config_json_async, experiment_name) is config
+
+    upload_config(experiment_name, updated_experiment_data)
+    updated = run_async(get_experiment_config_json_async, experiment_name)
+    assert updated.version != config.version
+    assert len(json.loads(updated.content)["tests"]) == 2
+
+
+def test_get_experiment_version_json_async(
+    session,
+    create_experiment,
+    upload_config,
+    experiment_data,
+    sample_manager,
+    run_async,
+):
+    experiment_name = "Test Experiment"
+    create_experiment(experiment_name)
+    upload_config(experiment_name, experiment_data)
+    version = publish_experiment_version(session, sample_manager, experiment_name)
+    config = run_async(get_experiment_version_json_async, experiment_name, 1)
+    assert config.version == version.config_hash
+    assert json.loads(config.content)["name"] == experiment_data["name"]
+    manifest = run_async(get_experiment_version_json_async, experiment_name, 1, True)
+    assert json.loads(manifest.content) == []
+    with pytest.raises(ExperimentVersionNotFound):
+        run_async(get_experiment_version_json_async, experiment_name, 2)
+
+
+def test_add_experiment_result_async(
+    create_experiment, upload_config, experiment_data, run_async
+):
+    experiment_name = "Test Experiment"
+    create_experiment(experiment_name)
+    upload_config(experiment_name, experiment_data)
+    result_list = {
+        "results": [
+            {"testNumber": 1, "selections": [{"questionId": "q1", "sampleId": "s1"}]}
+        ]
+    }
+    first = run_async(add_experiment_result_async, experiment_name, result_list)
+    second = run_async(add_experiment_result_async, experiment_name, result_list)
+    assert isinstance(first, PqTestResultsList)
+    assert len(first.results) == 1
+    assert isinstance(first.results[0], PqTestABResult)
+    # Only the results of the latest submission are returned
+    assert len(second.results) == 1
+
+
+def test_add_experiment_result_async_updates_aggregates(
+    session, create_experiment, upload_config, experiment_data, run_async
+):
+    create_experiment("Test Experiment")
+    upload_config("Test Experiment", experiment_data)
+    result_list = {
+        "results": [
+            {"testNumber": 1, "selections": [{"questionId": "q1", "sampleId": "s1"}]}
+        ]
+    }
+    run_async(add_experiment_result_async, "Test Experiment", result_list)
+    run_async(add_experiment_result_async, "Test Experiment", result_list)
+
+    (aggregate,) = get_result_aggregates(session, "Test Experiment").aggregates
+    assert (aggregate.kind, aggregate.question_id, aggregate.sample_id) == (
+        "selection",
+        "q1",
+        "s1",
+    )
+    assert aggregate.count == 2
+
+
+def test_add_sample_rating_async(session, run_async):
+    sample = Sample(title="sample.mp3", file_path="directly/sample.mp3")
+    session.add(sample)
+    session.commit()
+    rating = PqSampleRating(
+        sampleId=str(sample.id), name=sample.title, assetPath=sample.file_path, rating=4
+    )
+    updated = run_async(add_sample_rating_async, rating)
+    assert updated.rating == 4
+    ratings = session.exec(select(Rating).where(Rating.sample_id == sample.id)).all()
+    assert len(ratings) == 1
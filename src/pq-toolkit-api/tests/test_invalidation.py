@@ -0,0 +1,62 @@
+import pytest
+
+from app.core.cache import CachedResponse, ResponseCache
+from app.core.invalidation import InvalidationBus, experiment_key
+
+
+@pytest.fixture
+def cache():
+    cache = ResponseCache()
+    cache.set("exp", CachedResponse("1", b"{}"), cache.generation())
+    return cache
+
+
+@pytest.fixture
+def bus(cache):
+    bus = InvalidationBus(fallback_ttl=0)
+    bus.register("experiment", cache)
+    return bus
+
+
+def test_publish_evicts_after_commit(session, cache, bus):
+    bus.publish(session, experiment_key("exp"))
+    assert cache.get("exp") is not None
+    session.commit()
+    assert cache.get("exp") is None
+
+
+def test_publish_does_not_evict_on_rollback(session, cache, bus):
+    bus.publish(session, experiment_key("exp"))
+    session.rollback()
+    assert cache.get("exp") is not None
+
+
+def test_publish_without_session_evicts_immediately(cache, bus):
+    bus.publish(None, experiment_key("exp"))
+    assert cache.get("exp") is None
+
+
+def test_cache_skips_value_read_before_eviction(cache):
+    generation = cache.generation()
+    cache.evict("exp")
+    cache.set("exp", CachedResponse("0", b"{}"), generation)
+    assert cache.get("exp") is None
+
+
+def test_degraded_bus_expires_entries(cache, bus):
+    bus._set_degraded(True)
+    assert cache.get("exp") is None
+    bus._set_degraded(False)
+    cache.set("exp", CachedResponse("2", b"{}"), cache.generation())
+    assert cache.get("exp").version == "2"
+
+
+def test_bounded_cache_drops_least_recently_used_entries():
+    cache = ResponseCache(max_entries=2)
+    for key in ("a", "b"):
+        cache.set(key, CachedResponse(key, b"{}"), cache.generation())
+    cache.get("a")
+    cache.set("c", CachedResponse("c", b"{}"), cache.generation())
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
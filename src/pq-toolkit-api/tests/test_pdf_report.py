@@ -0,0 +1,77 @@
+from app.core.csv_export import ResultsCsv
+from app.core.pdf_report import PdfReport, ResultsSummary
+from app.schemas import (
+    PqTestABXResult,
+    PqTestABX,
+    PqTestMUSHRA,
+    PqTestMUSHRAResult,
+)
+
+MUSHRA_TEST = PqTestMUSHRA(
+    test_number=1,
+    reference={"sample_id": "ref", "asset_path": "ref.wav"},
+    anchors=[{"sample_id": "low", "asset_path": "low.wav"}],
+    samples=[{"sample_id": "s1", "asset_path": "s1.wav"}],
+)
+
+
+def mushra_result(reference: int, low: int, s1: int) -> PqTestMUSHRAResult:
+    return PqTestMUSHRAResult(
+        testNumber=1,
+        referenceScore=reference,
+        anchorsScores=[{"sampleId": "low", "score": low}],
+        samplesScores=[{"sampleId": "s1", "score": s1}],
+    )
+
+
+def test_mushra_summary():
+    summary = ResultsSummary(MUSHRA_TEST)
+    summary.add(mushra_result(100, 20, 60))
+    summary.add(mushra_result(90, 30, 80))
+    assert summary.rows() == [
+        ["Reference", 2, "95.0", "7.1", "90", "100"],
+        ["low", 2, "25.0", "7.1", "20", "30"],
+        ["s1", 2, "70.0", "14.1", "60", "80"],
+    ]
+    assert summary.notes() == ["Submissions: 2"]
+
+
+def test_abx_summary():
+    test = PqTestABX(
+        test_number=2,
+        samples=[{"sample_id": "a", "asset_path": "a.wav"}],
+        questions=[{"question_id": "q1", "text": "Which is warmer?"}],
+    )
+    summary = ResultsSummary(test)
+    for x_selected, sample_id in (("a", "a"), ("b", "a"), ("a", "b"), ("a", "a")):
+        summary.add(
+            PqTestABXResult(
+                testNumber=2,
+                xSampleId="a",
+                xSelected=x_selected,
+                selections=[{"questionId": "q1", "sampleId": sample_id}],
+            )
+        )
+    assert summary.rows() == [["q1", "a", 3, "75%"], ["q1", "b", 1, "25%"]]
+    assert summary.notes()[1] == "X sample identified: 3 of 4 (75%)"
+
+
+def test_report_fits_many_results_per_page():
+    summary = ResultsSummary(MUSHRA_TEST)
+    table = ResultsCsv(MUSHRA_TEST)
+    results = [mushra_result(100, 20, score % 100) for score in range(400)]
+    for result in results:
+        summary.add(result)
+
+    report = PdfReport("Experiment: demo")
+    report.add_test(
+        MUSHRA_TEST,
+        summary,
+        table,
+        (row for n, result in enumerate(results) for row in table.rows(str(n), result)),
+    )
+    content = report.output()
+
+    assert content.startswith(b"%PDF")
+    # Around 40 rows per landscape page instead of a page per result
+    assert report.pdf.page_no() <= 12
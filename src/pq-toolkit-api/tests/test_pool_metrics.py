@@ -0,0 +1,57 @@
+import anyio
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from app.core.pool_metrics import (
+    PoolMetrics,
+    get_pool_status,
+    get_threadpool_status,
+    timed_pool_class,
+)
+
+
+@pytest.fixture
+def timed_engine(tmp_path):
+    return create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=timed_pool_class(QueuePool, PoolMetrics()),
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+
+
+def test_pool_status_reports_checked_out_connections(timed_engine):
+    with timed_engine.connect():
+        status = get_pool_status(timed_engine)
+        assert status.size == 1
+        assert status.checked_out == 1
+    status = get_pool_status(timed_engine)
+    assert status.checked_out == 0
+    assert status.checked_in == 1
+    assert status.checkouts == 1
+
+
+def test_pool_status_reports_wait_timeouts(timed_engine):
+    with timed_engine.connect():
+        with pytest.raises(PoolTimeoutError):
+            timed_engine.connect()
+    status = get_pool_status(timed_engine)
+    assert status.timeouts == 1
+    assert status.max_wait_seconds >= 0.05
+
+
+def test_pool_class_survives_recreate(timed_engine):
+    pool = timed_engine.pool
+    assert pool.recreate().metrics is pool.metrics
+
+
+def test_threadpool_status():
+    async def _status():
+        return get_threadpool_status()
+
+    status = anyio.run(_status)
+    assert status.total_tokens > 0
+    assert status.borrowed_tokens == 0
@@ -14,6 +14,7 @@ const ExperimentResultsChart = ({
     closeDetails: () => void;
 }): JSX.Element => {
     const [results, setResults] = useState<any | null>(null);
+    const [mushraAnalysis, setMushraAnalysis] = useState<any | null>(null);
     const [isLoading, setIsLoading] = useState<boolean>(true);
     const [error, setError] = useState<string | null>(null);
 
@@ -28,6 +29,11 @@ const ExperimentResultsChart = ({
                 }
                 const data = await response.json();
                 setResults(data);
+                const analysisResponse = await fetch(`/api/v1/experiments/${experimentName}/analysis/mushra`);
+                if (!analysisResponse.ok) {
+                    throw new Error(`Failed to fetch experiment analysis: ${experimentName}`);
+                }
+                setMushraAnalysis(await analysisResponse.json());
             } catch (err) {
                 setError((err as Error).message);
             } finally {
@@ -59,25 +65,6 @@ const ExperimentResultsChart = ({
         return testResults.flatMap((result) => result.selections || []);
     };
 
-    const getSampleScores = (testResults: any[], key: string) => {
-        return testResults.flatMap((result) => result[key] || []);
-    };
-
-    const calculateAverageScores = (scores: any[]) => {
-        const scoreMap: { [sampleId: string]: number[] } = {};
-        scores.forEach((score) => {
-            if (!scoreMap[score.sampleId]) {
-                scoreMap[score.sampleId] = [];
-            }
-            scoreMap[score.sampleId].push(score.score);
-        });
-
-        return Object.keys(scoreMap).map((sampleId) => ({
-            sampleId,
-            average: scoreMap[sampleId].reduce((sum, score) => sum + score, 0) / scoreMap[sampleId].length,
-        }));
-    };
-
     const calculateAverageScoresAPE = (scores: any[]) => {
         const scoreMap: { [sampleId: string]: number[] } = {};
         scores.forEach((score) => {
@@ -315,10 +302,12 @@ const ExperimentResultsChart = ({
 
 
                     if (testType === 'MUSHRA') {
-                        const anchorsScores = getSampleScores(testResults, 'anchorsScores');
-                        const samplesScores = getSampleScores(testResults, 'samplesScores');
-                        const averageScores = calculateAverageScores([...anchorsScores, ...samplesScores]);
-                        const referenceScore = testResults[0]?.referenceScore || 0;
+                        // Statistics are computed by the API, the reference comes first
+                        const conditions = mushraAnalysis?.tests.find(
+                            (test: any) => test.testNumber === testNumber
+                        )?.conditions ?? [];
+                        const [reference, ...averageScores] = conditions;
+                        const referenceScore = reference?.mean ?? 0;
 
                         return (
                             <div key={testNumber as React.Key} className="mb-8">
@@ -326,13 +315,13 @@ const ExperimentResultsChart = ({
                                 <Bar
                                     data={{
                                         labels: [
-                                            ...averageScores.map((score) => score.sampleId),
+                                            ...averageScores.map((score: any) => score.sampleId),
                                             'Reference',
                                         ],
                                         datasets: [
                                             {
                                                 data: [
-                                                    ...averageScores.map((score) => score.average),
+                                                    ...averageScores.map((score: any) => score.mean),
                                                     referenceScore,
                                                 ],
                                                 backgroundColor: [